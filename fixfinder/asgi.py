@@ -3,6 +3,10 @@ ASGI config for fixfinder project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve with an ASGI server (e.g. ``uvicorn fixfinder.asgi:application``) to get
+long-lived notification streams on /api/notifications/stream/; under WSGI the
+same endpoint degrades to a reconnect-based polling fallback.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
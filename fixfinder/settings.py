@@ -6,6 +6,7 @@ Generated by 'django-admin startproject' using Django 5.2.4.
 
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -14,6 +15,9 @@ load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# `manage.py test` - performance logs/exit dumps working tree ki fixfinder.log mein na jayein
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv("SECRET_KEY", "django-insecure-$)-tahaumrx&f)8*f%rdwju55(ntjcewu=a3a(*y)*739--1i6")
 
@@ -37,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.QueryBudgetMiddleware',  # sabse bahar - session/auth queries bhi count hon
+    'myapp.middleware.ServerTimingMiddleware',
+    'myapp.middleware.SamplingProfilerMiddleware',  # opt-in: PROFILER_SAMPLE_RATE ya signed header
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",  # for static files on Render
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -51,7 +58,7 @@ ROOT_URLCONF = 'fixfinder.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'myapp.timing.TimedDjangoTemplates',  # DjangoTemplates + render time (Server-Timing)
         'DIRS': [BASE_DIR / "tamplates"],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -59,6 +66,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'myapp.context_processors.categories',
             ],
         },
     },
@@ -121,4 +129,128 @@ EMAIL_HOST_USER = 'sachinksonkamble80@gmail.com'
 EMAIL_HOST_PASSWORD = 'qmopcydwaobhqaku'
 DEFAULT_FROM_EMAIL = 'sachinksonkamble80@gmail.com'
 
+# Email outbox worker (python manage.py send_outbox)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+
+# Notification fan-out (python manage.py process_notification_jobs)
+NOTIFICATION_FANOUT_CHUNK_SIZE = 500
+NOTIFICATION_FANOUT_DEFER_THRESHOLD = int(os.getenv("NOTIFICATION_FANOUT_DEFER_THRESHOLD", "5000"))
+NOTIFICATION_JOB_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_JOB_MAX_ATTEMPTS", "6"))
+
+# Notification push stream (/api/notifications/stream/)
+# In-process broker ek worker tak simit hai - doosre process ke events nahi aate; unread count stream
+# khud poll karta hai. Live cross-process `notification` events ke liye shared backend (e.g. Redis) plug karein
+NOTIFICATION_PUBSUB_BACKEND = os.getenv("NOTIFICATION_PUBSUB_BACKEND", "myapp.pubsub.InProcessBroker")
+NOTIFICATION_STREAM_KEEPALIVE = 15  # seconds
+NOTIFICATION_STREAM_POLL_INTERVAL = int(os.getenv("NOTIFICATION_STREAM_POLL_INTERVAL", 5))  # seconds, unread count re-check
+NOTIFICATION_STREAM_RETRY_MS = 15000  # WSGI fallback par reconnect (poll) interval
+
+# Cache - default in-process (LocMem); multi-worker deploy mein shared backend (Redis/Memcached) set karein
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", "fixfinder"),
+    }
+}
+
+# myapp.caching - hot key recompute lock (seconds, stale value isi grace tak serve hoti hai)
+# aur per-process LRU tier ka size
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCAL_MAX_ENTRIES = 512
+
+# Dashboard counters cache (Booking/Review/Service writes par invalidate hota hai)
+DASHBOARD_STATS_CACHE_TIMEOUT = 3600
+
+# ServiceCategory registry (myapp.categories) - version bump ke alawa itne seconds baad bhi reload
+# (LocMem par doosre processes ke bump nahi dikhte)
+CATEGORY_REGISTRY_TTL = int(os.getenv("CATEGORY_REGISTRY_TTL", 60))
+
+# Anonymous public pages (index, services, service_detail, about, privacy, terms) + template
+# fragments - Service/ServiceCategory/Review/TeamMember write par version bump se invalidate
+PUBLIC_PAGE_CACHE_TIMEOUT = int(os.getenv("PUBLIC_PAGE_CACHE_TIMEOUT", 86400))
+# Per-process LRU tier (seconds) public pages/featured services ke liye - doosre process ka
+# version bump itni der baad dikhta hai
+PUBLIC_PAGE_LOCAL_TTL = int(os.getenv("PUBLIC_PAGE_LOCAL_TTL", 5))
+
+# ServiceImage variants (myapp.images / process_service_images worker): size -> max side (px)
+SERVICE_IMAGE_VARIANTS = {'thumb': 160, 'card': 480, 'full': 1600}
+SERVICE_IMAGE_QUALITY = 82
+SERVICE_IMAGE_WORKERS = int(os.getenv("SERVICE_IMAGE_WORKERS", 0)) or None  # None = CPU count
+
+# Services listing - keyset (cursor) pagination page size
+SERVICES_PAGE_SIZE = 24
+
+# Query budget (myapp.middleware.QueryBudgetMiddleware) - URL name -> max SQL queries per request.
+# Har budget myapp.tests.QueryBudgetTests ka measured worst case hai (cold cache, naye user ki pehli
+# visit jab UserProfile/NotificationCounter rows lazily bante hain) - headroom nahi, taaki koi bhi
+# nayi query (N+1) test mein pakdi jaye. Logged-in requests mein session + user = 2 queries.
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "30"))
+QUERY_BUDGETS = {
+    'home': 4,                     # index view hi
+    'index': 4,                    # featured services + category registry
+    'services': 4,                 # services page + category registry
+    'service_detail': 8,           # etag row, service+provider+category, images, avg, count, reviews+customer
+    'dashboard': 6,                # stats, recent bookings, service requests, my services
+    'admin_dashboard': 4,          # recent users, recent bookings (+ counters/rollups cache se)
+    'profile': 9,                  # UserProfile get+create, counter get+count+insert, booking stats, review stats
+    'profile_bookings': 5,         # count, page, total
+    'booking_detail': 3,           # booking + related (ek join)
+    'api_get_notifications': 5,    # counter get (+ pehli baar count + insert)
+}
+QUERY_BUDGET_DB_TIME_MS = int(os.environ["QUERY_BUDGET_DB_TIME_MS"]) if os.getenv("QUERY_BUDGET_DB_TIME_MS") else None
+# Tests mein True karein - budget todne wala request QueryBudgetExceeded raise karega
+QUERY_BUDGET_RAISE = os.getenv("QUERY_BUDGET_RAISE", "False") == "True"
+# /api/metrics/ scrape ke liye bearer token (khali = sirf staff login)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Server-Timing header + sampled latency histograms (myapp.middleware.ServerTimingMiddleware)
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "True") == "True"
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "0.1"))
+SERVER_TIMING_DUMP_INTERVAL = 300  # seconds - histograms fixfinder.log mein dump hote hain
+# Process exit par bache histograms bhi dump hon - sirf request serve karne wale processes (middleware load)
+SERVER_TIMING_DUMP_AT_EXIT = not TESTING and os.getenv("SERVER_TIMING_DUMP_AT_EXIT", "True") == "True"
+
+# Sampling profiler (myapp.middleware.SamplingProfilerMiddleware) - default sirf signed
+# X-FixFinder-Profile header (python manage.py profiler_token) wali requests profile hoti hain
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+PROFILER_DIR = os.getenv("PROFILER_DIR", str(BASE_DIR / 'profiles'))
+PROFILER_MAX_FILES = 200
+PROFILER_INTERVAL_MS = 5
+PROFILER_TOKEN_MAX_AGE = 3600  # seconds
+
+# Logging - performance warnings/histograms fixfinder.log mein
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'null': {
+            'class': 'logging.NullHandler',
+        },
+        'file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.getenv("LOG_FILE", str(BASE_DIR / 'fixfinder.log')),
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 3,
+            'formatter': 'verbose',
+        },
+    },
+    'loggers': {
+        'myapp.performance': {
+            'handlers': ['null'] if TESTING else ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 PASSWORD_RESET_TIMEOUT = 86400
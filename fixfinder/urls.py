@@ -20,11 +20,12 @@ from django.urls import path , include
 admin.site.site_header = " Hello Sachin"
 admin.site.site_title = "FixFinder Portal"
 admin.site.index_title = "Welcome to FixFinder Researcher Portal"
-from django.views.generic import TemplateView
+from myapp import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('/api/', include('myapp.urls')),
-    path('', TemplateView.as_view(template_name='index.html'), name='home'),
+    # Home page bhi index view se - featured services aur fragment cache context wahi deta hai
+    path('', views.index, name='home'),
     # Add other page routes as needed
 ]
\ No newline at end of file
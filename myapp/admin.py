@@ -11,7 +11,12 @@ from .models import (
     ServiceRequest, 
     ServiceResponse, 
     Notification,
-    UserProfile # Added UserProfile to the imports for registration
+    UserProfile, # Added UserProfile to the imports for registration
+    EmailOutbox,
+    NotificationJob,
+    PlatformCounter,
+    DailyMetric,
+    Locality,
 )
 
 # =======================================================
@@ -81,6 +86,7 @@ class CustomUserAdmin(UserAdmin):
 class ServiceImageInline(admin.TabularInline):
     model = ServiceImage
     extra = 1
+    readonly_fields = ('variants_status', 'variants_error')
 
 # =======================================================
 # 3. Main Model Registration
@@ -123,11 +129,13 @@ class BookingAdmin(admin.ModelAdmin):
     )
     list_filter = ('status', 'booking_date', 'service_date')
     search_fields = ('customer__username', 'provider__username', 'service_name')
+    list_select_related = ('customer', 'provider')
 
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ['service', 'customer', 'rating', 'created_at', 'is_approved']
+    list_select_related = ['service', 'customer']
     list_filter = ['rating', 'is_approved', 'created_at']
     search_fields = ['comment', 'service__title', 'customer__username']
     raw_id_fields = ['booking', 'customer', 'provider', 'service']
@@ -158,3 +166,34 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'user_type', 'phone', 'location', 'is_verified']
     list_filter = ['user_type', 'is_verified', 'created_at']
     search_fields = ['user__username', 'user__email', 'phone', 'business_name']
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'idempotency_key']
+    readonly_fields = ['idempotency_key', 'created_at', 'sent_at', 'last_error']
+    list_per_page = 50
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ['title', 'notification_type', 'status', 'created_count', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'notification_type']
+    exclude = ['user_ids']
+    readonly_fields = ['created_count', 'attempts', 'last_error', 'created_at', 'finished_at']
+
+@admin.register(PlatformCounter)
+class PlatformCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
+    readonly_fields = ['updated_at']
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    list_display = ['date', 'metric', 'value']
+    list_filter = ['metric']
+    date_hierarchy = 'date'
+
+@admin.register(Locality)
+class LocalityAdmin(admin.ModelAdmin):
+    list_display = ['city', 'area', 'state']
+    search_fields = ['city', 'area']
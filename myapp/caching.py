@@ -0,0 +1,168 @@
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# =======================================================
+# Cache helpers (stampede protection + versioned keys)
+# =======================================================
+# - get_or_compute(): single-flight recompute (lock key via cache.add) + probabilistic early
+#   refresh (XFetch) - hot key expire hone par saare workers ek saath DB par nahi girte.
+# - Namespace version counters: key mein version hota hai, bump_namespace() se poora namespace
+#   ek incr mein invalidate (purane keys TTL se nikal jate hain).
+# - Per-process LRU tier: versioned keys ke liye shared cache se pehle; chhota TTL taaki
+#   doosre process ka bump jaldi dikh jaye.
+# Sirf add/get/set/delete/incr use hote hain - LocMem aur file-based backends par bhi chalta hai.
+
+MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe in-process LRU (key -> value, expiry)."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalLRU(getattr(settings, 'CACHE_LOCAL_MAX_ENTRIES', 512))
+
+
+# ---------- namespace versions ----------
+
+def _version_key(namespace):
+    return f'ns-version:{namespace}'
+
+
+def namespace_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Time-based start: version key evict ho jaye to bhi purane keys se takraav nahi
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_namespace(namespace):
+    """Commit ke baad bump - warna parallel request purana data naye version par cache kar sakti hai."""
+    def bump():
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), int(time.time() * 1000), None)
+    transaction.on_commit(bump)
+
+
+def versioned_key(namespace, key):
+    return f'{namespace}:{namespace_version(namespace)}:{key}'
+
+
+# ---------- get_or_compute ----------
+
+def _should_refresh(delta, expires, beta):
+    """XFetch: expiry ke paas aate hi (recompute time ke hisaab se) random early refresh."""
+    if expires is None:
+        return False
+    return time.time() - delta * beta * math.log(random.random() or 1e-12) >= expires
+
+
+def _store(key, value, delta, timeout, lock_timeout):
+    expires = time.time() + timeout if timeout is not None else None
+    # Physical TTL mein lock_timeout ki grace - recompute ke dauran baaki workers stale value serve karein
+    cache.set(key, (value, delta, expires), timeout + lock_timeout if timeout is not None else None)
+
+
+def get_or_compute(key, compute, timeout, namespace=None, local_ttl=0, beta=1.0, lock_timeout=None):
+    """
+    Cached value lautata hai; miss/early-refresh par sirf ek worker `compute()` chalata hai.
+    namespace diya ho to key versioned hoti hai (bump_namespace se invalidate). local_ttl > 0
+    sirf namespaced keys ke liye - un-versioned keys delete se invalidate hoti hain jo doosre
+    processes ke local tier tak nahi pahunchta.
+    """
+    if namespace:
+        key = versioned_key(namespace, key)
+    elif local_ttl:
+        raise ValueError('local_ttl needs a namespace (versioned key)')
+    if lock_timeout is None:
+        lock_timeout = getattr(settings, 'CACHE_LOCK_TIMEOUT', 10)
+
+    if local_ttl:
+        value = local_cache.get(key)
+        if value is not MISSING:
+            return value
+
+    lock_key = f'lock:{key}'
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        entry = cache.get(key)
+        if entry is not None:
+            value, delta, expires = entry
+            stale = expires is not None and expires < time.time()
+            if not (stale or _should_refresh(delta, expires, beta)):
+                break
+            locked = cache.add(lock_key, 1, lock_timeout)
+            if not locked:
+                break  # Koi aur refresh kar raha hai - tab tak purani value
+        else:
+            locked = cache.add(lock_key, 1, lock_timeout)
+            if not locked and time.monotonic() < deadline:
+                time.sleep(0.05)  # Cold miss: lock holder ka result wait karo
+                continue
+            # Lock holder atak gaya (deadline) - khud compute, uska lock nahi chhedte
+
+        start = time.monotonic()
+        try:
+            value = compute()
+            _store(key, value, time.monotonic() - start, timeout, lock_timeout)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        break
+
+    if local_ttl:
+        local_cache.set(key, value, local_ttl)
+    return value
+
+
+def invalidate(*keys):
+    """Un-versioned keys commit ke baad delete (is process ka local tier bhi)."""
+    keys = [key for key in keys if key]
+    if keys:
+        def delete():
+            cache.delete_many(keys)
+            local_cache.delete(*keys)
+        transaction.on_commit(delete)
@@ -0,0 +1,74 @@
+import threading
+import time
+from django.conf import settings
+from .caching import bump_namespace, namespace_version
+from .models import ServiceCategory
+
+# =======================================================
+# ServiceCategory registry (process-local)
+# =======================================================
+# Chhoti, almost-static table jo lagbhag har page par chahiye. Har process ek baar load karta
+# hai; ServiceCategory save/delete (signals.py) ya create_categories namespace version bump
+# karte hain - har worker agle access par version compare karke reload karta hai.
+# Version sirf shared cache (Redis/Memcached) par doosre processes tak pahunchta hai; LocMem par
+# har process ka apna counter hai, isliye registry TTL ke baad bhi reload hoti hai (admin ya
+# doosre worker ki edit zyada se zyada TTL der tak purani dikhti hai).
+
+NAMESPACE = 'service-categories'
+TTL = getattr(settings, 'CATEGORY_REGISTRY_TTL', 60)
+
+
+class CategoryRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._categories = ()
+        self._by_id = {}
+
+    def _stale(self, version):
+        return version != self._version or time.monotonic() - self._loaded_at > TTL
+
+    def _current(self):
+        version = namespace_version(NAMESPACE)
+        if self._stale(version):
+            with self._lock:
+                if self._stale(version):
+                    categories = tuple(ServiceCategory.objects.order_by('id'))
+                    self._by_id = {category.pk: category for category in categories}
+                    self._categories = categories
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._categories
+
+    def all(self):
+        return self._current()
+
+    def get(self, pk):
+        self._current()
+        try:
+            return self._by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def reset(self):
+        with self._lock:
+            self._version = None
+
+
+registry = CategoryRegistry()
+
+
+def all_categories():
+    """Saari categories (id order) - shared instances hain, inhe modify/save na karein."""
+    return registry.all()
+
+
+def get_category(pk):
+    return registry.get(pk)
+
+
+def refresh_categories():
+    """Is process mein turant, baaki workers mein commit ke baad version bump se."""
+    registry.reset()
+    bump_namespace(NAMESPACE)
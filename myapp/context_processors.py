@@ -0,0 +1,9 @@
+from .categories import all_categories
+
+
+def categories(request):
+    """
+    `categories` har template mein. Function pass hota hai (call nahi) - template jab use kare
+    tabhi registry touch hoti hai, warna koi cache/DB access nahi.
+    """
+    return {'categories': all_categories}
@@ -0,0 +1,58 @@
+import hashlib
+from django.conf import settings
+from django.db.models import Max, Q
+from .models import Service
+from .notifications import unread_count
+from .pagecache import public_cache_version
+
+# =======================================================
+# Conditional GET (ETag) helpers
+# =======================================================
+# django.views.decorators.http.condition ke etag_func. Match hone par 304 view/template
+# chalne se pehle lautta hai. Catalogue version = public page cache ka namespace version
+# (Service/ServiceCategory/Review/TeamMember/provider writes par bump hota hai).
+# Logged-in pages mein user ka naam aur csrf token hota hai, isliye user id + csrf cookie
+# bhi ETag mein jate hain. Pending flash message ho to None - page render hona zaroori hai.
+
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _visitor(request):
+    if 'messages' in request.COOKIES:
+        return None
+    if not request.user.is_authenticated:
+        return 'anon'
+    return f'{request.user.pk}-{request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")}'
+
+
+def service_detail_etag(request, service_id):
+    visitor = _visitor(request)
+    if visitor is None:
+        return None
+    row = Service.objects.filter(pk=service_id, is_active=True).values('pk').annotate(
+        last_review=Max('reviews__created_at', filter=Q(reviews__is_approved=True)),
+    ).values_list('updated_at', 'last_review').order_by('pk').first()
+    if row is None:
+        return None  # 404 view hi dega
+    updated_at, last_review = row
+    # Page cache key mein bhi - doosre process (images worker) ki edit LocMem version bump ke bina dikhe
+    request.page_cache_stamp = f'{updated_at.isoformat()}:{last_review and last_review.isoformat()}'
+    return _etag('service', service_id, updated_at.isoformat(), last_review and last_review.isoformat(),
+                 public_cache_version(), visitor)
+
+
+def services_etag(request):
+    visitor = _visitor(request)
+    if visitor is None:
+        return None
+    return _etag('services', request.GET.urlencode(), public_cache_version(), visitor)
+
+
+def unread_count_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    # View isi value ko dobara use karta hai (counter ek hi baar padha jaye)
+    request.unread_count = unread_count(request.user)
+    return _etag('unread', request.user.pk, request.unread_count)
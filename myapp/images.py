@@ -0,0 +1,160 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Service, ServiceImage
+from .pagecache import bump_public_cache_version
+
+# =======================================================
+# ServiceImage variants pipeline
+# =======================================================
+# Upload request sirf original save karta hai (variants_status='pending'). `process_service_images`
+# worker pending images claim karke resizing ProcessPoolExecutor mein karata hai - Pillow ka CPU
+# kaam na request workers ko block karta hai na worker ke GIL ko. Har size ka WebP + JPEG banta hai;
+# EXIF orientation apply karke saara metadata (EXIF/GPS, ICC, comments) hata diya jata hai.
+
+# size -> max width/height (aspect ratio same rehta hai, chhoti images upscale nahi hoti)
+VARIANT_SIZES = getattr(settings, 'SERVICE_IMAGE_VARIANTS', {'thumb': 160, 'card': 480, 'full': 1600})
+VARIANT_QUALITY = getattr(settings, 'SERVICE_IMAGE_QUALITY', 82)
+BATCH_SIZE = getattr(settings, 'SERVICE_IMAGE_BATCH_SIZE', 20)
+# Claimed ('processing') rows itni der baad dobara pick ho jate hain (worker crash)
+LEASE_SECONDS = getattr(settings, 'SERVICE_IMAGE_LEASE_SECONDS', 600)
+VARIANT_DIR = 'service_images/variants'
+
+
+def render_variants(data, sizes=VARIANT_SIZES, quality=VARIANT_QUALITY):
+    """
+    Pool process mein chalta hai: original bytes -> {size: {'webp': bytes, 'jpeg': bytes, 'width', 'height'}}.
+    Sirf bytes in/out - DB/storage access parent process karta hai.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    variants = {}
+    for size, max_side in sizes.items():
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+        resized.info.clear()  # Metadata strip - encoders ko exif/icc kuch nahi milta
+
+        webp = io.BytesIO()
+        resized.save(webp, 'WEBP', quality=quality, method=4)
+        if has_alpha:
+            # JPEG mein alpha nahi hota - white background par flatten
+            flat = Image.new('RGB', resized.size, (255, 255, 255))
+            flat.paste(resized, mask=resized.getchannel('A'))
+        else:
+            flat = resized
+        jpeg = io.BytesIO()
+        flat.save(jpeg, 'JPEG', quality=quality, optimize=True, progressive=True)
+
+        variants[size] = {
+            'webp': webp.getvalue(),
+            'jpeg': jpeg.getvalue(),
+            'width': resized.width,
+            'height': resized.height,
+        }
+    return variants
+
+
+def make_pool(workers=None):
+    return ProcessPoolExecutor(max_workers=workers or getattr(settings, 'SERVICE_IMAGE_WORKERS', None) or os.cpu_count())
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """Pending (ya expired lease wali) images lease ke saath claim - parallel workers same row na uthayein."""
+    now = timezone.now()
+    due = ServiceImage.objects.filter(
+        Q(variants_status='pending')
+        | Q(variants_status='processing', variants_updated_at__lt=now - timedelta(seconds=LEASE_SECONDS))
+    ).order_by('id')
+    with transaction.atomic():
+        batch = list(due.select_for_update(skip_locked=True)[:batch_size])
+        if batch:
+            ServiceImage.objects.filter(pk__in=[image.pk for image in batch]).update(
+                variants_status='processing', variants_updated_at=now,
+            )
+    return batch
+
+
+def _read_original(image):
+    with image.image.open('rb') as handle:
+        return handle.read()
+
+
+def store_variants(image, rendered):
+    """Rendered bytes ko storage mein likhkar ServiceImage.variants update karta hai."""
+    storage = image.image.storage
+    variants = {}
+    for size, files in rendered.items():
+        entry = {'width': files['width'], 'height': files['height']}
+        for fmt, ext in (('webp', 'webp'), ('jpeg', 'jpg')):
+            name = f'{VARIANT_DIR}/{image.pk}/{size}.{ext}'
+            if storage.exists(name):
+                storage.delete(name)  # Reprocess par purani file overwrite (storage suffix na lagaye)
+            entry[fmt] = storage.save(name, ContentFile(files[fmt]))
+        variants[size] = entry
+    ServiceImage.objects.filter(pk=image.pk).update(
+        variants=variants, variants_status='done', variants_error='', variants_updated_at=timezone.now(),
+    )
+    return variants
+
+
+def mark_failed(image, error):
+    ServiceImage.objects.filter(pk=image.pk).update(
+        variants_status='failed', variants_error=str(error)[:2000], variants_updated_at=timezone.now(),
+    )
+
+
+def process_batch(batch, pool):
+    """
+    Batch ki saari images pool mein ek saath resize hoti hain. Returns (done, failed) counts.
+    Missing/corrupt original par sirf woh image 'failed' hoti hai.
+    """
+    futures = {}
+    failed = 0
+    for image in batch:
+        try:
+            futures[image] = pool.submit(render_variants, _read_original(image))
+        except (OSError, ValueError) as e:
+            mark_failed(image, e)
+            failed += 1
+
+    done = []
+    for image, future in futures.items():
+        try:
+            store_variants(image, future.result())
+            done.append(image)
+        except Exception as e:
+            mark_failed(image, e)
+            failed += 1
+    if done:
+        touch_services(done)
+    return len(done), failed
+
+
+def touch_services(images):
+    """
+    Cached service_detail pages / ETags mein ab variant URLs aane chahiye (update() signals nahi
+    chalata). Worker alag process hai - LocMem par version bump web process tak nahi pahunchta,
+    isliye Service.updated_at bhi badalte hain: ETag aur service_detail ka page cache key usi se bante hain.
+    """
+    Service.objects.filter(pk__in={image.service_id for image in images}).update(updated_at=timezone.now())
+    bump_public_cache_version()
+
+
+def delete_variants(image):
+    storage = image.image.storage
+    for entry in image.variants.values():
+        for fmt in ('webp', 'jpeg'):
+            if entry.get(fmt) and storage.exists(entry[fmt]):
+                storage.delete(entry[fmt])
@@ -0,0 +1,100 @@
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+from .models import EmailOutbox
+from .timing import timed
+
+# Outbox worker settings (settings.py mein override kar sakte hain)
+BATCH_SIZE = getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 6)
+RETRY_BASE_SECONDS = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', 60)
+RETRY_MAX_SECONDS = getattr(settings, 'EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600)
+# Claimed rows itni der tak doosre workers ko nahi dikhte (crash hone par phir se pick ho jayenge)
+LEASE_SECONDS = getattr(settings, 'EMAIL_OUTBOX_LEASE_SECONDS', 300)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list, idempotency_key=None):
+    """
+    send_mail() ka drop-in replacement: email ko EmailOutbox mein daalta hai, bhejta nahi.
+    Same idempotency_key ke saath dobara call karna no-op hai.
+    """
+    if not idempotency_key:
+        idempotency_key = uuid.uuid4().hex
+    with timed('email'):
+        outbox, created = EmailOutbox.objects.get_or_create(
+            idempotency_key=idempotency_key,
+            defaults={
+                'subject': subject[:255],
+                'body': message,
+                'from_email': from_email or settings.DEFAULT_FROM_EMAIL,
+                'to': list(recipient_list),
+            }
+        )
+    return outbox
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1m, 2m, 4m ... RETRY_MAX_SECONDS tak."""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size=BATCH_SIZE):
+    """
+    Due pending emails ka ek batch lease ke saath claim karta hai, taaki parallel workers
+    same row do baar na bhejein.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at')
+        batch = list(due.select_for_update(skip_locked=True)[:batch_size])
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[item.pk for item in batch]).update(
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS)
+            )
+    return batch
+
+
+def deliver_batch(batch, connection):
+    """
+    Batch ko ek hi (already open) connection par bhejta hai. Returns (sent, failed) counts.
+    """
+    sent = failed = 0
+    for item in batch:
+        message = EmailMessage(
+            subject=item.subject,
+            body=item.body,
+            from_email=item.from_email,
+            to=item.to,
+            headers={'X-FixFinder-Idempotency-Key': item.idempotency_key},
+            connection=connection,
+        )
+        try:
+            connection.send_messages([message])
+        except Exception as e:
+            failed += 1
+            item.attempts += 1
+            item.last_error = str(e)
+            if item.attempts >= MAX_ATTEMPTS:
+                item.status = 'failed'
+            else:
+                item.next_attempt_at = timezone.now() + retry_delay(item.attempts)
+            item.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+            # Connection toot gaya ho sakta hai - baaki batch ke liye reopen.
+            # Reopen bhi fail ho to baaki rows lease expire hone par dobara pick hongi.
+            try:
+                connection.close()
+                connection.open()
+            except Exception:
+                break
+            continue
+        
+        sent += 1
+        item.status = 'sent'
+        item.attempts += 1
+        item.sent_at = timezone.now()
+        item.last_error = ''
+        item.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+    return sent, failed
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from myapp.models import CustomUser, Locality, ProviderMatch, Service, ServiceRequest
+from myapp.utils import parse_location
+
+
+class Command(BaseCommand):
+    help = (
+        'Parse free-text locations into Locality rows and fill the locality FK on users, services '
+        'and service requests (plus ServiceRequest.city and ProviderMatch city keys)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-parse every row, not just rows without a locality (use after parser changes)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows updated per bulk_update',
+        )
+
+    def handle(self, *args, **options):
+        self.localities = {}
+        for model in (CustomUser, Service, ServiceRequest):
+            updated = self.backfill(model, options['all'], options['batch_size'])
+            self.stdout.write(f'{model.__name__}: {updated} rows updated')
+        fixed = self.sync_provider_matches(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(self.localities)} localities in use, {fixed} providers had stale match keys.'
+        ))
+
+    def resolve(self, location):
+        """Location -> Locality id (process cache, taaki har row par get_or_create na ho)."""
+        city, area, state = parse_location(location)
+        if not city:
+            return None
+        if (city, area) not in self.localities:
+            locality, _ = Locality.objects.get_or_create(city=city, area=area, defaults={'state': state})
+            self.localities[(city, area)] = locality.pk
+        return self.localities[(city, area)]
+
+    def backfill(self, model, everything, batch_size):
+        fields = ['locality', 'city'] if model is ServiceRequest else ['locality']
+        queryset = model.objects.all() if everything else model.objects.filter(locality__isnull=True)
+        last_id = updated = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id').only('id', 'location', *fields)[:batch_size])
+            if not batch:
+                return updated
+            last_id = batch[-1].id
+            changed = []
+            for obj in batch:
+                locality_id = self.resolve(obj.location)
+                city = parse_location(obj.location)[0]
+                if obj.locality_id != locality_id or (model is ServiceRequest and obj.city != city):
+                    obj.locality_id = locality_id
+                    if model is ServiceRequest:
+                        obj.city = city
+                    changed.append(obj)
+            # bulk_update save()/signals bypass karta hai - location khud nahi badli
+            with transaction.atomic():
+                model.objects.bulk_update(changed, fields)
+            updated += len(changed)
+
+    def sync_provider_matches(self, batch_size):
+        """
+        Har provider ke ProviderMatch keys ko current profile (naye parser ki city) se milata hai -
+        woh providers bhi jinke abhi koi rows nahi hain; non-providers ki bachi rows hat jati hain.
+        """
+        keys = defaultdict(set)
+        for provider_id, category, city in ProviderMatch.objects.values_list('provider_id', 'category', 'city'):
+            keys[provider_id].add((category, city))
+        fixed = 0
+        providers = CustomUser.objects.filter(user_type='provider').prefetch_related('service_categories')
+        last_id = 0
+        while True:
+            batch = list(providers.filter(id__gt=last_id).order_by('id')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for provider in batch:
+                if keys.pop(provider.id, set()) != ProviderMatch.keys_for(provider):
+                    ProviderMatch.rebuild_for(provider)
+                    fixed += 1
+        # Bache hue keys un users ke hain jo ab provider nahi rahe
+        for user in CustomUser.objects.filter(id__in=list(keys)):
+            ProviderMatch.rebuild_for(user)
+            fixed += 1
+        return fixed
@@ -0,0 +1,205 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from myapp.middleware import QueryCounter
+from myapp.models import CustomUser
+from myapp.pagecache import bump_public_cache_version
+from myapp.seeding import DEFAULT_VOLUMES, SEED_EMAIL_DOMAIN, scaled_volumes, seed_database
+
+
+def percentile(values, quantile):
+    """Nearest-rank percentile (sorted list)."""
+    if not values:
+        return None
+    index = max(int(-(-quantile * len(values) // 1)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=settings.BASE_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database with create_sample_data-style bulk data and measure '
+        'latency (p50/p95/p99) and query counts of the hot views. Results are written as JSON '
+        'so runs can be compared across commits'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1, help='Multiplier for the default seed volumes')
+        for name in DEFAULT_VOLUMES:
+            parser.add_argument(f'--{name.replace("_", "-")}', dest=name, type=int,
+                                help=f'Number of {name.replace("_", " ")} to seed (overrides --scale)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated data')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes used to generate data')
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--scenario', action='append', default=[], help='Only run this scenario (repeatable)')
+        parser.add_argument('--output', default='', help='JSON result file (default benchmarks/<time>-<commit>.json)')
+        parser.add_argument('--compare', default='', help='Previous JSON result to print deltas against')
+        parser.add_argument('--page-cache', action='store_true',
+                            help='Keep the public page/fragment cache warm (default: every request renders the view)')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep and reuse the test database (skips seeding if it already has seed users)')
+
+    # ---------- scenarios ----------
+    def scenarios(self, customer, provider):
+        """name -> (user, method, url, data)."""
+        request_data = {
+            'category': 'plumbing', 'title': 'Kitchen sink leaking',
+            'description': 'Water leaking below the kitchen sink since morning, need someone today.',
+            'location': provider.location, 'urgency': 'medium', 'budget': '500-1000',
+            'contact_name': customer.get_full_name(), 'contact_phone': customer.phone,
+        }
+        services = reverse('services')
+        return {
+            'index': (None, 'get', reverse('index'), None),
+            'services_rating': (None, 'get', services, {'sort': 'rating'}),
+            'services_price': (None, 'get', services, {'sort': 'price-low'}),
+            'services_search': (None, 'get', services, {'search': 'plumbing repair'}),
+            'dashboard_customer': (customer, 'get', reverse('dashboard'), None),
+            'dashboard_provider': (provider, 'get', reverse('dashboard'), None),
+            'available_requests': (provider, 'get', reverse('available_requests'), None),
+            'post_service_request_get': (customer, 'get', reverse('post_service_request'), None),
+            'post_service_request_post': (customer, 'post', reverse('post_service_request'), request_data),
+        }
+
+    def measure(self, client, method, url, data, iterations, warmup, page_cache=False):
+        timings, queries, statuses = [], [], {}
+        for run in range(warmup + iterations):
+            if not page_cache:
+                # Anonymous pages warna cache hit naapte - version bump se har request view tak jata hai
+                bump_public_cache_version()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                elapsed = (time.perf_counter() - start) * 1000
+            if run < warmup:
+                continue
+            timings.append(elapsed)
+            queries.append(counter.count)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        timings.sort()
+        queries.sort()
+        return {
+            'n': len(timings),
+            'status': statuses,
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'mean_ms': round(sum(timings) / len(timings), 2),
+            'min_ms': round(timings[0], 2),
+            'max_ms': round(timings[-1], 2),
+            'queries_p50': percentile(queries, 0.50),
+            'queries_max': queries[-1],
+        }
+
+    # ---------- main ----------
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        volumes = scaled_volumes(options['scale'], {name: options[name] for name in DEFAULT_VOLUMES})
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            seeded = CustomUser.objects.filter(username__endswith=f'@{SEED_EMAIL_DOMAIN}').exists()
+            if not (options['keepdb'] and seeded):
+                self.stdout.write(f'Seeding {volumes} (seed {options["seed"]})...')
+                start = time.perf_counter()
+                seed_database(volumes, seed=options['seed'], workers=max(options['workers'], 1), log=lambda message: self.stdout.write(f'  {message}'))
+                self.stdout.write(f'Seeded in {time.perf_counter() - start:.1f}s')
+            # Benchmark ke Client requests ke histograms exit par fixfinder.log mein na jayein
+            with override_settings(SERVER_TIMING_DUMP_AT_EXIT=False):
+                results = self.run_scenarios(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        commit, dirty = git_revision()
+        report = {
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'seed': options['seed'],
+                'volumes': volumes,
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'page_cache': options['page_cache'],
+            },
+            'scenarios': results,
+        }
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' / (
+            f'{time.strftime("%Y%m%d-%H%M%S")}-{commit}{"-dirty" if dirty else ""}.json'
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + '\n')
+
+        previous = self.load_previous(options['compare'])
+        self.print_table(results, previous)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+    def run_scenarios(self, options):
+        customer = CustomUser.objects.filter(username=f'customer0@{SEED_EMAIL_DOMAIN}').first()
+        provider = CustomUser.objects.filter(username=f'provider0@{SEED_EMAIL_DOMAIN}').first()
+        if not customer or not provider:
+            raise CommandError('Seed users missing - run without --keepdb to reseed')
+        scenarios = self.scenarios(customer, provider)
+        unknown = set(options['scenario']) - set(scenarios)
+        if unknown:
+            raise CommandError(f'Unknown scenario(s): {", ".join(sorted(unknown))}. Choices: {", ".join(scenarios)}')
+
+        results = {}
+        for name, (user, method, url, data) in scenarios.items():
+            if options['scenario'] and name not in options['scenario']:
+                continue
+            client = Client(raise_request_exception=False)
+            if user:
+                client.force_login(user)
+            results[name] = self.measure(client, method, url, data, options['iterations'], options['warmup'],
+                                         options['page_cache'])
+            self.stdout.write(f'  {name}: p50 {results[name]["p50_ms"]} ms, {results[name]["queries_p50"]} queries')
+        return results
+
+    def load_previous(self, path):
+        if not path:
+            return {}
+        try:
+            return json.loads(Path(path).read_text()).get('scenarios', {})
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+
+    def print_table(self, results, previous):
+        self.stdout.write(f'\n{"scenario":<28}{"p50":>10}{"p95":>10}{"p99":>10}{"queries":>9}')
+        for name, stats in results.items():
+            row = f'{name:<28}{stats["p50_ms"]:>10}{stats["p95_ms"]:>10}{stats["p99_ms"]:>10}{stats["queries_p50"]:>9}'
+            before = previous.get(name)
+            if before:
+                change = (stats['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0
+                row += f'   p50 {change:+.1f}%, queries {stats["queries_p50"] - before["queries_p50"]:+d}'
+            self.stdout.write(row)
@@ -0,0 +1,150 @@
+import re
+from datetime import datetime, timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from myapp.models import Booking, Notification, Review, Service, ServiceRequest
+from myapp.pagination import SERVICE_SORT_KEYS, keyset_filter
+
+# Hot query -> (queryset factory, index jo models.py mein iske liye bana hai).
+# Ids/values kuch bhi hon - plan sirf query ke shape par depend karta hai.
+HOT_QUERIES = {
+    'booking_customer_recent': (
+        lambda: Booking.objects.filter(customer_id=1).order_by('-booking_date')[:5], 'booking_customer_recent_idx'),
+    'booking_provider_recent': (
+        lambda: Booking.objects.filter(provider_id=1).order_by('-booking_date')[:5], 'booking_provider_recent_idx'),
+    'booking_customer_status': (
+        lambda: Booking.objects.filter(customer_id=1, status='completed').order_by('-booking_date'),
+        'booking_customer_status_idx'),
+    'booking_provider_status': (
+        lambda: Booking.objects.filter(provider_id=1, status='pending').order_by('-booking_date'),
+        'booking_provider_status_idx'),
+    'notification_list': (
+        lambda: Notification.objects.filter(user_id=1).order_by('-created_at')[:20], 'notification_user_recent_idx'),
+    'notification_unread': (
+        lambda: Notification.objects.filter(user_id=1, is_read=False).order_by('-created_at'), 'notification_unread_idx'),
+    'request_status_category': (
+        lambda: ServiceRequest.objects.filter(status='open', category='plumbing').order_by('-created_at'),
+        'request_status_category_idx'),
+    'request_customer': (
+        lambda: ServiceRequest.objects.filter(customer_id=1).order_by('-created_at'), 'request_customer_recent_idx'),
+    'request_open_match': (
+        lambda: ServiceRequest.objects.filter(city='mumbai', category='plumbing', status='open').order_by('-created_at'),
+        'request_open_match_idx'),
+    'review_provider': (
+        lambda: Review.objects.filter(provider_id=1).order_by('-created_at'), 'review_provider_recent_idx'),
+    'review_customer': (
+        lambda: Review.objects.filter(customer_id=1).order_by('-created_at'), 'review_customer_recent_idx'),
+    'review_service_approved': (
+        lambda: Review.objects.filter(service_id=1, is_approved=True).order_by('-created_at')[:10],
+        'review_service_approved_idx'),
+    'services_category': (
+        lambda: Service.objects.filter(is_active=True, category_id=1).order_by('-rating', '-id')[:24],
+        'service_active_category_idx'),
+}
+
+# services listing: har sort ka pehla page aur cursor (keyset) page. Inka order bhi index se aana
+# chahiye - temp sort (SQLite `USE TEMP B-TREE FOR ORDER BY`, PostgreSQL `Sort`) failure hai.
+LISTING_INDEXES = {
+    'rating': 'service_active_rating_idx',
+    'reviews': 'service_active_reviews_idx',
+    'price-low': 'service_active_price_min_idx',
+    'price-high': 'service_active_price_max_idx',
+    'newest': 'service_active_newest_idx',
+}
+CURSOR_SAMPLE = {
+    'rating': 4.5, 'reviews_count': 10, 'price_min': 500, 'price_max': 500,
+    'created_at': datetime(2025, 1, 1, tzinfo=timezone.utc), 'id': 100,
+}
+
+
+def listing_query(sort, cursor=False):
+    keys = SERVICE_SORT_KEYS[sort]
+    queryset = Service.objects.filter(is_active=True).order_by(
+        *[F(field).desc() if descending else F(field).asc() for field, descending in keys]
+    )
+    if cursor:
+        queryset = queryset.filter(keyset_filter(keys, [CURSOR_SAMPLE[field] for field, _ in keys]))
+    return queryset[:25]
+
+
+for _sort, _index in LISTING_INDEXES.items():
+    HOT_QUERIES[f'services_{_sort}'] = (lambda sort=_sort: listing_query(sort), _index)
+    HOT_QUERIES[f'services_{_sort}_cursor'] = (lambda sort=_sort: listing_query(sort, cursor=True), _index)
+ORDERED_QUERIES = {name for name in HOT_QUERIES if name.startswith('services_') and name != 'services_category'}
+
+
+def plan_indexes(plan, table, ordered=False):
+    """
+    EXPLAIN output se `table` par use hue indexes. None = full table scan.
+    SQLite: `SEARCH t USING INDEX x` / PostgreSQL: `Index Scan using x on t`, `Bitmap Index Scan on x`.
+    `ordered` (ORDER BY ... LIMIT listing) par SQLite ka `SCAN t USING INDEX x` bhi chalega - woh
+    index order mein walk karke LIMIT par ruk jata hai.
+    """
+    if connection.vendor == 'postgresql':
+        if re.search(rf'Seq Scan on {table}\b', plan):
+            return None
+        found = re.findall(rf'Index (?:Only )?Scan(?: Backward)? using (\w+) on {table}\b', plan)
+        found += re.findall(r'Bitmap Index Scan on (\w+)', plan)
+        return found or None
+    found = re.findall(rf'{"(?:SEARCH|SCAN)" if ordered else "SEARCH"} {table} USING (?:COVERING )?INDEX (\w+)', plan)
+    return found or None
+
+
+def explain(queryset):
+    """queryset ka EXPLAIN output (PostgreSQL par seq scan off - sirf index usability check)."""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # Chhoti/empty tables par planner seq scan choose karta hai - hum sirf
+            # yeh check karte hain ki index usable hai
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+
+def plan_sorts(plan):
+    """ORDER BY index ke bajaye alag sort step se ho raha hai?"""
+    if connection.vendor == 'postgresql':
+        return bool(re.search(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b', plan, re.MULTILINE))
+    return 'USE TEMP B-TREE FOR ORDER BY' in plan
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot filter queries and fail if any of them falls back to a full table scan '
+        '(SQLite and PostgreSQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full EXPLAIN output for every query',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Query plan checks support SQLite and PostgreSQL, not {connection.vendor}')
+
+        failures = []
+        for name, (build, expected) in HOT_QUERIES.items():
+            queryset = build()
+            plan = explain(queryset)
+
+            used = plan_indexes(plan, queryset.model._meta.db_table, ordered=name in ORDERED_QUERIES)
+            if options['verbose_plans']:
+                self.stdout.write(f'--- {name}\n{plan}')
+            if used is None:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'❌ {name}: full table scan (expected {expected})'))
+            elif name in ORDERED_QUERIES and plan_sorts(plan):
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'❌ {name}: sorts in a temp structure (expected {expected} order)'))
+            elif expected not in used:
+                self.stdout.write(self.style.WARNING(f'⚠️  {name}: uses {", ".join(used)} (expected {expected})'))
+            else:
+                self.stdout.write(f'✅ {name}: {expected}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries are not fully index-backed: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'All {len(HOT_QUERIES)} hot queries use an index ({connection.vendor})'))
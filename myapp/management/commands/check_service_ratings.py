@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+from myapp.models import Service
+
+
+class Command(BaseCommand):
+    help = 'Find (and optionally repair) drift between Service.rating/reviews_count and approved reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Write the recomputed values back to drifted services',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of services to check per query',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = drifted = 0
+        last_id = 0
+        
+        while True:
+            batch = list(
+                Service.objects.filter(id__gt=last_id).order_by('id').annotate(
+                    actual_total=Sum('reviews__rating', filter=Q(reviews__is_approved=True)),
+                    actual_count=Count('reviews', filter=Q(reviews__is_approved=True)),
+                ).only('id', 'title', 'rating', 'rating_total', 'reviews_count')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            checked += len(batch)
+            
+            changed = []
+            for service in batch:
+                actual_total = service.actual_total or 0
+                actual_rating = round(actual_total / service.actual_count, 4) if service.actual_count else 0.0
+                if (service.reviews_count != service.actual_count or service.rating_total != actual_total
+                        or round(service.rating, 4) != actual_rating):
+                    self.stdout.write(
+                        f'Service #{service.id} "{service.title}": '
+                        f'stored {service.rating}/{service.reviews_count}, actual {actual_rating}/{service.actual_count}'
+                    )
+                    service.rating = actual_rating
+                    service.rating_total = actual_total
+                    service.reviews_count = service.actual_count
+                    changed.append(service)
+            
+            drifted += len(changed)
+            if options['fix'] and changed:
+                # bulk_update updated_at nahi chhedta - sirf rating columns
+                Service.objects.bulk_update(changed, ['rating', 'rating_total', 'reviews_count'])
+        
+        action = 'Repaired' if options['fix'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(f'{action} {drifted} drifted services out of {checked} checked.'))
@@ -1,5 +1,6 @@
 # management/commands/create_categories.py
 from django.core.management.base import BaseCommand
+from myapp.categories import refresh_categories
 from myapp.models import ServiceCategory
 
 class Command(BaseCommand):
@@ -29,6 +30,8 @@ class Command(BaseCommand):
                     self.style.SUCCESS(f'Created category: {cat_data["name"]}')
                 )
         
+        # Saare workers ki in-process category registry reload ho (existing rows par signal nahi chalta)
+        refresh_categories()
         self.stdout.write(
             self.style.SUCCESS('Successfully created all categories!')
         )
\ No newline at end of file
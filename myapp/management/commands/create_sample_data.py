@@ -2,6 +2,8 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from myapp.models import ServiceCategory, Service, CustomUser
 from django.db import transaction
+from myapp.seeding import seed_database, scaled_volumes, SEED_PASSWORD
+import os
 import random
 from datetime import datetime, timedelta
 
@@ -14,6 +16,24 @@ class Command(BaseCommand):
             action='store_true',
             help='Delete existing data before creating sample data',
         )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=0,
+            help='Also bulk-generate synthetic data: 1 = ~1k customers, 100 providers, 1k services, 5k bookings',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for --scale data (same seed = same data)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used to generate --scale data',
+        )
     
     def handle(self, *args, **options):
         reset = options['reset']
@@ -32,6 +52,17 @@ class Command(BaseCommand):
                 self.create_users()
                 self.create_services()
                 
+            # Bulk mode - synthetic users ka password sab ke liye same (seeding.SEED_PASSWORD)
+            if options['scale'] > 0:
+                self.stdout.write(f'Generating synthetic data (scale {options["scale"]}, seed {options["seed"]})...')
+                plan = seed_database(
+                    scaled_volumes(options['scale']),
+                    seed=options['seed'],
+                    workers=max(options['workers'], 1),
+                    log=lambda message: self.stdout.write(f'  {message}'),
+                )
+                self.stdout.write(f'  Login: {plan.username("customer", 0)} / {plan.username("provider", 0)}, password {SEED_PASSWORD}')
+                
             self.stdout.write(
                 self.style.SUCCESS('✅ Sample data created successfully!')
             )
@@ -49,7 +80,7 @@ class Command(BaseCommand):
             {'name': 'Electrical', 'icon': '⚡', 'description': 'Certified electrical work including wiring, repairs, and installations with safety standards.'},
             {'name': 'AC Repair', 'icon': '❄️', 'description': 'AC maintenance, repair, and installation services for all brands and models.'},
             {'name': 'Carpentry', 'icon': '🔨', 'description': 'Custom carpentry work including furniture, doors, windows, and woodwork repairs.'},
-            {'name': 'Appliance', 'icon': '🔧', 'description': 'Home appliance repair services for washing machines, refrigerators, and other appliances.'},
+            {'name': 'Appliance Repair', 'icon': '🔧', 'description': 'Home appliance repair services for washing machines, refrigerators, and other appliances.'},
             {'name': 'Cleaning', 'icon': '🧽', 'description': 'Professional home and office cleaning services with eco-friendly products.'},
             {'name': 'Painting', 'icon': '🎨', 'description': 'Interior and exterior painting services with quality materials and finishes.'},
             {'name': 'Pest Control', 'icon': '🐜', 'description': 'Professional pest control services for homes and offices with safe chemicals.'},
@@ -121,7 +152,7 @@ class Command(BaseCommand):
                 'phone': '+91 9876543212',
                 'location': 'Bangalore, Karnataka',
                 'experience': '10 years',
-                'categories': ['AC Repair', 'Appliance']
+                'categories': ['AC Repair', 'Appliance Repair']
             },
             {
                 'email': 'sneha.clean@fixfinder.com',
@@ -326,7 +357,7 @@ class Command(BaseCommand):
             {
                 'title': 'Home Appliance Repair',
                 'description': 'Expert repair services for washing machines, refrigerators, microwaves, and other home appliances. Genuine spare parts with warranty on service.',
-                'category': 'Appliance',
+                'category': 'Appliance Repair',
                 'price_range': '₹400-1800',
                 'location': 'Bangalore, Karnataka',
                 'experience': '6 years',
@@ -0,0 +1,59 @@
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge collapsed-stack profiles written by SamplingProfilerMiddleware into one '
+        'flame-graph-ready file (flamegraph.pl, speedscope, inferno)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view',
+            action='append',
+            default=[],
+            help='Only merge profiles for this URL name (repeatable). Default: all views',
+        )
+        parser.add_argument(
+            '--output',
+            default='',
+            help='Write merged stacks to this file instead of stdout',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Number of hottest leaf frames to summarize',
+        )
+
+    def handle(self, *args, **options):
+        root = Path(getattr(settings, 'PROFILER_DIR', 'profiles'))
+        directories = [root / view.replace(':', '_') for view in options['view']] or [root]
+        files = [path for directory in directories for path in directory.glob('**/*.collapsed')]
+        if not files:
+            raise CommandError(f'No profiles found under {root}')
+        
+        stacks = Counter()
+        for path in files:
+            for line in path.read_text().splitlines():
+                stack, _, count = line.rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+        
+        merged = ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+        if options['output']:
+            Path(options['output']).write_text(merged)
+        else:
+            self.stdout.write(merged, ending='')
+        
+        # Summary stderr par, taaki stdout seedha flamegraph.pl mein pipe ho sake
+        total = sum(stacks.values())
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        self.stderr.write(f'Merged {len(files)} profiles, {total} samples.')
+        for frame, count in leaves.most_common(options['top']):
+            self.stderr.write(f'{count / total:6.1%}  {frame}')
@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand
+from myapp.notifications import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Deliver deferred notification fan-out jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when there are no pending jobs',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process pending jobs once and exit instead of running as a worker',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_job()
+            if job:
+                # Claim ke bahar run - har chunk apna transaction commit karta hai
+                run_job(job)
+                style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+                message = f'Job #{job.pk}: {job.status}, {job.created_count}/{len(job.user_ids)} notifications'
+                if job.status == 'pending':
+                    message += f' (attempt {job.attempts} failed: {job.last_error}, retry at {job.next_attempt_at:%H:%M:%S})'
+                self.stdout.write(style(message))
+                continue
+            
+            if options['once']:
+                break
+            time.sleep(options['interval'])
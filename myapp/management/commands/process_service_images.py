@@ -0,0 +1,64 @@
+import time
+from django.core.management.base import BaseCommand
+from myapp.images import BATCH_SIZE, claim_batch, make_pool, process_batch
+from myapp.models import ServiceImage
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants (thumb, card, full) for uploaded service images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Images claimed and resized in parallel per round',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Resize processes (default SERVICE_IMAGE_WORKERS or CPU count)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when there are no pending images',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the pending backlog once and exit instead of running as a worker',
+        )
+        parser.add_argument(
+            '--reprocess',
+            choices=('failed', 'all'),
+            help='Queue failed (or all) images again before processing, e.g. after changing sizes',
+        )
+
+    def handle(self, *args, **options):
+        if options['reprocess']:
+            images = ServiceImage.objects.all()
+            if options['reprocess'] == 'failed':
+                images = images.filter(variants_status='failed')
+            queued = images.update(variants_status='pending', variants_error='')
+            self.stdout.write(f'Queued {queued} images for processing')
+
+        total_done = total_failed = 0
+        with make_pool(options['workers']) as pool:
+            while True:
+                batch = claim_batch(options['batch_size'])
+                if not batch:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                done, failed = process_batch(batch, pool)
+                total_done += done
+                total_failed += failed
+                style = self.style.SUCCESS if not failed else self.style.WARNING
+                self.stdout.write(style(f'{done} images processed, {failed} failed'))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Done: {total_done} processed, {total_failed} failed.'))
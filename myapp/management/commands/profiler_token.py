@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from myapp.middleware import PROFILE_HEADER, make_profile_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed header value that makes SamplingProfilerMiddleware profile a request'
+
+    def handle(self, *args, **options):
+        max_age = getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 3600)
+        self.stdout.write(f'{PROFILE_HEADER}: {make_profile_token()}')
+        self.stderr.write(f'Valid for {max_age} seconds, e.g. curl -H "{PROFILE_HEADER}: <token>" <url>')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from myapp.metrics import reconcile_counters, rebuild_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute PlatformCounter totals and DailyMetric rollups from source tables (run periodically, e.g. nightly cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Rebuild daily rollups for this many recent days (0 = full history)',
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters()
+        for name, (stored, actual) in drift.items():
+            self.stdout.write(f'Counter "{name}": stored {stored}, actual {actual}')
+        
+        rows = rebuild_daily_metrics(options['days'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired {len(drift)} drifted counters; rebuilt {rows} daily metric rows.'
+        ))
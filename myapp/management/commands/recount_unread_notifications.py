@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from myapp.models import Notification, NotificationCounter
+from myapp.notifications import recount_unread
+
+
+class Command(BaseCommand):
+    help = 'Find and repair drift between NotificationCounter and unread Notification rows'
+
+    def handle(self, *args, **options):
+        actual = dict(
+            Notification.objects.filter(is_read=False).values_list('user_id').annotate(total=Count('id'))
+        )
+        stored = dict(NotificationCounter.objects.values_list('user_id', 'unread'))
+        
+        repaired = 0
+        for user_id in set(actual) | set(stored):
+            if actual.get(user_id, 0) != stored.get(user_id, 0):
+                recount_unread(user_id)
+                repaired += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'Repaired {repaired} unread counters.'))
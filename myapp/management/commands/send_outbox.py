@@ -0,0 +1,54 @@
+import time
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from myapp.mail import BATCH_SIZE, claim_batch, deliver_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued EmailOutbox messages in batches over a single SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of emails to send per connection',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when the outbox is empty',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit instead of running as a worker',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        
+        while True:
+            batch = claim_batch(batch_size)
+            
+            if not batch:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            
+            # Poore batch ke liye ek hi connection (ek TLS handshake)
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    sent, failed = deliver_batch(batch, connection)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ Could not open mail connection: {e}'))
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            
+            self.stdout.write(f'📧 Sent {sent} emails, {failed} failed')
+        
+        self.stdout.write(self.style.SUCCESS('Outbox drained.'))
@@ -0,0 +1,158 @@
+from collections import Counter
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import CustomUser, Service, Booking, ServiceRequest, ContactMessage, PlatformCounter, DailyMetric
+
+# =======================================================
+# Metric definitions
+# =======================================================
+# Admin dashboard in counters/rollups ko padhta hai - har load par full-table COUNT(*) nahi.
+
+# counter name -> (model, filters)
+PLATFORM_COUNTERS = {
+    'users': (CustomUser, {}),
+    'providers': (CustomUser, {'user_type': 'provider'}),
+    'customers': (CustomUser, {'user_type': 'customer'}),
+    'services': (Service, {}),
+    'bookings': (Booking, {}),
+    'requests': (ServiceRequest, {}),
+    'contact_messages': (ContactMessage, {}),
+}
+
+# daily metric -> (model, date field, filters)
+DAILY_METRICS = {
+    'bookings': (Booking, 'booking_date', {}),
+    'new_users': (CustomUser, 'date_joined', {}),
+    'new_providers': (CustomUser, 'date_joined', {'user_type': 'provider'}),
+    'new_customers': (CustomUser, 'date_joined', {'user_type': 'customer'}),
+    'service_requests': (ServiceRequest, 'created_at', {}),
+}
+
+TRACKED_MODELS = {model for model, _ in PLATFORM_COUNTERS.values()}
+
+
+def _matches(instance, filters):
+    return all(getattr(instance, field) == value for field, value in filters.items())
+
+
+def metric_keys(instance):
+    """Instance kin counters aur (metric, date) rollups mein count hota hai."""
+    counters = [
+        name for name, (model, filters) in PLATFORM_COUNTERS.items()
+        if isinstance(instance, model) and _matches(instance, filters)
+    ]
+    daily = []
+    for name, (model, date_field, filters) in DAILY_METRICS.items():
+        value = getattr(instance, date_field, None) if isinstance(instance, model) else None
+        if value and _matches(instance, filters):
+            daily.append((name, timezone.localdate(value)))
+    return counters, daily
+
+
+# =======================================================
+# 1. Incremental updates (signals.py se)
+# =======================================================
+
+def _bump(queryset, create, amount):
+    """F() increment; row na ho to create (concurrent create par dobara increment)."""
+    if queryset.update(value=F('value') + amount):
+        return
+    try:
+        with transaction.atomic():
+            create(amount)
+    except IntegrityError:
+        queryset.update(value=F('value') + amount)
+
+
+def bump_counter(name, amount=1):
+    _bump(
+        PlatformCounter.objects.filter(name=name),
+        lambda value: PlatformCounter.objects.create(name=name, value=value),
+        amount,
+    )
+
+
+def bump_daily(metric, date, amount=1):
+    _bump(
+        DailyMetric.objects.filter(metric=metric, date=date),
+        lambda value: DailyMetric.objects.create(metric=metric, date=date, value=value),
+        amount,
+    )
+
+
+def apply_metric_change(before, after):
+    """
+    `before`/`after` metric_keys() ke results hain (naya row: before khali, delete: after khali).
+    Sirf farq wale counters update hote hain - e.g. customer -> provider par customers -1, providers +1.
+    """
+    counters = Counter(after[0])
+    counters.subtract(before[0])
+    daily = Counter(after[1])
+    daily.subtract(before[1])
+    for name, amount in counters.items():
+        if amount:
+            bump_counter(name, amount)
+    for (metric, date), amount in daily.items():
+        if amount:
+            bump_daily(metric, date, amount)
+
+
+# =======================================================
+# 2. Reads (admin dashboard)
+# =======================================================
+
+def platform_counters():
+    values = dict.fromkeys(PLATFORM_COUNTERS, 0)
+    values.update(PlatformCounter.objects.values_list('name', 'value'))
+    return values
+
+
+def daily_series(days=14):
+    """Pichle `days` din ki rollups - har din ek row, missing din/metric 0 (naya din upar)."""
+    today = timezone.localdate()
+    dates = [today - timedelta(days=offset) for offset in range(days)]
+    rows = {day: dict.fromkeys(DAILY_METRICS, 0) for day in dates}
+    for metric, day, value in DailyMetric.objects.filter(date__gte=dates[-1]).values_list('metric', 'date', 'value'):
+        if day in rows and metric in DAILY_METRICS:
+            rows[day][metric] = value
+    return [{'date': day, **rows[day]} for day in dates]
+
+
+# =======================================================
+# 3. Reconciliation (reconcile_platform_metrics command)
+# =======================================================
+
+def reconcile_counters():
+    """Counters ko actual COUNT(*) se overwrite karta hai. Returns {name: (stored, actual)} drifted wale."""
+    stored = platform_counters()
+    drift = {}
+    for name, (model, filters) in PLATFORM_COUNTERS.items():
+        actual = model.objects.filter(**filters).count()
+        if stored[name] != actual:
+            drift[name] = (stored[name], actual)
+        PlatformCounter.objects.update_or_create(name=name, defaults={'value': actual})
+    return drift
+
+
+def rebuild_daily_metrics(days=None):
+    """Pichle `days` din (None = poori history) ki rollups source tables se dobara banata hai."""
+    since = timezone.localdate() - timedelta(days=days - 1) if days else None
+    rebuilt = 0
+    for metric, (model, date_field, filters) in DAILY_METRICS.items():
+        queryset = model.objects.filter(**filters)
+        if since:
+            queryset = queryset.filter(**{f'{date_field}__date__gte': since})
+        counts = queryset.annotate(day=TruncDate(date_field)).values('day').annotate(value=Count('pk')).order_by()
+
+        with transaction.atomic():
+            stale = DailyMetric.objects.filter(metric=metric)
+            if since:
+                stale = stale.filter(date__gte=since)
+            stale.delete()
+            rows = [DailyMetric(metric=metric, date=row['day'], value=row['value']) for row in counts if row['day']]
+            DailyMetric.objects.bulk_create(rows, batch_size=500)
+        rebuilt += len(rows)
+    return rebuilt
@@ -0,0 +1,272 @@
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from .timing import start_request_timing, end_request_timing, db_execute_wrapper, latency_histograms, register_exit_dump
+
+logger = logging.getLogger('myapp.performance')
+
+
+# =======================================================
+# 1. Query Budget
+# =======================================================
+# Har request ki SQL queries aur DB time count hote hain (URL name ke hisaab se).
+# Budget se zyada hone par fixfinder.log mein warning; QUERY_BUDGET_RAISE=True (tests) par exception.
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """connection.execute_wrapper() hook - har query ka count aur time jodta hai."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryMetrics:
+    """Process-local per-view counters (metrics scrape endpoint inhe padhta hai)."""
+
+    FIELDS = ('requests', 'queries', 'db_seconds', 'over_budget')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, queries, db_seconds, over_budget):
+        with self._lock:
+            stats = self._views.setdefault(view, dict.fromkeys(self.FIELDS, 0))
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['db_seconds'] += db_seconds
+            stats['over_budget'] += int(over_budget)
+
+    def snapshot(self):
+        with self._lock:
+            return {view: dict(stats) for view, stats in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+query_metrics = QueryMetrics()
+
+
+def view_label(request):
+    """Metrics/logs ke liye URL name (namespace ke saath); resolve na ho to 'unresolved'."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.url_name or 'unnamed'
+
+
+def query_budget_for(view):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view, getattr(settings, 'QUERY_BUDGET_DEFAULT', 30))
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        view = view_label(request)
+        budget = query_budget_for(view)
+        db_time_budget = getattr(settings, 'QUERY_BUDGET_DB_TIME_MS', None)
+        over_budget = (budget is not None and counter.count > budget) or (
+            db_time_budget is not None and counter.duration * 1000 > db_time_budget
+        )
+        query_metrics.record(view, counter.count, counter.duration, over_budget)
+        request.query_count = counter.count
+        request.db_time = counter.duration
+
+        if over_budget:
+            message = (
+                f'Query budget exceeded: {view} ran {counter.count} queries '
+                f'({counter.duration * 1000:.1f} ms DB) - budget {budget} '
+                f'[{request.method} {request.path}]'
+            )
+            if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+def render_query_metrics():
+    """Prometheus text exposition format mein per-view counters."""
+    snapshot = query_metrics.snapshot()
+    metrics = (
+        ('requests', 'fixfinder_view_requests_total', 'Requests handled per view'),
+        ('queries', 'fixfinder_view_queries_total', 'SQL queries executed per view'),
+        ('db_seconds', 'fixfinder_view_db_seconds_total', 'Time spent in SQL per view'),
+        ('over_budget', 'fixfinder_view_over_budget_total', 'Requests that exceeded the query budget'),
+    )
+    lines = []
+    for field, name, help_text in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for view, stats in sorted(snapshot.items()):
+            lines.append(f'{name}{{view="{view}"}} {round(stats[field], 6)}')
+    return '\n'.join(lines) + '\n'
+
+
+# =======================================================
+# 2. Server-Timing
+# =======================================================
+# Response par `Server-Timing: db;dur=.., tpl;dur=.., email;dur=.., view;dur=.., total;dur=..`
+# header (browser devtools mein dikhta hai) aur sampled per-view histograms (timing.py).
+
+SERVER_TIMING_LABELS = (('db', 'db', 'Database'), ('template', 'tpl', 'Templates'),
+                        ('email', 'email', 'Email outbox'), ('view', 'view', 'View logic'),
+                        ('total', 'total', 'Total'))
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        register_exit_dump()
+
+    def __call__(self, request):
+        timing, token = start_request_timing()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(db_execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            end_request_timing(token)
+
+        breakdown = timing.breakdown()
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = ', '.join(
+                f'{label};dur={breakdown[span]:.1f};desc="{desc}"' for span, label, desc in SERVER_TIMING_LABELS
+            )
+        latency_histograms.record(view_label(request), breakdown)
+        return response
+
+
+# =======================================================
+# 3. Sampling Profiler (opt-in)
+# =======================================================
+# PROFILER_SAMPLE_RATE fraction of requests (default 0) ya signed X-FixFinder-Profile header wali
+# requests ko stack sampler se profile karta hai. Har profile PROFILER_DIR/<url name>/ mein
+# collapsed-stack file (flamegraph.pl / speedscope format) banti hai; `merge_profiles` inhe jodta hai.
+
+PROFILE_HEADER = 'X-FixFinder-Profile'
+PROFILE_TOKEN_SALT = 'myapp.profiler'
+
+_profile_lock = threading.Lock()
+
+
+def make_profile_token():
+    """Signed header value (`profiler_token` command) - PROFILER_TOKEN_MAX_AGE tak valid."""
+    return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).sign('profile')
+
+
+def valid_profile_token(value):
+    try:
+        signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).unsign(
+            value, max_age=getattr(settings, 'PROFILER_TOKEN_MAX_AGE', 3600)
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class StackSampler:
+    """Background thread jo target thread ka Python stack har `interval` par sample karta hai."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack and not self._stop.is_set():
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def write_profile(view, stacks):
+    """Collapsed stacks ko file mein likhta hai aur PROFILER_MAX_FILES se purani files hata deta hai."""
+    root = Path(getattr(settings, 'PROFILER_DIR', 'profiles'))
+    directory = root / re.sub(r'[^\w.-]+', '_', view)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{random.randrange(16 ** 6):06x}.collapsed'
+    path.write_text(''.join(f'{stack} {count}\n' for stack, count in stacks.most_common()))
+
+    files = sorted(root.glob('*/*.collapsed'), key=lambda item: item.stat().st_mtime, reverse=True)
+    for old in files[getattr(settings, 'PROFILER_MAX_FILES', 200):]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+class SamplingProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        header = request.headers.get(PROFILE_HEADER)
+        if header:
+            return valid_profile_token(header)
+        return random.random() < getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+
+    def __call__(self, request):
+        # Ek process mein ek waqt par ek hi profile - busy ho to request bina profile ke chalti hai
+        if not self.should_profile(request) or not _profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            interval = getattr(settings, 'PROFILER_INTERVAL_MS', 5) / 1000
+            with StackSampler(threading.get_ident(), interval) as sampler:
+                response = self.get_response(request)
+        finally:
+            _profile_lock.release()
+
+        if sampler.stacks:
+            try:
+                path = write_profile(view_label(request), sampler.stacks)
+                response['X-Profile-File'] = path.name
+            except OSError as exc:
+                logger.warning(f'Could not write profile for {request.path}: {exc}')
+        return response
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import slugify
+
+# myapp.utils ke normalize_city / category_key ka snapshot (migration live code import nahi karta -
+# baad mein parser badle to bhi yeh migration wahi chalega jo tab chala tha)
+CATEGORY_KEY_ALIASES = {
+    'appliance-repair': 'appliance',
+}
+
+
+def normalize_city(location):
+    if not location:
+        return ''
+    return ' '.join(location.split(',')[0].split()).lower()
+
+
+def category_key(name):
+    key = slugify(name or '')
+    return CATEGORY_KEY_ALIASES.get(key, key)
+
+
+def backfill_provider_match(apps, schema_editor):
+    CustomUser = apps.get_model('myapp', 'CustomUser')
+    ServiceRequest = apps.get_model('myapp', 'ServiceRequest')
+    ProviderMatch = apps.get_model('myapp', 'ProviderMatch')
+
+    for service_request in ServiceRequest.objects.only('id', 'location').iterator():
+        ServiceRequest.objects.filter(pk=service_request.pk).update(city=normalize_city(service_request.location))
+
+    rows = []
+    providers = CustomUser.objects.filter(user_type='provider', is_active=True).prefetch_related('service_categories')
+    for provider in providers.iterator(chunk_size=500):
+        city = normalize_city(provider.location)
+        if not city:
+            continue
+        keys = {category_key(category.name) for category in provider.service_categories.all()}
+        rows.extend(ProviderMatch(provider_id=provider.pk, category=key, city=city) for key in keys)
+    ProviderMatch.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_rename_price_booking_total_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=20)),
+                ('city', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='servicerequest',
+            name='city',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['city', 'category', 'status'], name='myapp_servi_city_79ec31_idx'),
+        ),
+        migrations.AddField(
+            model_name='providermatch',
+            name='provider',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_keys', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='providermatch',
+            constraint=models.UniqueConstraint(fields=('category', 'city', 'provider'), name='unique_provider_match'),
+        ),
+        migrations.RunPython(backfill_provider_match, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:45
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# myapp.utils.parse_price_range ka snapshot (migration live code import nahi karta)
+PRICE_NUMBER_RE = re.compile(r'\d[\d,]*')
+
+
+def parse_price_range(price_range):
+    numbers = [int(match.replace(',', '')) for match in PRICE_NUMBER_RE.findall(price_range or '')]
+    if not numbers:
+        return None, None
+    return min(numbers[:2]), max(numbers[:2])
+
+
+def backfill_price_bounds(apps, schema_editor):
+    Service = apps.get_model('myapp', 'Service')
+
+    last_id = 0
+    while True:
+        batch = list(Service.objects.filter(id__gt=last_id).order_by('id').only('id', 'price_range')[:BATCH_SIZE])
+        if not batch:
+            break
+        for service in batch:
+            price_min, price_max = parse_price_range(service.price_range)
+            service.price_min = price_min or 0
+            service.price_max = price_max or 0
+        Service.objects.bulk_update(batch, ['price_min', 'price_max'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_notification_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='price_max',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='price_min',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'price_min'], name='myapp_servi_is_acti_78545a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'price_max'], name='myapp_servi_is_acti_87b1e9_idx'),
+        ),
+        migrations.RunPython(backfill_price_bounds, migrations.RunPython.noop),
+    ]
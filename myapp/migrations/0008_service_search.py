@@ -0,0 +1,111 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:47
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def build_search_text(*parts):
+    """myapp.utils.build_search_text ka snapshot (migration live code import nahi karta)."""
+    return ' '.join(' '.join(str(part).split()) for part in parts if part)
+
+SQLITE_FTS_SETUP = [
+    "CREATE VIRTUAL TABLE myapp_service_fts USING fts5("
+    "search_document, content='myapp_service', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER myapp_service_fts_ai AFTER INSERT ON myapp_service BEGIN "
+    "INSERT INTO myapp_service_fts(rowid, search_document) VALUES (new.id, new.search_document); END",
+    "CREATE TRIGGER myapp_service_fts_ad AFTER DELETE ON myapp_service BEGIN "
+    "INSERT INTO myapp_service_fts(myapp_service_fts, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); END",
+    "CREATE TRIGGER myapp_service_fts_au AFTER UPDATE OF search_document ON myapp_service BEGIN "
+    "INSERT INTO myapp_service_fts(myapp_service_fts, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); "
+    "INSERT INTO myapp_service_fts(rowid, search_document) VALUES (new.id, new.search_document); END",
+    "INSERT INTO myapp_service_fts(myapp_service_fts) VALUES ('rebuild')",
+]
+
+SQLITE_FTS_TEARDOWN = [
+    "DROP TRIGGER IF EXISTS myapp_service_fts_ai",
+    "DROP TRIGGER IF EXISTS myapp_service_fts_ad",
+    "DROP TRIGGER IF EXISTS myapp_service_fts_au",
+    "DROP TABLE IF EXISTS myapp_service_fts",
+]
+
+POSTGRES_SETUP = [
+    "CREATE INDEX IF NOT EXISTS myapp_service_search_gin ON myapp_service "
+    "USING GIN (to_tsvector('simple', search_document))",
+]
+
+POSTGRES_TEARDOWN = [
+    "DROP INDEX IF EXISTS myapp_service_search_gin",
+]
+
+
+def backfill_search_documents(apps, schema_editor):
+    Service = apps.get_model('myapp', 'Service')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Service.objects.filter(id__gt=last_id).order_by('id').select_related('category', 'provider')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for service in batch:
+            service.search_document = build_search_text(
+                service.title,
+                service.description,
+                service.category.name,
+                service.provider.first_name,
+                service.provider.last_name,
+            )
+        Service.objects.bulk_update(batch, ['search_document'])
+        last_id = batch[-1].id
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_SETUP
+    elif connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        statements = SQLITE_FTS_SETUP
+    else:
+        # Search icontains fallback use karega
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_TEARDOWN
+    elif connection.vendor == 'sqlite':
+        statements = SQLITE_FTS_TEARDOWN
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_service_price_bounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_service_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'rating'], name='myapp_servi_is_acti_8dddea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'reviews_count'], name='myapp_servi_is_acti_2311bd_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:48
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+BATCH_SIZE = 1000
+
+
+def backfill_rating_total(apps, schema_editor):
+    Service = apps.get_model('myapp', 'Service')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Service.objects.filter(id__gt=last_id).order_by('id').annotate(
+                approved_total=Sum('reviews__rating', filter=Q(reviews__is_approved=True)),
+                approved_count=Count('reviews', filter=Q(reviews__is_approved=True)),
+            ).only('id')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for service in batch:
+            service.rating_total = service.approved_total or 0
+            service.reviews_count = service.approved_count
+            service.rating = service.rating_total / service.reviews_count if service.reviews_count else 0.0
+        Service.objects.bulk_update(batch, ['rating', 'rating_total', 'reviews_count'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_service_rating_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_total, migrations.RunPython.noop),
+    ]
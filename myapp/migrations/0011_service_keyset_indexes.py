@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_service_rating_total'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_78545a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_87b1e9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_8dddea_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_2311bd_idx',
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'price_min', 'id'], name='myapp_servi_is_acti_417c83_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'price_max', 'id'], name='myapp_servi_is_acti_67b839_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'rating', 'id'], name='myapp_servi_is_acti_a7b679_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'reviews_count', 'id'], name='myapp_servi_is_acti_f02ee0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='myapp_servi_is_acti_40e832_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:53
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+# metrics.py ki definitions ka snapshot (migration live models import nahi karta)
+COUNTERS = {
+    'users': ('CustomUser', {}),
+    'providers': ('CustomUser', {'user_type': 'provider'}),
+    'customers': ('CustomUser', {'user_type': 'customer'}),
+    'services': ('Service', {}),
+    'bookings': ('Booking', {}),
+    'requests': ('ServiceRequest', {}),
+    'contact_messages': ('ContactMessage', {}),
+}
+
+DAILY = {
+    'bookings': ('Booking', 'booking_date', {}),
+    'new_users': ('CustomUser', 'date_joined', {}),
+    'new_providers': ('CustomUser', 'date_joined', {'user_type': 'provider'}),
+    'new_customers': ('CustomUser', 'date_joined', {'user_type': 'customer'}),
+    'service_requests': ('ServiceRequest', 'created_at', {}),
+}
+
+
+def backfill_platform_metrics(apps, schema_editor):
+    PlatformCounter = apps.get_model('myapp', 'PlatformCounter')
+    DailyMetric = apps.get_model('myapp', 'DailyMetric')
+
+    PlatformCounter.objects.bulk_create([
+        PlatformCounter(name=name, value=apps.get_model('myapp', model).objects.filter(**filters).count())
+        for name, (model, filters) in COUNTERS.items()
+    ])
+
+    rows = []
+    for metric, (model, date_field, filters) in DAILY.items():
+        counts = (
+            apps.get_model('myapp', model).objects.filter(**filters)
+            .annotate(day=TruncDate(date_field)).values('day').annotate(value=Count('pk')).order_by()
+        )
+        rows.extend(DailyMetric(metric=metric, date=row['day'], value=row['value']) for row in counts if row['day'])
+    DailyMetric.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_service_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('value', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'metric'],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'date'), name='unique_daily_metric')],
+            },
+        ),
+        migrations.RunPython(backfill_platform_metrics, migrations.RunPython.noop),
+    ]
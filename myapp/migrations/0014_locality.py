@@ -0,0 +1,125 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:07
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# myapp.utils.parse_location ka snapshot (migration live code import nahi karta - parser baad
+# mein badle to bhi fresh install par yahi backfill chalega)
+STATE_NAMES = {
+    'andhra pradesh', 'assam', 'bihar', 'chhattisgarh', 'goa', 'gujarat', 'haryana', 'himachal pradesh',
+    'jharkhand', 'karnataka', 'kerala', 'madhya pradesh', 'maharashtra', 'odisha', 'punjab', 'rajasthan',
+    'tamil nadu', 'telangana', 'uttar pradesh', 'uttarakhand', 'west bengal', 'delhi ncr', 'ncr',
+    'jammu and kashmir', 'chandigarh', 'puducherry',
+    'ap', 'gj', 'hr', 'ka', 'kl', 'mh', 'mp', 'pb', 'rj', 'tn', 'ts', 'up', 'wb',
+}
+COUNTRY_NAMES = {'india', 'in', 'bharat'}
+CITY_ALIASES = {
+    'bombay': 'mumbai', 'bengaluru': 'bangalore', 'new delhi': 'delhi', 'gurgaon': 'gurugram',
+    'calcutta': 'kolkata', 'madras': 'chennai', 'poona': 'pune', 'cochin': 'kochi', 'trivandrum': 'thiruvananthapuram',
+}
+KNOWN_CITIES = {
+    'mumbai', 'delhi', 'bangalore', 'pune', 'hyderabad', 'chennai', 'kolkata', 'ahmedabad', 'jaipur',
+    'lucknow', 'indore', 'kochi', 'gurugram', 'noida', 'thane', 'navi mumbai', 'surat', 'nagpur',
+    'chandigarh', 'bhopal', 'thiruvananthapuram', 'coimbatore', 'vadodara', 'visakhapatnam', 'patna',
+}
+PINCODE_RE = re.compile(r'\b\d{6}\b')
+# Browser geolocation "Lat: 19.1444, Lon: 73.0487" jaise parts - inme city nahi hoti
+COORDINATE_RE = re.compile(r'^(?:(?:lat|lon|lng|latitude|longitude)\s*:?\s*)?-?[\d.]+$')
+
+
+def _location_key(text):
+    key = ' '.join(PINCODE_RE.sub(' ', text).split()).lower()
+    if COORDINATE_RE.match(key):
+        return ''
+    return CITY_ALIASES.get(key, key)
+
+
+def parse_location(location):
+    parts = [key for key in (_location_key(part) for part in (location or '').split(',')) if key]
+    while len(parts) > 1 and parts[-1] in COUNTRY_NAMES:
+        parts.pop()
+    state = parts.pop() if len(parts) > 1 and parts[-1] in STATE_NAMES else ''
+    if not parts:
+        return '', '', state
+    # Area = city ke sabse paas wala part (aage ke parts house/street hote hain).
+    # "Mumbai, Andheri" jaise ulte order mein known city pehle ho sakti hai.
+    if len(parts) > 1 and parts[-1] not in KNOWN_CITIES and parts[0] in KNOWN_CITIES:
+        return parts[0], parts[1][:100], state
+    return parts[-1], (parts[-2] if len(parts) > 1 else '')[:100], state
+
+
+def backfill_localities(apps, schema_editor):
+    """Existing rows ke liye Locality FK; ServiceRequest.city / ProviderMatch keys naye parser se."""
+    Locality = apps.get_model('myapp', 'Locality')
+    ProviderMatch = apps.get_model('myapp', 'ProviderMatch')
+    localities = {}
+
+    def resolve(location):
+        city, area, state = parse_location(location)
+        if not city:
+            return None
+        if (city, area) not in localities:
+            localities[(city, area)] = Locality.objects.get_or_create(city=city, area=area, defaults={'state': state})[0].pk
+        return localities[(city, area)]
+
+    for model_name in ('CustomUser', 'Service', 'ServiceRequest'):
+        model = apps.get_model('myapp', model_name)
+        fields = ['locality', 'city'] if model_name == 'ServiceRequest' else ['locality']
+        rows = []
+        for obj in model.objects.only('id', 'location').iterator(chunk_size=1000):
+            obj.locality_id = resolve(obj.location)
+            if model_name == 'ServiceRequest':
+                obj.city = parse_location(obj.location)[0]
+            rows.append(obj)
+        model.objects.bulk_update(rows, fields, batch_size=500)
+
+    CustomUser = apps.get_model('myapp', 'CustomUser')
+    providers = ProviderMatch.objects.values_list('provider_id', flat=True).distinct()
+    for provider_id, location in CustomUser.objects.filter(id__in=providers).values_list('id', 'location'):
+        city = parse_location(location)[0]
+        matches = ProviderMatch.objects.filter(provider_id=provider_id)
+        # City parse na ho (e.g. lat/lon) to provider kisi request se match nahi hota
+        matches.update(city=city) if city else matches.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Locality',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=100)),
+                ('area', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'verbose_name_plural': 'localities',
+                'ordering': ['city', 'area'],
+                'indexes': [models.Index(fields=['area'], name='myapp_local_area_84e89a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('city', 'area'), name='unique_locality')],
+            },
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='locality',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='myapp.locality'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='locality',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='services', to='myapp.locality'),
+        ),
+        migrations.AddField(
+            model_name='servicerequest',
+            name='locality',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='service_requests', to='myapp.locality'),
+        ),
+        migrations.RunPython(backfill_localities, migrations.RunPython.noop),
+    ]
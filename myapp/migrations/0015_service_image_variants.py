@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_locality'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceimage',
+            name='variants_error',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceimage',
+            name='variants_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='serviceimage',
+            name='variants_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='serviceimage',
+            index=models.Index(fields=['variants_status', 'variants_updated_at'], name='serviceimage_variants_idx'),
+        ),
+    ]
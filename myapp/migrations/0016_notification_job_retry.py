@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_service_image_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notificationjob',
+            name='myapp_notif_status_e6fa40_idx',
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notificationjob',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='notificationjob',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='notificationjob_due_idx'),
+        ),
+    ]
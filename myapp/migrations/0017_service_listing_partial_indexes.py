@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_notification_job_retry'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_417c83_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_67b839_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_a7b679_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_f02ee0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='service',
+            name='myapp_servi_is_acti_40e832_idx',
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price_min', 'id'], name='service_active_price_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price_max', 'id'], name='service_active_price_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['rating', 'id'], name='service_active_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['reviews_count', 'id'], name='service_active_reviews_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at', 'id'], name='service_active_newest_idx'),
+        ),
+    ]
@@ -1,16 +1,77 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission, User 
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg 
+from django.db.models import Q, F, Sum, Count, Case, When, Value, FloatField
+from django.db.models.functions import Cast
+from django.db import transaction
 from django.conf import settings # 👈 FIX: Yeh import zaroori hai
 import uuid
 from django.utils import timezone
 from datetime import timedelta
+from .utils import normalize_city, parse_location, category_key, parse_price_range, build_search_text
 
 # =======================================================
 # 1. Custom User and Profile Models
 # =======================================================
 
+# --- Locality Definition ---
+class Locality(models.Model):
+    """
+    Normalized (city, area) - CustomUser, Service aur ServiceRequest ke free-text location se
+    parse_location() bharta hai. Location filters/matching isi par equality join karte hain.
+    """
+    city = models.CharField(max_length=100)
+    area = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=100, blank=True)
+    
+    class Meta:
+        verbose_name_plural = 'localities'
+        ordering = ['city', 'area']
+        constraints = [
+            models.UniqueConstraint(fields=['city', 'area'], name='unique_locality'),
+        ]
+        indexes = [
+            models.Index(fields=['area']),
+        ]
+    
+    def __str__(self):
+        return f"{self.area.title()}, {self.city.title()}" if self.area else self.city.title()
+    
+    @classmethod
+    def for_location(cls, location):
+        """Location string ki Locality (zarurat ho to bana kar); city na mile to None."""
+        city, area, state = parse_location(location)
+        if not city:
+            return None
+        locality, _ = cls.objects.get_or_create(city=city, area=area, defaults={'state': state})
+        return locality
+    
+    @classmethod
+    def matching(cls, location):
+        """
+        Search box ke text se localities: "Andheri, Mumbai" -> wahi area; sirf "Mumbai" -> poori city;
+        sirf "Andheri" -> jis bhi city mein yeh area ho.
+        """
+        city, area, _ = parse_location(location)
+        if not city:
+            return cls.objects.none()
+        if area:
+            return cls.objects.filter(city=city, area=area)
+        return cls.objects.filter(Q(city=city) | Q(area=city))
+
+def sync_locality(instance, kwargs):
+    """
+    save() helper: location badli ho (ya full save) to instance.locality dobara resolve karta hai.
+    Resolve hua to True (extra fields caller `kwargs['update_fields']` mein jod sakta hai).
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'location' not in update_fields:
+        return False
+    instance.locality = Locality.for_location(instance.location)
+    if update_fields is not None:
+        kwargs['update_fields'] = set(update_fields) | {'locality'}
+    return True
+
 # --- CustomUser Definition (AbstractUser se inherit karke) ---
 class CustomUser(AbstractUser):
     """
@@ -44,6 +105,7 @@ class CustomUser(AbstractUser):
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default='customer')
     phone = models.CharField(max_length=15)
     location = models.CharField(max_length=255)
+    locality = models.ForeignKey(Locality, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='users')
     is_verified = models.BooleanField(default=False)
     registration_date = models.DateTimeField(auto_now_add=True)
     
@@ -54,6 +116,11 @@ class CustomUser(AbstractUser):
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.user_type})"
+    
+    def save(self, *args, **kwargs):
+        # Login (update_fields=['last_login']) jaise saves par locality lookup skip hota hai
+        sync_locality(self, kwargs)
+        super().save(*args, **kwargs)
 
 # --- UserProfile Definition ---
 class UserProfile(models.Model):
@@ -117,34 +184,142 @@ class Service(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     price_range = models.CharField(max_length=100)
+    # price_range se parse kiye gaye numeric bounds (sorting ke liye) - save() mein set hote hain
+    price_min = models.PositiveIntegerField(default=0, editable=False)
+    price_max = models.PositiveIntegerField(default=0, editable=False)
     location = models.CharField(max_length=255)
+    locality = models.ForeignKey(Locality, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='services')
     experience = models.CharField(max_length=50)
     availability = models.CharField(max_length=50, default='Available')
     rating = models.FloatField(default=0.0)
     reviews_count = models.IntegerField(default=0)
+    # Approved reviews ki ratings ka running sum - rating = rating_total / reviews_count
+    rating_total = models.PositiveIntegerField(default=0, editable=False)
     is_active = models.BooleanField(default=True)
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Full-text search document (title, description, category, provider name) - search.py dekhein
+    search_document = models.TextField(blank=True, editable=False)
+    
+    class Meta:
+        # Listing sorts + id tie-breaker (keyset pagination - pagination.py dekhein). Sab partial
+        # indexes hain kyunki is_active=True SQL mein `WHERE is_active` banta hai (column equality
+        # nahi) - leading is_active column wala index SQLite ORDER BY ke liye use nahi karta
+        indexes = [
+            models.Index(fields=['price_min', 'id'], condition=Q(is_active=True), name='service_active_price_min_idx'),
+            models.Index(fields=['price_max', 'id'], condition=Q(is_active=True), name='service_active_price_max_idx'),
+            models.Index(fields=['rating', 'id'], condition=Q(is_active=True), name='service_active_rating_idx'),
+            models.Index(fields=['reviews_count', 'id'], condition=Q(is_active=True), name='service_active_reviews_idx'),
+            models.Index(fields=['created_at', 'id'], condition=Q(is_active=True), name='service_active_newest_idx'),
+            # Category filter (services?category=...) + default rating sort
+            models.Index(fields=['category', 'rating', 'id'], condition=Q(is_active=True),
+                         name='service_active_category_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    SEARCH_DOCUMENT_FIELDS = {'title', 'description', 'category', 'category_id', 'provider', 'provider_id'}
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        extra = set()
+        if update_fields is None or 'price_range' in update_fields:
+            price_min, price_max = parse_price_range(self.price_range)
+            self.price_min = price_min or 0
+            self.price_max = price_max or 0
+            extra |= {'price_min', 'price_max'}
+        if update_fields is None or self.SEARCH_DOCUMENT_FIELDS.intersection(update_fields):
+            self.search_document = self.build_search_document()
+            extra.add('search_document')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | extra
+        sync_locality(self, kwargs)
+        super().save(*args, **kwargs)
+    
+    def build_search_document(self):
+        return build_search_text(
+            self.title,
+            self.description,
+            self.category.name if self.category_id else '',
+            self.provider.first_name if self.provider_id else '',
+            self.provider.last_name if self.provider_id else '',
+        )
+    
     def update_rating(self):
-        """Update rating based on reviews"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            self.rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0.0
-            self.reviews_count = reviews.count()
-            self.save()
+        """
+        Approved reviews se rating ko poora recompute karta hai (drift repair ke liye).
+        Normal review writes apply_review_delta() se O(1) update karte hain.
+        """
+        stats = self.reviews.filter(is_approved=True).aggregate(total=Sum('rating'), count=Count('id'))
+        self.rating_total = stats['total'] or 0
+        self.reviews_count = stats['count']
+        self.rating = self.rating_total / self.reviews_count if self.reviews_count else 0.0
+        self.save(update_fields=['rating', 'rating_total', 'reviews_count'])
+    
+    @classmethod
+    def apply_review_delta(cls, service_id, rating_delta, count_delta):
+        """
+        Running sum/count par atomic F() update; rating bhi usi UPDATE mein naye sum/count se
+        calculate hota hai. Sirf rating columns likhe jate hain (updated_at nahi badalta).
+        """
+        if not rating_delta and not count_delta:
+            return
+        new_total = F('rating_total') + rating_delta
+        new_count = F('reviews_count') + count_delta
+        cls.objects.filter(pk=service_id).update(
+            rating_total=new_total,
+            reviews_count=new_count,
+            rating=Case(
+                When(reviews_count__lte=-count_delta, then=Value(0.0)),
+                default=Cast(new_total, FloatField()) / Cast(new_count, FloatField()),
+                output_field=FloatField(),
+            ),
+        )
 
 class ServiceImage(models.Model):
+    """
+    Original upload + resized WebP/JPEG variants (thumb/card/full, metadata stripped).
+    Variants `process_service_images` worker banata hai; tab tak templates original dikhate hain.
+    """
+    VARIANT_STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='service_images/')
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # {"card": {"webp": "<storage name>", "jpeg": "<storage name>", "width": 480, "height": 360}, ...}
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    variants_status = models.CharField(max_length=20, choices=VARIANT_STATUS_CHOICES, default='pending', editable=False)
+    variants_error = models.TextField(blank=True, editable=False)
+    variants_updated_at = models.DateTimeField(blank=True, null=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['variants_status', 'variants_updated_at'], name='serviceimage_variants_idx'),
+        ]
     
     def __str__(self):
         return f"Image for {self.service.title}"
+    
+    def variant_url(self, size, fmt='jpeg'):
+        """Variant ka URL; variant abhi nahi bana to original image."""
+        name = self.variants.get(size, {}).get(fmt)
+        return self.image.storage.url(name) if name else self.image.url
+    
+    @property
+    def urls(self):
+        """Templates ke liye: image.urls.card.webp, image.urls.full.jpeg ..."""
+        from .images import VARIANT_SIZES
+        return {
+            size: {fmt: self.variant_url(size, fmt) for fmt in ('webp', 'jpeg')}
+            for size in VARIANT_SIZES
+        }
 
 class ContactMessage(models.Model):
     """
@@ -224,6 +399,33 @@ class PasswordResetToken(models.Model):
 # =======================================================
 
 # models.py में Booking model में ये correction करें:
+class BookingQuerySet(models.QuerySet):
+    """
+    Booking lists (dashboard, profile, booking detail, admin) ke liye shared projections,
+    taaki template mein booking.service / customer / provider har row par alag query na karein.
+    """
+    # Templates mein users ke yahi fields use hote hain (get_full_name = first_name + last_name)
+    USER_FIELDS = ('id', 'username', 'first_name', 'last_name', 'email', 'phone', 'location', 'user_type')
+    SERVICE_FIELDS = ('id', 'title', 'description', 'experience', 'price_range', 'category__id', 'category__name', 'category__icon')
+    
+    def for_user(self, user):
+        """Customer ko apni bookings, provider ko uske paas aayi bookings."""
+        if user.user_type == 'customer':
+            return self.filter(customer=user)
+        return self.filter(provider=user)
+    
+    def with_related(self):
+        booking_fields = [field.name for field in self.model._meta.concrete_fields]
+        return self.select_related('service__category', 'customer', 'provider', 'review').only(
+            *booking_fields,
+            *(f'{relation}__{field}' for relation in ('customer', 'provider') for field in self.USER_FIELDS),
+            *(f'service__{field}' for field in self.SERVICE_FIELDS),
+            'review__id',
+        )
+    
+    def recent(self):
+        return self.with_related().order_by('-booking_date')
+
 class Booking(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -249,6 +451,17 @@ class Booking(models.Model):
     customer_address = models.TextField()  # Template mein 'address' use ho raha hai
     special_instructions = models.TextField(blank=True, null=True)
     
+    objects = BookingQuerySet.as_manager()
+    
+    class Meta:
+        # for_user().recent() lists (dashboard/profile) aur status filter / stats aggregates
+        indexes = [
+            models.Index(fields=['customer', '-booking_date'], name='booking_customer_recent_idx'),
+            models.Index(fields=['provider', '-booking_date'], name='booking_provider_recent_idx'),
+            models.Index(fields=['customer', 'status', '-booking_date'], name='booking_customer_status_idx'),
+            models.Index(fields=['provider', 'status', '-booking_date'], name='booking_provider_status_idx'),
+        ]
+    
     def __str__(self):
         return f"Booking #{self.id} - {self.service_name or (self.service.title if self.service else 'No Service')}"
 
@@ -269,11 +482,28 @@ class Review(models.Model):
         return f"Review by {self.customer.get_full_name()} - {self.rating} stars"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.service.update_rating()
+        # Pichli state (service, rating, approval) se sirf delta apply hota hai. Row lock ke saath
+        # transaction ke andar padhte hain - do concurrent edits same purani rating ko double-subtract na karein
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk:
+                previous = Review.objects.select_for_update().filter(pk=self.pk).values(
+                    'service_id', 'rating', 'is_approved',
+                ).first()
+            super().save(*args, **kwargs)
+            if previous and previous['is_approved']:
+                Service.apply_review_delta(previous['service_id'], -previous['rating'], -1)
+            if self.is_approved:
+                Service.apply_review_delta(self.service_id, self.rating, 1)
         
     class Meta:
-        pass
+        indexes = [
+            models.Index(fields=['provider', '-created_at'], name='review_provider_recent_idx'),
+            models.Index(fields=['customer', '-created_at'], name='review_customer_recent_idx'),
+            # Service detail page sirf approved reviews dikhata hai
+            models.Index(fields=['service', '-created_at'], condition=Q(is_approved=True),
+                         name='review_service_approved_idx'),
+        ]
 
 class ServiceRequest(models.Model):
     # Choices ko merge kiya gaya hai
@@ -329,11 +559,86 @@ class ServiceRequest(models.Model):
     # Provider assignment
     assigned_provider = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_requests')
     
+    # Normalized city key (location se derive hota hai) - ProviderMatch ke saath indexed lookup ke liye
+    city = models.CharField(max_length=100, blank=True, editable=False)
+    locality = models.ForeignKey(Locality, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='service_requests')
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['city', 'category', 'status']),
+            models.Index(fields=['status', 'category', '-created_at'], name='request_status_category_idx'),
+            models.Index(fields=['customer', '-created_at'], name='request_customer_recent_idx'),
+            # available_requests: open requests hi match hote hain - chhota partial index
+            models.Index(fields=['city', 'category', '-created_at'], condition=Q(status='open'),
+                         name='request_open_match_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.customer.username}"
+    
+    def save(self, *args, **kwargs):
+        if sync_locality(self, kwargs):
+            # city = locality ki city key (ProviderMatch isi par match karta hai)
+            self.city = self.locality.city if self.locality else ''
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] |= {'city'}
+        super().save(*args, **kwargs)
+
+class ProviderMatch(models.Model):
+    """
+    Inverted index: (category slug, city key) -> provider.
+    CustomUser.location / service_categories change hone par signals.py isse rebuild karta hai,
+    taaki naye ServiceRequest ke liye providers ek indexed lookup mein mil jayein.
+    """
+    provider = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='match_keys')
+    category = models.CharField(max_length=20)  # ServiceRequest.CATEGORY_CHOICES ka slug
+    city = models.CharField(max_length=100)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'city', 'provider'], name='unique_provider_match'),
+        ]
+    
+    def __str__(self):
+        return f"{self.category} @ {self.city} -> {self.provider_id}"
+    
+    @classmethod
+    def keys_for(cls, user):
+        """Provider ke (category, city) keys - index rows isi se bante hain."""
+        city = normalize_city(user.location)
+        if user.user_type != 'provider' or not user.is_active or not city:
+            return set()
+        # .all() - prefetch_related('service_categories') ho to extra query nahi
+        return {(category_key(category.name), city) for category in user.service_categories.all()}
+    
+    @classmethod
+    def rebuild_for(cls, user):
+        """Ek provider ke index rows ko current profile se sync karta hai."""
+        keys = cls.keys_for(user)
+        with transaction.atomic():
+            cls.objects.filter(provider=user).delete()
+            cls.objects.bulk_create([
+                cls(provider=user, category=category, city=city) for category, city in keys
+            ])
+    
+    @classmethod
+    def providers_for(cls, service_request):
+        """Request ki category aur city se match hone wale providers (ek index lookup)."""
+        return CustomUser.objects.filter(
+            match_keys__category=service_request.category,
+            match_keys__city=service_request.city or normalize_city(service_request.location),
+        )
+    
+    @classmethod
+    def requests_for(cls, provider):
+        """Provider ke index keys se matching ServiceRequests ka queryset."""
+        condition = Q()
+        for category, city in cls.objects.filter(provider=provider).values_list('category', 'city'):
+            condition |= Q(category=category, city=city)
+        if not condition:
+            return ServiceRequest.objects.none()
+        return ServiceRequest.objects.filter(condition)
 
 class ServiceResponse(models.Model):
     service_request = models.ForeignKey(ServiceRequest, on_delete=models.CASCADE, related_name='responses')
@@ -371,3 +676,124 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notification_user_recent_idx'),
+            # Unread badge/list - zyada tar notifications read hoti hain, isliye partial index chhota rehta hai
+            models.Index(fields=['user', '-created_at'], condition=Q(is_read=False), name='notification_unread_idx'),
+        ]
+
+class NotificationCounter(models.Model):
+    """
+    Per-user unread notifications ka denormalized counter, taaki badge ke liye
+    Notification table scan na karna pade. notifications.py ke helpers ise F() se update karte hain.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+# =======================================================
+# 4. Email Outbox
+# =======================================================
+
+class EmailOutbox(models.Model):
+    """
+    Transactional emails ki queue. Views sirf yahan row enqueue karte hain;
+    `send_outbox` management command inhe batches mein ek hi SMTP connection se bhejta hai.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    # Same key dobara enqueue karne par naya email nahi banta
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+class NotificationJob(models.Model):
+    """
+    Bahut bade audience ke liye deferred notification fan-out.
+    `process_notification_jobs` command inhe background mein bulk_create karta hai.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    user_ids = models.JSONField(default=list)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=50)
+    related_booking = models.ForeignKey(Booking, on_delete=models.CASCADE, blank=True, null=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Progress: user_ids[:created_count] deliver ho chuke (har chunk ke saath commit), retry yahin se
+    created_count = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Worker lease / retry backoff - isse pehle job dobara claim nahi hota
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notificationjob_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} -> {len(self.user_ids)} users ({self.status})"
+
+# =======================================================
+# 5. Platform Metrics
+# =======================================================
+
+class PlatformCounter(models.Model):
+    """
+    Admin dashboard ke platform-wide totals (users, services, bookings ...), signals se
+    F() increments ke through maintain hote hain. `reconcile_platform_metrics` drift theek karta hai.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+class DailyMetric(models.Model):
+    """Per-day rollups (bookings per day, new providers per day ...) - admin dashboard time-series."""
+    metric = models.CharField(max_length=50)
+    date = models.DateField()
+    value = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-date', 'metric']
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'date'], name='unique_daily_metric'),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.date}: {self.value}"
@@ -0,0 +1,247 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from .models import Notification, NotificationCounter, NotificationJob
+from .pubsub import publish_events, publish_user_event, publish_users_event
+
+
+def notification_payload(notification):
+    """SSE stream ke liye notification ka JSON-safe representation."""
+    return {
+        'id': notification.pk,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+# Ek INSERT mein kitni rows (SQLite variable limit ke andar)
+FANOUT_CHUNK_SIZE = getattr(settings, 'NOTIFICATION_FANOUT_CHUNK_SIZE', 500)
+# Isse bade audience ko default mein background job par defer kiya jata hai
+FANOUT_DEFER_THRESHOLD = getattr(settings, 'NOTIFICATION_FANOUT_DEFER_THRESHOLD', 5000)
+# Deferred job retries (email outbox jaisa backoff) aur worker lease
+JOB_MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_JOB_MAX_ATTEMPTS', 6)
+JOB_RETRY_BASE_SECONDS = getattr(settings, 'NOTIFICATION_JOB_RETRY_BASE_SECONDS', 60)
+JOB_RETRY_MAX_SECONDS = getattr(settings, 'NOTIFICATION_JOB_RETRY_MAX_SECONDS', 3600)
+JOB_LEASE_SECONDS = getattr(settings, 'NOTIFICATION_JOB_LEASE_SECONDS', 300)
+
+
+def _user_ids(users):
+    """Queryset, user objects ya plain ids - sabko id list mein convert karta hai."""
+    if isinstance(users, models.QuerySet):
+        return list(users.values_list('pk', flat=True))
+    return [getattr(user, 'pk', user) for user in users]
+
+
+# =======================================================
+# 1. Unread Counter
+# =======================================================
+
+def increment_unread(user_ids, amount=1):
+    """
+    Diye gaye users ke unread counters atomically badhata hai.
+    `user_ids` mein repeat ids ho to utni baar count hota hai.
+    """
+    per_user = Counter(user_ids)
+    if not per_user:
+        return
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=0) for user_id in per_user],
+        ignore_conflicts=True,
+    )
+    # Same increment wale users ek hi UPDATE mein
+    by_amount = {}
+    for user_id, count in per_user.items():
+        by_amount.setdefault(count * amount, []).append(user_id)
+    for delta, ids in by_amount.items():
+        NotificationCounter.objects.filter(user_id__in=ids).update(unread=F('unread') + delta)
+    publish_users_event(per_user, 'unread')
+
+
+def decrement_unread(user_id, amount=1):
+    # Greatest: drift ho to bhi counter negative nahi jata (aur decrement skip bhi nahi hota)
+    NotificationCounter.objects.filter(user_id=user_id).update(unread=Greatest(F('unread') - amount, 0))
+    publish_user_event(user_id, 'unread')
+
+
+def unread_count(user):
+    """
+    Badge count ek primary-key lookup se. Counter row na ho to ek baar recount karke banata hai.
+    """
+    counter = NotificationCounter.objects.filter(user_id=user.pk).values_list('unread', flat=True).first()
+    if counter is None:
+        # Pehli baar: count + INSERT (concurrent request ne bana diya ho to uska row rehta hai).
+        # recount_unread ka update_or_create savepoints ke saath ~9 statements leta tha.
+        counter = Notification.objects.filter(user_id=user.pk, is_read=False).count()
+        NotificationCounter.objects.bulk_create([NotificationCounter(user_id=user.pk, unread=counter)],
+                                                ignore_conflicts=True)
+    return counter
+
+
+def recount_unread(user_id):
+    """Counter ko Notification table se dobara calculate karta hai (drift repair)."""
+    with transaction.atomic():
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        NotificationCounter.objects.update_or_create(user_id=user_id, defaults={'unread': count})
+        publish_user_event(user_id, 'unread')
+    return count
+
+
+def mark_read(user, notification_id):
+    """
+    Ek notification read mark karta hai; pehle se read ho to counter nahi badalta.
+    Returns True agar notification unread tha.
+    """
+    with transaction.atomic():
+        updated = Notification.objects.filter(id=notification_id, user=user, is_read=False).update(is_read=True)
+        if updated:
+            decrement_unread(user.pk, updated)
+    return bool(updated)
+
+
+def mark_all_read(user):
+    """
+    User ke saare notifications read mark karta hai. Counter se sirf utne ghatate hain jitni rows
+    sach mein update huin - zero set karne se beech mein aaye naye notifications ka increment mit jata.
+    Returns updated count.
+    """
+    with transaction.atomic():
+        updated = Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+        if updated:
+            decrement_unread(user.pk, updated)
+    return updated
+
+
+# =======================================================
+# 2. Fan-out
+# =======================================================
+
+def notify_many(notifications):
+    """
+    Alag-alag messages wale unsaved Notification objects ko ek bulk_create mein save karta hai
+    (e.g. booking par customer + provider dono ke notifications).
+    bulk_create post_save signal nahi bhejta, isliye unread counters yahin update hote hain.
+    """
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications, batch_size=FANOUT_CHUNK_SIZE)
+        increment_unread([notification.user_id for notification in created if not notification.is_read])
+        publish_events(
+            (notification.user_id, 'notification', notification_payload(notification)) for notification in created
+        )
+    return created
+
+
+def deliver(user_ids, title, message, notification_type, related_booking=None, on_chunk=None):
+    """
+    Same notification saare users ke liye chunked bulk_create se banata hai.
+    `on_chunk(delivered)` har chunk ke transaction ke andar chalta hai (job progress isi commit mein).
+    Returns created notifications count.
+    """
+    created = 0
+    for start in range(0, len(user_ids), FANOUT_CHUNK_SIZE):
+        chunk = user_ids[start:start + FANOUT_CHUNK_SIZE]
+        with transaction.atomic():
+            notify_many([
+                Notification(
+                    user_id=user_id,
+                    title=title,
+                    message=message,
+                    notification_type=notification_type,
+                    related_booking=related_booking,
+                )
+                for user_id in chunk
+            ])
+            created += len(chunk)
+            if on_chunk:
+                on_chunk(created)
+    return created
+
+
+def fan_out(users, title, message, notification_type, related_booking=None, defer=None):
+    """
+    Ek event ke notifications poore audience ko bhejta hai.
+    `defer=None` par audience FANOUT_DEFER_THRESHOLD se bada ho to NotificationJob ban jata hai;
+    `defer=True/False` se force kar sakte hain. Returns (created_count, job).
+    """
+    user_ids = _user_ids(users)
+    if not user_ids:
+        return 0, None
+    
+    if defer is None:
+        defer = len(user_ids) > FANOUT_DEFER_THRESHOLD
+    
+    if defer:
+        job = NotificationJob.objects.create(
+            user_ids=user_ids,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            related_booking=related_booking,
+        )
+        return 0, job
+    
+    return deliver(user_ids, title, message, notification_type, related_booking), None
+
+
+def job_retry_delay(attempts):
+    """Exponential backoff: 1m, 2m, 4m ... JOB_RETRY_MAX_SECONDS tak."""
+    return timedelta(seconds=min(JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), JOB_RETRY_MAX_SECONDS))
+
+
+def claim_job():
+    """
+    Sabse purana due job lease ke saath claim karta hai (short transaction - row lock fan-out ke
+    dauran hold nahi hota). Worker crash ho to lease expire hone par job dobara pick hota hai.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = NotificationJob.objects.select_for_update(skip_locked=True).filter(
+            status='pending', next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'created_at').first()
+        if job:
+            job.next_attempt_at = now + timedelta(seconds=JOB_LEASE_SECONDS)
+            NotificationJob.objects.filter(pk=job.pk).update(next_attempt_at=job.next_attempt_at)
+    return job
+
+
+def run_job(job):
+    """
+    Deferred NotificationJob ko deliver karta hai. Har chunk apne progress (created_count) ke saath
+    commit hota hai; fail hone par job backoff ke saath pending rehta hai aur agli baar wahin se
+    continue karta hai. JOB_MAX_ATTEMPTS ke baad 'failed'.
+    """
+    offset = job.created_count
+
+    def save_progress(delivered):
+        job.created_count = offset + delivered
+        # Lease bhi aage badhao - lamba job doosra worker na utha le
+        NotificationJob.objects.filter(pk=job.pk).update(
+            created_count=job.created_count,
+            next_attempt_at=timezone.now() + timedelta(seconds=JOB_LEASE_SECONDS),
+        )
+
+    try:
+        deliver(
+            job.user_ids[offset:], job.title, job.message, job.notification_type, job.related_booking,
+            on_chunk=save_progress,
+        )
+    except Exception as e:
+        job.attempts += 1
+        job.last_error = str(e)
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        else:
+            job.next_attempt_at = timezone.now() + job_retry_delay(job.attempts)
+        job.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'finished_at'])
+        return job
+
+    job.status = 'done'
+    job.last_error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['created_count', 'status', 'last_error', 'finished_at'])
+    return job
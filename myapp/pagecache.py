@@ -0,0 +1,113 @@
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from .caching import bump_namespace, get_or_compute, namespace_version
+
+# =======================================================
+# Public page cache (anonymous visitors)
+# =======================================================
+# index, services, service_detail, about, privacy, terms har anonymous visitor ke liye same HTML
+# render karte hain. Poora response URL + query string se cache hota hai; template fragments
+# ({% cache %}) bhi isi namespace version ko key mein lete hain. Service/ServiceCategory/Review/TeamMember
+# write par version bump (signals.py) - purane keys apne aap unreachable ho jate hain, TTL sirf
+# memory cap hai. Pages aur hot data (featured services) get_or_compute se bante hain: bump ke baad
+# sirf ek worker render karta hai, baaki uska result lete hain; chhota per-process LRU tier
+# (PUBLIC_PAGE_LOCAL_TTL) shared cache ke round-trip bhi bachata hai.
+
+NAMESPACE = 'public-pages'
+LOCAL_TTL = getattr(settings, 'PUBLIC_PAGE_LOCAL_TTL', 5)
+
+
+class _Uncacheable(Exception):
+    """Render hua response visitor-specific nikla - store nahi karna."""
+
+
+def public_cache_version():
+    return namespace_version(NAMESPACE)
+
+
+def bump_public_cache_version():
+    bump_namespace(NAMESPACE)
+
+
+def cached_public(key, compute):
+    """Public namespace mein single-flight cached value (version bump se invalidate)."""
+    return get_or_compute(key, compute, getattr(settings, 'PUBLIC_PAGE_CACHE_TIMEOUT', 86400),
+                          namespace=NAMESPACE, local_ttl=LOCAL_TTL)
+
+
+def fragment_cache_context():
+    """Templates ke {% cache cache_timeout '<name>' cache_version %} tags ke liye."""
+    return {
+        'cache_version': public_cache_version(),
+        'cache_timeout': getattr(settings, 'PUBLIC_PAGE_CACHE_TIMEOUT', 86400),
+    }
+
+
+def _cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Session/flash-message cookie wale visitors (logged in, OTP flow, logout message) ko fresh page
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES and 'messages' not in request.COOKIES
+
+
+def _cacheable_response(request, response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    # {% csrf_token %} render hua ya flash message queue hua to page visitor-specific hai
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    storage = getattr(request, '_messages', None)
+    return not (storage is not None and len(storage))
+
+
+def _page_key(request):
+    # page_cache_stamp: ETag func ka row stamp (service_detail ka updated_at) - DB write se key badle.
+    # Namespace version get_or_compute key mein jodta hai.
+    stamp = getattr(request, 'page_cache_stamp', '')
+    digest = hashlib.md5(f'{request.build_absolute_uri()}|{stamp}'.encode()).hexdigest()
+    return f'public-page:{digest}'
+
+
+def cache_public_page(view_func=None, *, allowed_params=None):
+    """
+    Anonymous GET/HEAD responses ko cache karta hai. `allowed_params` diya ho to sirf unhi
+    query params wali URLs cache hoti hain (e.g. services bina search/filter ke).
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request) or (
+                allowed_params is not None and set(request.GET) - set(allowed_params)
+            ):
+                return view_func(request, *args, **kwargs)
+
+            rendered = []
+
+            def render():
+                response = view_func(request, *args, **kwargs)
+                if getattr(response, 'is_rendered', True) is False:
+                    response.render()  # TemplateResponse (class-based views)
+                rendered.append(response)
+                if not _cacheable_response(request, response):
+                    raise _Uncacheable
+                return response.content, response['Content-Type']
+
+            try:
+                content, content_type = cached_public(_page_key(request), render)
+            except _Uncacheable:
+                response = rendered[0]
+            else:
+                if rendered:
+                    response = rendered[0]
+                    response['X-Page-Cache'] = 'miss'
+                else:
+                    response = HttpResponse(content, content_type=content_type)
+                    response['X-Page-Cache'] = 'hit'
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+
+    return decorator(view_func) if view_func else decorator
@@ -0,0 +1,88 @@
+from datetime import datetime
+from django.conf import settings
+from django.core import signing
+from django.db.models import F, Q
+
+# =======================================================
+# Keyset (cursor) pagination - services listing
+# =======================================================
+# OFFSET ki jagah "last row ke baad" filter: deep page bhi pehle page jitna sasta rehta hai.
+# Har sort ke end mein id tie-breaker hai, taaki equal rating/price wali rows skip ya repeat na hon.
+
+CURSOR_SALT = 'myapp.services.cursor'
+
+# sort name -> [(field, descending), ...]
+SERVICE_SORT_KEYS = {
+    'relevance': [('search_rank', True), ('id', True)],
+    'rating': [('rating', True), ('id', True)],
+    'reviews': [('reviews_count', True), ('id', True)],
+    'price-low': [('price_min', False), ('id', False)],
+    'price-high': [('price_max', True), ('id', True)],
+    'newest': [('created_at', True), ('id', True)],
+}
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(sort, values):
+    """Last row ki sort values ko signed, opaque token mein pack karta hai."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return signing.dumps({'s': sort, 'v': payload}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, sort):
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidCursor('Cursor tampered or corrupt')
+    # Sort badalne par purana cursor bekaar hai
+    if not isinstance(data, dict) or data.get('s') != sort or len(data.get('v') or ()) != len(SERVICE_SORT_KEYS[sort]):
+        raise InvalidCursor('Cursor does not match sort')
+    values = data['v']
+    for index, (field, _) in enumerate(SERVICE_SORT_KEYS[sort]):
+        if field == 'created_at':
+            values[index] = datetime.fromisoformat(values[index])
+    return values
+
+
+def keyset_filter(keys, values):
+    """
+    (a, b) > (x, y) ko backend-neutral OR-chain mein likhta hai: a >= x AND (a > x OR (a = x AND b > y)).
+    Pehla `a >= x` redundant hai par isi se planner index par seek karta hai (OR-chain akele par
+    SQLite shuru se scan karta hai - deep page mehnga).
+    """
+    condition = Q()
+    equal = Q()
+    for (field, descending), value in zip(keys, values):
+        lookup = f'{field}__lt' if descending else f'{field}__gt'
+        condition |= equal & Q(**{lookup: value})
+        equal &= Q(**{field: value})
+    (first_field, first_descending), first_value = keys[0], values[0]
+    return Q(**{f'{first_field}__lte' if first_descending else f'{first_field}__gte': first_value}) & condition
+
+
+def paginate_services(queryset, sort, cursor=None, page_size=None):
+    """
+    Queryset ko `sort` ke keyset se order karke ek page laata hai.
+    Returns (services, next_cursor) - aakhri page par next_cursor None.
+    """
+    keys = SERVICE_SORT_KEYS[sort]
+    page_size = page_size or getattr(settings, 'SERVICES_PAGE_SIZE', 24)
+
+    queryset = queryset.order_by(*[F(field).desc() if descending else F(field).asc() for field, descending in keys])
+    if cursor:
+        try:
+            queryset = queryset.filter(keyset_filter(keys, decode_cursor(cursor, sort)))
+        except (InvalidCursor, TypeError, ValueError):
+            pass  # Kharab cursor par pehla page dikha do, 500 nahi
+
+    # Ek extra row se pata chalta hai ki agla page hai ya nahi (COUNT query ki zarurat nahi)
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, field) for field, _ in keys])
+    return rows, next_cursor
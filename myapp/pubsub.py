@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Har subscriber ki queue ka max size - slow client ke events drop ho jate hain (count resync ho jata hai)
+SUBSCRIBER_QUEUE_SIZE = getattr(settings, 'NOTIFICATION_PUBSUB_QUEUE_SIZE', 100)
+
+
+class BaseBroker(ABC):
+    """
+    Pub/sub backend interface. Multi-process deployments ke liye (e.g. Redis) isse subclass karke
+    settings.NOTIFICATION_PUBSUB_BACKEND mein dotted path dein.
+    """
+    @abstractmethod
+    def publish(self, channel, event):
+        """`event` ko channel ke saare subscribers tak bhejta hai (kisi bhi thread se callable)."""
+
+    @abstractmethod
+    def subscribe(self, channel):
+        """Returns a Subscription (`get()` / `drain()` se events, `close()` se unsubscribe)."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Subscription hatata hai - iske baad us queue mein events nahi aate."""
+
+
+class Subscription:
+    def __init__(self, broker, channel, queue):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue
+
+    async def get(self, timeout=None):
+        """Agla event; timeout par None."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self):
+        """Queue mein pade saare pending events (bina wait kiye)."""
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Ek process ke andar asyncio queues par pub/sub. Sync views (threads) se publish safe hai;
+    har idle connection sirf ek chhoti queue hold karta hai.
+
+    Limitation: events doosre processes (gunicorn/uvicorn workers, management commands jaise
+    process_notification_jobs) tak nahi pahunchte. Stream isliye unread count khud bhi poll karta
+    hai (NOTIFICATION_STREAM_POLL_INTERVAL) - count har jagah sahi rehta hai, par doosre process
+    ke `notification` events sirf shared backend (e.g. Redis) ke saath live aate hain.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, subscription in subscribers:
+            loop.call_soon_threadsafe(self._put, subscription.queue, event)
+
+    @staticmethod
+    def _put(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add((asyncio.get_running_loop(), subscription))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel, set())
+            subscribers.difference_update({item for item in subscribers if item[1] is subscription})
+            if not subscribers:
+                self._subscribers.pop(subscription.channel, None)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'NOTIFICATION_PUBSUB_BACKEND', 'myapp.pubsub.InProcessBroker')
+                _broker = import_string(backend)()
+    return _broker
+
+
+def user_channel(user_id):
+    return f'notifications:{user_id}'
+
+
+def publish_events(events):
+    """
+    (user_id, event_type, data) events ko users ke notification streams par bhejta hai -
+    transaction commit hone ke baad (ek hi on_commit callback), taaki client rolled-back rows na dekhe.
+    """
+    messages = [(user_channel(user_id), {'type': event_type, 'data': data or {}}) for user_id, event_type, data in events]
+    if not messages:
+        return
+
+    def send():
+        broker = get_broker()
+        for channel, event in messages:
+            broker.publish(channel, event)
+
+    transaction.on_commit(send)
+
+
+def publish_user_event(user_id, event_type, data=None):
+    publish_events([(user_id, event_type, data)])
+
+
+def publish_users_event(user_ids, event_type, data=None):
+    """Same event kai users ko (fan-out ke liye)."""
+    publish_events((user_id, event_type, data) for user_id in user_ids)
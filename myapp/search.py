@@ -0,0 +1,122 @@
+import re
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from .models import Service
+
+# Shadow FTS5 table (SQLite) aur GIN expression index (PostgreSQL) migration 0008 banata hai
+SQLITE_FTS_TABLE = 'myapp_service_fts'
+POSTGRES_TS_CONFIG = 'simple'
+
+SEARCH_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+_sqlite_fts_available = None
+
+
+def search_terms(text):
+    return SEARCH_TERM_RE.findall((text or '').lower())[:10]
+
+
+def sqlite_fts_available():
+    """FTS5 shadow table maujood hai ya nahi (SQLite build mein FTS5 na ho to migration skip karta hai)."""
+    global _sqlite_fts_available
+    if _sqlite_fts_available is None:
+        _sqlite_fts_available = SQLITE_FTS_TABLE in connection.introspection.table_names()
+    return _sqlite_fts_available
+
+
+def search_services(queryset, text):
+    """
+    Services queryset ko full-text search se filter karke `search_rank` annotate karta hai
+    (bada rank = zyada relevant). Har term prefix match hota hai, taaki type karte waqt bhi results milein.
+    PostgreSQL aur SQLite (FTS5) ke alawa kisi backend par icontains fallback use hota hai.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    
+    if connection.vendor == 'postgresql':
+        query = ' & '.join(f'{term}:*' for term in terms)
+        vector = f"to_tsvector('{POSTGRES_TS_CONFIG}', myapp_service.search_document)"
+        tsquery = f"to_tsquery('{POSTGRES_TS_CONFIG}', %s)"
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT id FROM myapp_service WHERE {vector} @@ {tsquery}", (query,))
+        ).annotate(
+            # ts_rank float4 deta hai - cursor mein Python float (float8) jata hai, jo float4 se compare
+            # karne par barabar nahi nikalta (boundary row repeat/skip). float8 mein hi rank karo.
+            search_rank=RawSQL(f"ts_rank({vector}, {tsquery})::float8", (query,), output_field=FloatField())
+        )
+    
+    if connection.vendor == 'sqlite' and sqlite_fts_available():
+        query = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s", (query,))
+        ).annotate(
+            # bm25() chhota = better, isliye negate
+            search_rank=RawSQL(
+                f"(SELECT -bm25({SQLITE_FTS_TABLE}) FROM {SQLITE_FTS_TABLE} "
+                f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid = myapp_service.id)",
+                (query,), output_field=FloatField()
+            )
+        )
+    
+    condition = Q()
+    for term in terms:
+        condition &= Q(search_document__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=RawSQL('0.0', (), output_field=FloatField()))
+
+
+SQLITE_FTS_TRIGGERS = {
+    'myapp_service_fts_ai': (
+        "CREATE TRIGGER IF NOT EXISTS myapp_service_fts_ai AFTER INSERT ON myapp_service BEGIN "
+        "INSERT INTO myapp_service_fts(rowid, search_document) VALUES (new.id, new.search_document); END"
+    ),
+    'myapp_service_fts_ad': (
+        "CREATE TRIGGER IF NOT EXISTS myapp_service_fts_ad AFTER DELETE ON myapp_service BEGIN "
+        "INSERT INTO myapp_service_fts(myapp_service_fts, rowid, search_document) "
+        "VALUES ('delete', old.id, old.search_document); END"
+    ),
+    'myapp_service_fts_au': (
+        "CREATE TRIGGER IF NOT EXISTS myapp_service_fts_au AFTER UPDATE OF search_document ON myapp_service BEGIN "
+        "INSERT INTO myapp_service_fts(myapp_service_fts, rowid, search_document) "
+        "VALUES ('delete', old.id, old.search_document); "
+        "INSERT INTO myapp_service_fts(rowid, search_document) VALUES (new.id, new.search_document); END"
+    ),
+}
+
+
+def ensure_sqlite_search_triggers(using=DEFAULT_DB_ALIAS):
+    """
+    SQLite par Service table ko rebuild karne wale migrations (ALTER TABLE ki jagah copy + rename)
+    triggers drop kar dete hain. post_migrate par missing triggers dobara banakar FTS rebuild karta hai.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite' or SQLITE_FTS_TABLE not in db.introspection.table_names():
+        return False
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'myapp_service'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [sql for name, sql in SQLITE_FTS_TRIGGERS.items() if name not in existing]
+        if not missing:
+            return False
+        for sql in missing:
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def refresh_search_documents(queryset):
+    """
+    Provider rename / category rename ke baad affected services ke search documents update karta hai.
+    Sirf badle hue rows likhe jate hain; index (trigger / expression index) khud sync rehta hai.
+    """
+    changed = []
+    for service in queryset.select_related('category', 'provider').iterator(chunk_size=500):
+        document = service.build_search_document()
+        if document != service.search_document:
+            service.search_document = document
+            changed.append(service)
+    Service.objects.bulk_update(changed, ['search_document'], batch_size=500)
+    return len(changed)
@@ -0,0 +1,566 @@
+import random
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.db.models.functions import Length
+from django.utils import timezone
+from .models import (
+    CustomUser, ServiceCategory, Service, Booking, Review, ServiceRequest, ServiceResponse, Notification,
+    NotificationCounter, ProviderMatch, ContactMessage, Locality,
+)
+from .utils import normalize_city, parse_location, category_key, parse_price_range, build_search_text
+from .metrics import reconcile_counters, rebuild_daily_metrics
+
+# =======================================================
+# Bulk deterministic data generator (create_sample_data --scale / benchmark)
+# =======================================================
+# Rows bulk_create se bante hain (signals nahi chalte), isliye denormalized fields
+# (price bounds, search_document, rating totals, ProviderMatch, city) yahin bharte hain aur
+# counters/rollups end mein reconcile hote hain. Same seed + volumes = same data, chahe
+# kitne bhi workers hon: har chunk ka apna RNG hai aur ids index se nikalte hain.
+# Timestamps seeding wale din (UTC midnight) se pichhe ki taraf spread hote hain - us din ke
+# andar same seed = same data.
+
+SEED_EMAIL_DOMAIN = 'seed.fixfinder.com'
+SEED_PASSWORD = 'seed12345'
+
+# Fixed chunk size - output worker count ya batch size par depend nahi karta
+CHUNK_SIZE = 1000
+
+# --scale 1 ke volumes; --scale N sab ko N se multiply karta hai
+DEFAULT_VOLUMES = {
+    'customers': 1000,
+    'providers': 100,
+    'services': 1000,
+    'bookings': 5000,
+    'requests': 1000,
+    'notifications': 20000,
+    'contact_messages': 100,
+}
+
+# Names create_categories wale; same key wali existing category (e.g. sample data ki 'Appliance')
+# reuse hoti hai, duplicate nahi banti
+CATEGORIES = [
+    ('Plumbing', '🔧'), ('Electrical', '⚡'), ('AC Repair', '❄️'), ('Carpentry', '🔨'),
+    ('Appliance Repair', '🔧'), ('Cleaning', '🧽'), ('Painting', '🎨'), ('Pest Control', '🐜'),
+]
+
+# Data kitne din pichhe tak phaila hai
+HISTORY_DAYS = 365
+NOTIFICATION_DAYS = 90
+
+# (city, weight) - bade shehron mein zyada users/providers
+CITIES = [
+    ('Mumbai, Maharashtra', 30), ('Delhi, NCR', 28), ('Bangalore, Karnataka', 20), ('Pune, Maharashtra', 12),
+    ('Hyderabad, Telangana', 10), ('Chennai, Tamil Nadu', 8), ('Kolkata, West Bengal', 7),
+    ('Ahmedabad, Gujarat', 6), ('Jaipur, Rajasthan', 4), ('Lucknow, Uttar Pradesh', 3),
+    ('Indore, Madhya Pradesh', 2), ('Kochi, Kerala', 2),
+]
+CITY_NAMES = [city for city, _ in CITIES]
+CITY_WEIGHTS = [weight for _, weight in CITIES]
+
+FIRST_NAMES = ['Rajesh', 'Priya', 'Amit', 'Sneha', 'Rahul', 'Neha', 'Arun', 'Kavita', 'Vikram', 'Pooja',
+               'Suresh', 'Anjali', 'Manoj', 'Divya', 'Karan', 'Meera', 'Sanjay', 'Ritu', 'Deepak', 'Swati']
+LAST_NAMES = ['Kumar', 'Sharma', 'Verma', 'Patel', 'Mehta', 'Singh', 'Reddy', 'Iyer', 'Gupta', 'Nair',
+              'Joshi', 'Rao', 'Das', 'Shah', 'Mishra', 'Pillai', 'Bose', 'Chopra', 'Malhotra', 'Kulkarni']
+
+SERVICE_TITLES = ['Expert {} Services', 'Emergency {} Help', 'Affordable {} Solutions', '{} Repair & Maintenance',
+                  'Certified {} Work', 'Same Day {} Service', 'Premium {} Care', '{} Specialists']
+DESCRIPTION_WORDS = ('professional reliable certified quick affordable warranty genuine parts emergency '
+                     'installation repair maintenance inspection home office safe eco-friendly trained '
+                     'experienced guaranteed transparent pricing doorstep support weekend available').split()
+
+REQUEST_CATEGORIES = [key for key, _ in ServiceRequest.CATEGORY_CHOICES]
+REQUEST_STATUSES = (['open', 'in_progress', 'assigned', 'completed', 'cancelled'], [50, 10, 10, 20, 10])
+BOOKING_STATUSES = (['pending', 'confirmed', 'in_progress', 'completed', 'cancelled'], [10, 10, 5, 65, 10])
+RATING_WEIGHTS = [1, 2, 5, 12, 15]
+RESPONSE_COUNTS = ([0, 1, 2, 3, 5, 8], [25, 30, 20, 12, 9, 4])
+NOTIFICATION_TYPES = [key for key, _ in Notification.NOTIFICATION_TYPES]
+CONTACT_SUBJECTS = [key for key, _ in ContactMessage.SUBJECT_CHOICES]
+
+
+def _rng(seed, kind, chunk):
+    return random.Random(f'{seed}:{kind}:{chunk}')
+
+
+def _skewed(rng, count, power=2.0):
+    """0..count-1 mein power-law pick - chhote index (popular providers/customers) zyada aate hain."""
+    return min(int(count * rng.random() ** power), count - 1)
+
+
+def _person(index):
+    """Index se deterministic naam - service search_document ke liye DB lookup nahi chahiye."""
+    return FIRST_NAMES[index % len(FIRST_NAMES)], LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+
+
+def _words(rng, low, high):
+    return ' '.join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _moment(rng, anchor, days):
+    """anchor se pichhle `days` dinon mein ek random waqt (recent dates thodi zyada)."""
+    return anchor - timedelta(seconds=int(days * 86400 * rng.random() ** 1.5))
+
+
+def scaled_volumes(scale, overrides=None):
+    """DEFAULT_VOLUMES * scale; overrides (None values ignore) specific volumes badalte hain."""
+    volumes = {name: int(value * scale) for name, value in DEFAULT_VOLUMES.items()}
+    volumes.update({name: value for name, value in (overrides or {}).items() if value is not None})
+    return volumes
+
+
+class SeedPlan:
+    """
+    Volumes, id offsets aur shared lookups. Generators plain dicts lautate hain taaki worker
+    processes unhe pickle karke parent ko bhej sakein; DB mein sirf parent likhta hai.
+    """
+
+    def __init__(self, volumes, seed, id_base, categories, localities, password_hash, anchor, name_base):
+        self.volumes = volumes
+        self.seed = seed
+        self.id_base = id_base
+        self.anchor = anchor  # Timestamps isse pichhe jate hain
+        self.name_base = name_base  # kind -> pehla free username index (re-seed par unique)
+        self.categories = categories  # [(id, name)]
+        self.localities = localities  # location string -> Locality id
+        self.password_hash = password_hash
+
+        rng = _rng(seed, 'provider-cities', 0)
+        self.provider_cities = rng.choices(CITY_NAMES, CITY_WEIGHTS, k=volumes['providers'])
+        self.providers_by_key = defaultdict(list)
+        for index, city in enumerate(self.provider_cities):
+            for _, name in self.provider_categories(index):
+                self.providers_by_key[(category_key(name), normalize_city(city))].append(index)
+
+    def customer_id(self, index):
+        return self.id_base['user'] + index
+
+    def provider_id(self, index):
+        return self.id_base['user'] + self.volumes['customers'] + index
+
+    def username(self, kind, index):
+        return f'{kind}{self.name_base[kind] + index}@{SEED_EMAIL_DOMAIN}'
+
+    def provider_categories(self, index):
+        count = len(self.categories)
+        first = index % count
+        return [self.categories[first], self.categories[(first + 1 + index // count) % count]]
+
+    # ---------- users ----------
+    def users(self, start, count):
+        rng = _rng(self.seed, 'users', start)
+        users, categories, matches = [], [], []
+        customers = self.volumes['customers']
+        for index in range(start, start + count):
+            is_provider = index >= customers
+            local = index - customers if is_provider else index
+            first, last = _person(index)
+            kind = 'provider' if is_provider else 'customer'
+            location = self.provider_cities[local] if is_provider else rng.choices(CITY_NAMES, CITY_WEIGHTS)[0]
+            joined = _moment(rng, self.anchor, HISTORY_DAYS)
+            users.append({
+                'id': self.id_base['user'] + index,
+                'username': self.username(kind, local),
+                'email': self.username(kind, local),
+                'password': self.password_hash,
+                'first_name': first,
+                'last_name': last,
+                'user_type': kind,
+                'phone': f'+91 9{rng.randrange(10 ** 9):09d}',
+                'location': location,
+                'locality_id': self.localities[location],
+                'is_verified': rng.random() < 0.8,
+                'business_name': f'{first} {last} Services' if is_provider else None,
+                'experience': f'{rng.randint(1, 20)} years' if is_provider else None,
+                'date_joined': joined,
+                'registration_date': joined,
+            })
+            if is_provider:
+                city = normalize_city(location)
+                for category_id, name in self.provider_categories(local):
+                    categories.append({'customuser_id': self.id_base['user'] + index, 'servicecategory_id': category_id})
+                    matches.append({'provider_id': self.id_base['user'] + index, 'category': category_key(name), 'city': city})
+        return {'users': users, 'user_categories': categories, 'matches': matches}
+
+    # ---------- services + bookings + reviews ----------
+    def services(self, start, count):
+        rng = _rng(self.seed, 'services', start)
+        services, bookings, reviews = [], [], []
+        bookings_per_service = self.volumes['bookings'] / max(self.volumes['services'], 1)
+        for index in range(start, start + count):
+            # Kuch providers ke paas bahut services (power law), zyada tar ke paas 1-2
+            provider = _skewed(rng, self.volumes['providers'])
+            provider_id = self.provider_id(provider)
+            category_id, category_name = rng.choice(self.provider_categories(provider))
+            first, last = _person(self.volumes['customers'] + provider)
+            title = rng.choice(SERVICE_TITLES).format(category_name)
+            description = _words(rng, 12, 30).capitalize() + '.'
+            low = rng.randrange(2, 40) * 50
+            price_range = f'₹{low}-{low + rng.randrange(2, 60) * 50}'
+            price_min, price_max = parse_price_range(price_range)
+            service_id = self.id_base['service'] + index
+            created = _moment(rng, self.anchor, HISTORY_DAYS)
+
+            # Bookings exponential distribution se (long tail); completed par aksar approved review
+            booking_count = round(rng.expovariate(1 / bookings_per_service)) if bookings_per_service else 0
+            rating_total = reviews_count = 0
+            for _ in range(booking_count):
+                customer_id = self.customer_id(_skewed(rng, self.volumes['customers'], 1.5))
+                status = rng.choices(*BOOKING_STATUSES)[0]
+                # Booking service ke baad hi; kaam 0-14 din baad, review kaam ke 0-3 din baad
+                booked = created + (self.anchor - created) * rng.random()
+                service_day = booked + timedelta(days=rng.randint(0, 14))
+                if status == 'completed' and rng.random() < 0.6:
+                    rating = rng.choices([1, 2, 3, 4, 5], RATING_WEIGHTS)[0]
+                    rating_total += rating
+                    reviews_count += 1
+                    reviews.append({
+                        'booking_index': len(bookings),
+                        'customer_id': customer_id,
+                        'provider_id': provider_id,
+                        'service_id': service_id,
+                        'rating': rating,
+                        'comment': 'Great service, would book again.' if rating >= 4 else 'Work was okay.',
+                        'created_at': min(service_day + timedelta(days=rng.randint(0, 3)), self.anchor),
+                    })
+                bookings.append({
+                    'customer_id': customer_id,
+                    'provider_id': provider_id,
+                    'service_id': service_id,
+                    'service_name': title,
+                    'service_description': description[:200],
+                    'total_price': price_min,
+                    'status': status,
+                    'booking_date': booked,
+                    'service_date': service_day.date(),
+                    'service_time': f'{rng.randint(8, 19):02d}:00',
+                    'customer_address': rng.choices(CITY_NAMES, CITY_WEIGHTS)[0],
+                })
+
+            services.append({
+                'id': service_id,
+                'provider_id': provider_id,
+                'category_id': category_id,
+                'title': title,
+                'description': description,
+                'price_range': price_range,
+                'price_min': price_min or 0,
+                'price_max': price_max or 0,
+                'location': self.provider_cities[provider],
+                'locality_id': self.localities[self.provider_cities[provider]],
+                'experience': f'{rng.randint(1, 20)} years',
+                'availability': rng.choice(['Available Now', 'Available', 'Available 24/7']),
+                'rating': rating_total / reviews_count if reviews_count else 0.0,
+                'rating_total': rating_total,
+                'reviews_count': reviews_count,
+                'is_active': rng.random() < 0.95,
+                'is_verified': rng.random() < 0.7,
+                'search_document': build_search_text(title, description, category_name, first, last),
+                'created_at': created,
+            })
+        return {'services': services, 'bookings': bookings, 'reviews': reviews}
+
+    # ---------- service requests + responses ----------
+    def requests(self, start, count):
+        rng = _rng(self.seed, 'requests', start)
+        rows, responses = [], []
+        for index in range(start, start + count):
+            customer = _skewed(rng, self.volumes['customers'], 1.5)
+            first, last = _person(customer)
+            location = rng.choices(CITY_NAMES, CITY_WEIGHTS)[0]
+            city = normalize_city(location)
+            category = rng.choice(REQUEST_CATEGORIES)
+            status = rng.choices(*REQUEST_STATUSES)[0]
+            request_id = self.id_base['request'] + index
+            created = _moment(rng, self.anchor, HISTORY_DAYS)
+
+            # Matching providers (same category + city) respond karte hain; na milein to koi nahi
+            candidates = self.providers_by_key.get((category, city), [])
+            responders = rng.sample(candidates, min(rng.choices(*RESPONSE_COUNTS)[0], len(candidates)))
+            for provider in responders:
+                responses.append({
+                    'service_request_id': request_id,
+                    'provider_id': self.provider_id(provider),
+                    'message': f'I can help with this. {_words(rng, 6, 14).capitalize()}.',
+                    'proposed_price': rng.randrange(4, 100) * 50,
+                    'estimated_time': rng.choice(['1 hour', '2-3 hours', 'Half day', '1 day', '2 days']),
+                    'created_at': min(created + timedelta(minutes=rng.randint(5, 48 * 60)), self.anchor),
+                })
+            assigned = status in ('in_progress', 'assigned', 'completed') and responders
+
+            rows.append({
+                'id': request_id,
+                'customer_id': self.customer_id(customer),
+                'category': category,
+                'title': f'Need {category.replace("-", " ")} help',
+                'description': _words(rng, 8, 20),
+                'location': location,
+                'city': city,
+                'locality_id': self.localities[location],
+                'urgency': rng.choices(['low', 'medium', 'high'], [30, 50, 20])[0],
+                'budget': rng.choice(['0-500', '500-1000', '1000-2000', '2000-5000', '5000+']),
+                'contact_name': f'{first} {last}',
+                'contact_phone': f'+91 8{rng.randrange(10 ** 9):09d}',
+                'status': status,
+                'assigned_provider_id': self.provider_id(responders[0]) if assigned else None,
+                'created_at': created,
+            })
+        return {'requests': rows, 'responses': responses}
+
+    # ---------- notifications ----------
+    def notifications(self, start, count):
+        rng = _rng(self.seed, 'notifications', start)
+        users = self.volumes['customers'] + self.volumes['providers']
+        rows = []
+        for _ in range(count):
+            notification_type = rng.choices(NOTIFICATION_TYPES, [40, 15, 20, 10, 15])[0]
+            rows.append({
+                'user_id': self.id_base['user'] + _skewed(rng, users),
+                'title': f'New {notification_type} update',
+                'message': 'You have a new update on FixFinder.',
+                'notification_type': notification_type,
+                'is_read': rng.random() < 0.7,
+                'created_at': _moment(rng, self.anchor, NOTIFICATION_DAYS),
+            })
+        return {'notifications': rows}
+
+    # ---------- contact messages ----------
+    def contact_messages(self, start, count):
+        rng = _rng(self.seed, 'contact_messages', start)
+        rows = []
+        for index in range(start, start + count):
+            first, last = _person(index)
+            rows.append({
+                'name': f'{first} {last}',
+                'email': f'visitor{index}@{SEED_EMAIL_DOMAIN}',
+                'subject': rng.choice(CONTACT_SUBJECTS),
+                'message': _words(rng, 10, 40).capitalize() + '.',
+                'is_resolved': rng.random() < 0.5,
+                'created_at': _moment(rng, self.anchor, HISTORY_DAYS),
+            })
+        return {'contact_messages': rows}
+
+
+# =======================================================
+# Parallel generation
+# =======================================================
+# Workers sirf rows banate hain; parent unhe order mein insert karta hai (booking ids isi order
+# se assign hote hain). Window ki wajah se memory mein workers * 2 se zyada chunks nahi rehte.
+
+_worker_plan = None
+
+
+def _init_worker(plan):
+    global _worker_plan
+    if not apps.ready:  # spawn start method - fork mein already setup hai
+        django.setup()
+    _worker_plan = plan
+
+
+def _generate(kind, start, count):
+    return getattr(_worker_plan, kind)(start, count)
+
+
+def generate_chunks(plan, kind, total, executor=None, workers=1):
+    """`kind` ke chunks order mein yield karta hai (executor ho to processes mein parallel)."""
+    chunks = [(start, min(CHUNK_SIZE, total - start)) for start in range(0, total, CHUNK_SIZE)]
+    if executor is None:
+        for start, count in chunks:
+            yield getattr(plan, kind)(start, count)
+        return
+    pending = deque()
+    for start, count in chunks:
+        pending.append(executor.submit(_generate, kind, start, count))
+        if len(pending) >= workers * 2:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# =======================================================
+# Inserts
+# =======================================================
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+def ensure_categories():
+    """CATEGORIES ke (id, name); same category_key wali existing row ho to wahi use hoti hai."""
+    existing = {}
+    for pk, name in ServiceCategory.objects.order_by('id').values_list('id', 'name'):
+        existing.setdefault(category_key(name), (pk, name))
+    categories = []
+    for name, icon in CATEGORIES:
+        if category_key(name) not in existing:
+            existing[category_key(name)] = (ServiceCategory.objects.create(name=name, icon=icon).pk, name)
+        categories.append(existing[category_key(name)])
+    return sorted(categories)
+
+
+def ensure_localities():
+    localities = {}
+    for location in CITY_NAMES:
+        city, area, state = parse_location(location)
+        localities[location] = Locality.objects.get_or_create(city=city, area=area, defaults={'state': state})[0].pk
+    return localities
+
+
+def _name_base(kind):
+    """Pichhle seed runs ke `{kind}N@` usernames ke baad ka pehla index."""
+    last = (
+        CustomUser.objects.filter(username__regex=rf'^{kind}[0-9]+@{SEED_EMAIL_DOMAIN}$')
+        .order_by(Length('username').desc(), '-username').values_list('username', flat=True).first()
+    )
+    return int(last[len(kind):last.index('@')]) + 1 if last else 0
+
+
+def build_plan(volumes=None, seed=42):
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    volumes['providers'] = max(volumes['providers'], 1)
+    volumes['customers'] = max(volumes['customers'], 1)
+    id_base = {
+        'user': _next_id(CustomUser),
+        'service': _next_id(Service),
+        'request': _next_id(ServiceRequest),
+    }
+    anchor = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    name_base = {kind: _name_base(kind) for kind in ('customer', 'provider')}
+    # Ek hi hash sab seeded users ke liye - har row par PBKDF2 chalana minutes le leta
+    return SeedPlan(volumes, seed, id_base, ensure_categories(), ensure_localities(), make_password(SEED_PASSWORD),
+                    anchor, name_base)
+
+
+@contextmanager
+def _generated_dates(model, dates):
+    """
+    `dates` ke auto_now_add ko bulk_create ke dauran band karta hai - pre_save warna generated
+    timestamp ko "now" se overwrite kar deta (follow-up bulk_update ki zarurat nahi).
+    Field objects process-wide hain; seeding ek hi thread se insert karta hai.
+    """
+    fields = [(field, field.auto_now_add) for field in map(model._meta.get_field, dates)]
+    for field, _ in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add in fields:
+            field.auto_now_add = auto_now_add
+
+
+def _bulk_create(model, rows, batch_size, dates=(), **kwargs):
+    """bulk_create jo generated timestamps (auto_now_add fields `dates`) insert payload mein hi rakhta hai."""
+    with _generated_dates(model, dates):
+        return model.objects.bulk_create([model(**row) for row in rows], batch_size=batch_size, **kwargs)
+
+
+def insert_users(result, batch_size):
+    _bulk_create(CustomUser, result['users'], batch_size, dates=('registration_date',))
+    through = CustomUser.service_categories.through
+    through.objects.bulk_create([through(**row) for row in result['user_categories']], batch_size=batch_size)
+    ProviderMatch.objects.bulk_create([ProviderMatch(**row) for row in result['matches']], batch_size=batch_size,
+                                      ignore_conflicts=True)
+
+
+def insert_services(result, batch_size, next_booking_id):
+    """Booking ids yahan sequential assign hote hain (chunks order mein aate hain - deterministic)."""
+    _bulk_create(Service, result['services'], batch_size, dates=('created_at',))
+    _bulk_create(Booking, [
+        {'id': next_booking_id + offset, **row} for offset, row in enumerate(result['bookings'])
+    ], batch_size, dates=('booking_date',))
+    reviews = []
+    for row in result['reviews']:
+        row = dict(row)
+        row['booking_id'] = next_booking_id + row.pop('booking_index')
+        reviews.append(row)
+    _bulk_create(Review, reviews, batch_size, dates=('created_at',))
+    return next_booking_id + len(result['bookings'])
+
+
+def insert_requests(result, batch_size):
+    _bulk_create(ServiceRequest, result['requests'], batch_size, dates=('created_at',))
+    _bulk_create(ServiceResponse, result['responses'], batch_size, dates=('created_at',))
+
+
+def insert_notifications(result, batch_size):
+    _bulk_create(Notification, result['notifications'], batch_size, dates=('created_at',))
+
+
+def insert_contact_messages(result, batch_size):
+    _bulk_create(ContactMessage, result['contact_messages'], batch_size, dates=('created_at',))
+
+
+def finalize(plan):
+    """Bulk insert ke baad sequences, unread counters, platform metrics aur caches theek karta hai."""
+    models = [CustomUser, Service, Booking, Review, ServiceRequest, ServiceResponse, Notification, ContactMessage]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+    user_ids = (plan.id_base['user'], plan.id_base['user'] + plan.volumes['customers'] + plan.volumes['providers'])
+    unread = (
+        Notification.objects.filter(user_id__gte=user_ids[0], user_id__lt=user_ids[1], is_read=False)
+        .values_list('user_id').annotate(total=Count('id')).order_by()
+    )
+    NotificationCounter.objects.filter(user_id__gte=user_ids[0], user_id__lt=user_ids[1]).delete()
+    NotificationCounter.objects.bulk_create([NotificationCounter(user_id=user_id, unread=total) for user_id, total in unread],
+                                            batch_size=1000)
+    reconcile_counters()
+    rebuild_daily_metrics()
+    cache.clear()
+
+
+def seed_database(volumes=None, seed=42, workers=1, batch_size=1000, log=None):
+    """
+    Volumes ke hisaab se data generate karke insert karta hai. Returns SeedPlan (ids/volumes).
+    `workers` > 1 par generation process pool mein hoti hai; `log` progress callable hai.
+    """
+    log = log or (lambda message: None)
+    plan = build_plan(volumes, seed)
+    volumes = plan.volumes
+    total_users = volumes['customers'] + volumes['providers']
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(plan,)) if workers > 1 else None
+
+    # Har chunk apne transaction mein commit hota hai - lakhon rows ka ek transaction (WAL/undo log,
+    # locks) nahi. Beech mein fail ho to ab tak ke chunks rehte hain; dobara seed naye ids/usernames
+    # se chalta hai aur reconcile_platform_metrics counters theek kar deta hai.
+    try:
+        for result in generate_chunks(plan, 'users', total_users, executor, workers):
+            with transaction.atomic():
+                insert_users(result, batch_size)
+        log(f'Users: {total_users}')
+
+        next_booking_id = first_booking_id = _next_id(Booking)
+        for result in generate_chunks(plan, 'services', volumes['services'], executor, workers):
+            with transaction.atomic():
+                next_booking_id = insert_services(result, batch_size, next_booking_id)
+        log(f'Services: {volumes["services"]}, bookings: {next_booking_id - first_booking_id}')
+
+        for result in generate_chunks(plan, 'requests', volumes['requests'], executor, workers):
+            with transaction.atomic():
+                insert_requests(result, batch_size)
+        log(f'Service requests: {volumes["requests"]}')
+
+        for result in generate_chunks(plan, 'notifications', volumes['notifications'], executor, workers):
+            with transaction.atomic():
+                insert_notifications(result, batch_size)
+        log(f'Notifications: {volumes["notifications"]}')
+
+        for result in generate_chunks(plan, 'contact_messages', volumes['contact_messages'], executor, workers):
+            with transaction.atomic():
+                insert_contact_messages(result, batch_size)
+        log(f'Contact messages: {volumes["contact_messages"]}')
+        with transaction.atomic():
+            finalize(plan)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    return plan
@@ -0,0 +1,245 @@
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed, post_migrate
+from django.dispatch import receiver
+from django.db import transaction
+from .models import CustomUser, ServiceCategory, ProviderMatch, Notification, Service, Review, Booking, ServiceRequest, ContactMessage, TeamMember, ServiceImage
+from .notifications import increment_unread, decrement_unread, notification_payload
+from .pubsub import publish_user_event
+from .search import refresh_search_documents, ensure_sqlite_search_triggers
+from .stats import invalidate_dashboard_stats
+from .metrics import metric_keys, apply_metric_change
+from .pagecache import bump_public_cache_version
+from .categories import refresh_categories
+from .images import delete_variants
+
+# =======================================================
+# 1. Provider Match Index
+# =======================================================
+
+# Sirf in fields ke change par index rebuild hota hai (login par last_login save skip)
+PROVIDER_MATCH_FIELDS = {'location', 'user_type', 'is_active'}
+
+@receiver(post_save, sender=CustomUser)
+def sync_provider_match_on_user_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not PROVIDER_MATCH_FIELDS.intersection(update_fields):
+        return
+    if created and instance.user_type != 'provider':
+        return
+    ProviderMatch.rebuild_for(instance)
+
+@receiver(m2m_changed, sender=CustomUser.service_categories.through)
+def sync_provider_match_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    
+    if not reverse:
+        if action != 'pre_clear':
+            ProviderMatch.rebuild_for(instance)
+        return
+    
+    # Reverse side (category.customuser_set.add(...)): affected providers rebuild karo
+    if action == 'pre_clear':
+        # post_clear par pk_set nahi milta, isliye providers pehle hi note kar lo
+        instance._match_clear_pks = list(instance.customuser_set.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_match_clear_pks', [])
+    for provider in CustomUser.objects.filter(pk__in=pk_set or []):
+        ProviderMatch.rebuild_for(provider)
+
+@receiver(post_save, sender=ServiceCategory)
+def sync_provider_match_on_category_save(sender, instance, created, raw=False, **kwargs):
+    # Category rename se slug badal sakta hai
+    if raw or created:
+        return
+    for provider in instance.customuser_set.filter(user_type='provider'):
+        ProviderMatch.rebuild_for(provider)
+
+@receiver(pre_delete, sender=ServiceCategory)
+def note_providers_on_category_delete(sender, instance, **kwargs):
+    # Category delete par m2m_changed nahi chalta aur through rows cascade se hat jati hain -
+    # affected providers pehle hi note kar lo
+    instance._match_provider_pks = list(instance.customuser_set.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=ServiceCategory)
+def sync_provider_match_on_category_delete(sender, instance, **kwargs):
+    for provider in CustomUser.objects.filter(pk__in=getattr(instance, '_match_provider_pks', [])):
+        ProviderMatch.rebuild_for(provider)
+
+# =======================================================
+# 2. Unread Notification Counter
+# =======================================================
+# Notification.objects.create() / admin edits ke liye. Bulk paths (notify_many, mark_read,
+# mark_all_read) counter khud update karte hain kyunki bulk_create/update signals nahi bhejte.
+
+@receiver(pre_save, sender=Notification)
+def remember_notification_read_state(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._was_read = Notification.objects.filter(pk=instance.pk).values_list('is_read', flat=True).first()
+
+@receiver(post_save, sender=Notification)
+def count_unread_on_notification_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        if not instance.is_read:
+            increment_unread([instance.user_id])
+        publish_user_event(instance.user_id, 'notification', notification_payload(instance))
+        return
+    was_read = getattr(instance, '_was_read', None)
+    if was_read is False and instance.is_read:
+        decrement_unread(instance.user_id)
+    elif was_read is True and not instance.is_read:
+        increment_unread([instance.user_id])
+
+@receiver(post_delete, sender=Notification)
+def count_unread_on_notification_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        decrement_unread(instance.user_id)
+
+# =======================================================
+# 3. Service Search Index
+# =======================================================
+# Service.save() apna search_document khud banata hai; yahan sirf related rows ke renames.
+
+SEARCH_USER_FIELDS = {'first_name', 'last_name'}
+
+@receiver(post_save, sender=CustomUser)
+def refresh_search_on_provider_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or created or instance.user_type != 'provider':
+        return
+    if update_fields is not None and not SEARCH_USER_FIELDS.intersection(update_fields):
+        return
+    refresh_search_documents(Service.objects.filter(provider=instance))
+
+@receiver(post_save, sender=ServiceCategory)
+def refresh_search_on_category_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    refresh_search_documents(Service.objects.filter(category=instance))
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using='default', **kwargs):
+    if sender.name == 'myapp':
+        ensure_sqlite_search_triggers(using)
+
+
+# =======================================================
+# 4. Service Rating Aggregate
+# =======================================================
+# Review.save() delta khud apply karta hai; delete (admin/cascade) yahan se.
+# Service delete ke cascade mein service row pehle hi ja chuki hoti hai - update no-op rehta hai.
+
+@receiver(post_delete, sender=Review)
+def subtract_rating_on_review_delete(sender, instance, **kwargs):
+    if instance.is_approved:
+        Service.apply_review_delta(instance.service_id, -instance.rating, -1)
+
+
+# =======================================================
+# 5. Dashboard Stats Cache
+# =======================================================
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_stats_on_booking_change(sender, instance, **kwargs):
+    invalidate_dashboard_stats(instance.customer_id, instance.provider_id)
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_stats_on_review_change(sender, instance, **kwargs):
+    invalidate_dashboard_stats(instance.provider_id)
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_stats_on_service_change(sender, instance, **kwargs):
+    # Provider ka total_services count
+    invalidate_dashboard_stats(instance.provider_id)
+
+
+# =======================================================
+# 6. Platform Counters / Daily Rollups
+# =======================================================
+# Naya row +1, delete -1; user_type badalne par purane aur naye counters ka farq.
+
+@receiver(pre_save, sender=CustomUser)
+def remember_user_metric_keys(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or instance._state.adding or not instance.pk:
+        return
+    if update_fields is not None and 'user_type' not in update_fields:
+        return
+    row = CustomUser.objects.filter(pk=instance.pk).values('user_type', 'date_joined').first()
+    if row:
+        instance._metric_keys_before = metric_keys(CustomUser(**row))
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_save, sender=ContactMessage)
+def count_platform_metrics_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_metric_change(([], []), metric_keys(instance))
+        return
+    before = instance.__dict__.pop('_metric_keys_before', None)
+    if before is not None:
+        apply_metric_change(before, metric_keys(instance))
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=ServiceRequest)
+@receiver(post_delete, sender=ContactMessage)
+def count_platform_metrics_on_delete(sender, instance, **kwargs):
+    apply_metric_change(metric_keys(instance), ([], []))
+
+
+# =======================================================
+# 7. Public Page Cache
+# =======================================================
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+@receiver(post_save, sender=ServiceImage)
+@receiver(post_delete, sender=ServiceImage)
+def invalidate_public_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_public_cache_version()
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_public_pages_on_provider_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Provider ka naam/location service_detail par dikhta hai; login (sirf last_login) ignore
+    if raw or instance.user_type != 'provider' or update_fields == frozenset({'last_login'}):
+        return
+    bump_public_cache_version()
+
+
+# =======================================================
+# 8. Category Registry
+# =======================================================
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+def refresh_category_registry(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_categories()
+
+
+# =======================================================
+# 9. Service Image Variants
+# =======================================================
+
+@receiver(post_delete, sender=ServiceImage)
+def delete_service_image_variants(sender, instance, **kwargs):
+    # Variant files humne banaye hain - image row ke saath hata do (original pehle jaisa rehta hai)
+    transaction.on_commit(lambda: delete_variants(instance))
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db.models import Avg, Count, OuterRef, Q, Subquery, Sum
+from .caching import get_or_compute, invalidate
+from .models import CustomUser, Review, Service
+
+# =======================================================
+# Dashboard Stats (per-user cache)
+# =======================================================
+# Har role ke counters ek conditional-aggregation query mein; result cache mein rehta hai
+# aur Booking/Review/Service writes par signals.py se invalidate hota hai.
+
+ACTIVE_BOOKING_STATUSES = ('confirmed', 'in_progress')
+
+
+def stats_cache_key(user_id):
+    return f'dashboard-stats:{user_id}'
+
+
+def _scalar(queryset, expression):
+    """Correlated subquery jo user row ke against ek aggregate value lautata hai."""
+    return Subquery(queryset.order_by().values('provider').annotate(value=expression).values('value'))
+
+
+def _booking_aggregates(relation):
+    completed = Q(**{f'{relation}__status': 'completed'})
+    return {
+        'total_bookings': Count(relation),
+        'active_bookings': Count(relation, filter=Q(**{f'{relation}__status__in': ACTIVE_BOOKING_STATUSES})),
+        'completed_bookings': Count(relation, filter=completed),
+        'total_amount': Sum(f'{relation}__total_price', filter=completed),
+    }
+
+
+def compute_customer_stats(user_id):
+    row = CustomUser.objects.filter(pk=user_id).order_by().values('pk').annotate(
+        **_booking_aggregates('customer_bookings')
+    ).get()
+    return {
+        'total_bookings': row['total_bookings'],
+        'active_bookings': row['active_bookings'],
+        'completed_bookings': row['completed_bookings'],
+        'total_spent': row['total_amount'] or 0,
+    }
+
+
+def compute_provider_stats(user_id):
+    # Bookings LEFT JOIN se; services/reviews correlated subqueries se (join multiply nahi hota)
+    reviews = Review.objects.filter(provider=OuterRef('pk'))
+    row = CustomUser.objects.filter(pk=user_id).order_by().values('pk').annotate(
+        **_booking_aggregates('provider_bookings'),
+        total_services=_scalar(Service.objects.filter(provider=OuterRef('pk'), is_active=True), Count('id')),
+        total_reviews=_scalar(reviews, Count('id')),
+        average_rating=_scalar(reviews, Avg('rating')),
+    ).get()
+    return {
+        'total_bookings': row['total_bookings'],
+        'active_bookings': row['active_bookings'],
+        'completed_bookings': row['completed_bookings'],
+        'total_earned': row['total_amount'] or 0,
+        'total_services': row['total_services'] or 0,
+        'total_reviews': row['total_reviews'] or 0,
+        'average_rating': round(row['average_rating'] or 0, 1),
+    }
+
+
+def dashboard_stats(user):
+    """Cached stats dict; cache miss par ek hi DB round-trip (single-flight, early refresh)."""
+    compute = compute_provider_stats if user.user_type == 'provider' else compute_customer_stats
+    return get_or_compute(
+        stats_cache_key(user.pk), lambda: compute(user.pk),
+        getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 3600),
+    )
+
+
+def invalidate_dashboard_stats(*user_ids):
+    """Commit ke baad delete - warna parallel request purani values dobara cache kar sakti hai."""
+    invalidate(*(stats_cache_key(user_id) for user_id in user_ids if user_id))
@@ -0,0 +1,1076 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from . import caching, categories, images, metrics, notifications, search, seeding, stats
+from .management.commands.check_query_plans import HOT_QUERIES, ORDERED_QUERIES, explain, plan_indexes, plan_sorts
+from .pagination import SERVICE_SORT_KEYS, paginate_services
+from .pubsub import BaseBroker
+from .utils import normalize_city, parse_location
+from .mail import claim_batch, deliver_batch, enqueue_mail, retry_delay
+from .models import (
+    Booking, ContactMessage, CustomUser, DailyMetric, EmailOutbox, Locality, Notification, NotificationCounter,
+    NotificationJob, PlatformCounter, ProviderMatch, Review, Service, ServiceCategory, ServiceImage, ServiceRequest,
+)
+
+
+def make_user(username, user_type='customer', location='Andheri, Mumbai', **extra):
+    # Password hash nahi (PBKDF2 slow hai) - tests force_login use karte hain
+    return CustomUser.objects.create(
+        username=username, email=username, user_type=user_type,
+        first_name=username.split('@')[0].title(), last_name='Test', phone='9876543210',
+        location=location, **extra,
+    )
+
+
+def make_service(provider, category, title='Pipe repair', price_range='₹500-1000', **extra):
+    return Service.objects.create(
+        provider=provider, category=category, title=title, description=f'{title} at home',
+        price_range=price_range, location=provider.location, experience='5 years', **extra,
+    )
+
+
+def make_booking(customer, service, **extra):
+    return Booking.objects.create(
+        customer=customer, provider=service.provider, service=service, service_name=service.title,
+        service_description=service.description, total_price=Decimal('750.00'), service_date=date(2026, 1, 15),
+        service_time=time(10, 30), customer_address='12 MG Road, Andheri', **extra,
+    )
+
+
+# =======================================================
+# 1. Provider Match Index
+# =======================================================
+
+class ProviderMatchTests(TestCase):
+    def test_category_delete_removes_match_keys(self):
+        plumbing = ServiceCategory.objects.create(name='Plumbing')
+        electrical = ServiceCategory.objects.create(name='Electrical')
+        provider = make_user('provider@test.com', 'provider')
+        provider.service_categories.set([plumbing, electrical])
+        self.assertEqual(
+            set(ProviderMatch.objects.filter(provider=provider).values_list('category', 'city')),
+            {('plumbing', 'mumbai'), ('electrical', 'mumbai')},
+        )
+
+        plumbing.delete()
+
+        self.assertEqual(
+            set(ProviderMatch.objects.filter(provider=provider).values_list('category', 'city')),
+            {('electrical', 'mumbai')},
+        )
+
+    def test_backfill_rebuilds_providers_without_match_rows(self):
+        plumbing = ServiceCategory.objects.create(name='Plumbing')
+        provider = make_user('provider@test.com', 'provider')
+        provider.service_categories.set([plumbing])
+        customer = make_user('customer@test.com')
+        # Index kabhi bana hi nahi (bulk import) + ek non-provider ki stale row
+        ProviderMatch.objects.all().delete()
+        ProviderMatch.objects.create(provider=customer, category='plumbing', city='mumbai')
+
+        call_command('backfill_localities', stdout=StringIO())
+
+        self.assertEqual(
+            set(ProviderMatch.objects.values_list('provider', 'category', 'city')),
+            {(provider.pk, 'plumbing', 'mumbai')},
+        )
+
+# =======================================================
+# 2. Email Outbox
+# =======================================================
+
+class BrokenEmailBackend(EmailBackend):
+    """locmem backend jiska har send fail hota hai (SMTP down)."""
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP down')
+
+
+class EmailOutboxTests(TestCase):
+    def enqueue(self, key='booking:1'):
+        return enqueue_mail('Booking confirmed', 'Your booking is confirmed.', None, ['customer@test.com'],
+                            idempotency_key=key)
+
+    def test_send_outbox_drains_queue(self):
+        self.enqueue('booking:1')
+        self.enqueue('booking:2')
+
+        call_command('send_outbox', once=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['customer@test.com'])
+        self.assertEqual(mail.outbox[0].extra_headers['X-FixFinder-Idempotency-Key'], 'booking:1')
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+
+    def test_idempotency_key_dedupes(self):
+        first = self.enqueue()
+        second = self.enqueue()
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+        call_command('send_outbox', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        item = self.enqueue()
+
+        before = timezone.now()
+        sent, failed = deliver_batch(claim_batch(), BrokenEmailBackend())
+        self.assertEqual((sent, failed), (0, 1))
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.attempts), ('pending', 1))
+        self.assertIn('SMTP down', item.last_error)
+        self.assertGreaterEqual(item.next_attempt_at, before + retry_delay(1))
+        # Backoff ke dauran dobara claim nahi hota
+        self.assertEqual(claim_batch(), [])
+
+        EmailOutbox.objects.filter(pk=item.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        call_command('send_outbox', once=True, stdout=StringIO())
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.attempts), ('sent', 2))
+        self.assertEqual(len(mail.outbox), 1)
+
+
+# =======================================================
+# 3. Notification Fan-out Jobs
+# =======================================================
+
+@mock.patch.object(notifications, 'FANOUT_CHUNK_SIZE', 2)
+class NotificationJobTests(TestCase):
+    def setUp(self):
+        self.users = [make_user(f'user{index}@test.com') for index in range(5)]
+        _, self.job = notifications.fan_out(self.users, 'New request', 'Plumbing job near you', 'system', defer=True)
+
+    def test_failed_chunk_keeps_progress_and_retries_with_backoff(self):
+        real_notify_many = notifications.notify_many
+        calls = []
+
+        def flaky_notify_many(batch):
+            calls.append(len(batch))
+            if len(calls) == 2:
+                raise RuntimeError('database went away')
+            return real_notify_many(batch)
+
+        job = notifications.claim_job()
+        self.assertEqual(job.pk, self.job.pk)
+        with mock.patch.object(notifications, 'notify_many', flaky_notify_many):
+            before = timezone.now()
+            notifications.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.created_count), ('pending', 1, 2))
+        self.assertGreaterEqual(job.next_attempt_at, before + notifications.job_retry_delay(1))
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertIsNone(notifications.claim_job())  # Backoff ke dauran claim nahi
+
+        NotificationJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+        notifications.run_job(notifications.claim_job())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created_count), ('done', 5))
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', flat=True)),
+            sorted(user.pk for user in self.users),
+        )
+
+    def test_job_fails_after_max_attempts(self):
+        with mock.patch.object(notifications, 'notify_many', side_effect=RuntimeError('boom')), \
+                mock.patch.object(notifications, 'JOB_MAX_ATTEMPTS', 2):
+            for _ in range(2):
+                NotificationJob.objects.filter(pk=self.job.pk).update(next_attempt_at=timezone.now())
+                notifications.run_job(notifications.claim_job())
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.attempts), ('failed', 2))
+        self.assertIsNotNone(self.job.finished_at)
+
+    def test_worker_command_delivers_job(self):
+        call_command('process_notification_jobs', once=True, stdout=StringIO())
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.created_count), ('done', 5))
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 5)
+
+
+# =======================================================
+# 4. Unread Notification Counter
+# =======================================================
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = make_user('customer@test.com')
+        for index in range(2):
+            Notification.objects.create(user=self.user, title=f'N{index}', message='m', notification_type='system')
+
+    def counter(self):
+        return NotificationCounter.objects.get(user=self.user).unread
+
+    def test_mark_all_read_subtracts_only_updated_rows(self):
+        # Concurrent create ka increment jo abhi commit hua aur UPDATE ko nahi dikha
+        NotificationCounter.objects.filter(user=self.user).update(unread=3)
+
+        self.assertEqual(notifications.mark_all_read(self.user), 2)
+        self.assertEqual(self.counter(), 1)
+
+    def test_mark_read_never_goes_negative(self):
+        NotificationCounter.objects.filter(user=self.user).update(unread=0)
+        notifications.mark_read(self.user, Notification.objects.filter(user=self.user).first().pk)
+        self.assertEqual(self.counter(), 0)
+
+    def test_badge_endpoint_reads_counter_once(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api_get_notifications'))
+
+        self.assertEqual(response.json(), {'unread_count': 2})
+        self.assertTrue(response.has_header('ETag'))
+        counter_queries = [q for q in queries if 'myapp_notificationcounter' in q['sql']]
+        self.assertEqual(len(counter_queries), 1)
+        self.assertFalse([q for q in queries if 'myapp_notification"' in q['sql']])
+
+
+# =======================================================
+# 5. Services Listing (keyset pagination)
+# =======================================================
+
+class ServiceListingTests(TestCase):
+    def setUp(self):
+        provider = make_user('provider@test.com', 'provider')
+        category = ServiceCategory.objects.create(name='Plumbing')
+        # Bahut saare ties (same rating/price) - id tie-breaker hi order tay karta hai
+        for index in range(11):
+            make_service(provider, category, title=f'Service {index}', price_range=f'₹{500 + (index % 3) * 100}-2000',
+                         rating=index % 2 + 4.0, reviews_count=index % 4)
+        make_service(provider, category, title='Inactive', is_active=False)
+
+    def test_every_sort_pages_through_catalogue_once_in_order(self):
+        active = Service.objects.filter(is_active=True)
+        for sort, keys in SERVICE_SORT_KEYS.items():
+            if sort == 'relevance':
+                continue
+            with self.subTest(sort=sort):
+                seen, cursor = [], None
+                while True:
+                    page, cursor = paginate_services(active, sort, cursor, page_size=4)
+                    seen.extend(page)
+                    if not cursor:
+                        break
+                expected = sorted(active, key=lambda s: [getattr(s, f) for f, _ in keys], reverse=keys[0][1])
+                self.assertEqual([s.pk for s in seen], [s.pk for s in expected])
+
+
+# =======================================================
+# 6. Service Rating Aggregate
+# =======================================================
+
+class ReviewRatingTests(TestCase):
+    def setUp(self):
+        self.customer = make_user('customer@test.com')
+        self.service = make_service(make_user('provider@test.com', 'provider'), ServiceCategory.objects.create(name='Plumbing'))
+        self.review = Review.objects.create(
+            booking=make_booking(self.customer, self.service, status='completed'), customer=self.customer,
+            provider=self.service.provider, service=self.service, rating=4, comment='Good work',
+        )
+
+    def aggregate(self):
+        self.service.refresh_from_db()
+        return self.service.rating_total, self.service.reviews_count, self.service.rating
+
+    def test_edit_and_unapprove_apply_deltas(self):
+        self.assertEqual(self.aggregate(), (4, 1, 4.0))
+        self.review.rating = 2
+        self.review.save()
+        self.assertEqual(self.aggregate(), (2, 1, 2.0))
+        self.review.is_approved = False
+        self.review.save()
+        self.assertEqual(self.aggregate(), (0, 0, 0.0))
+
+    def test_previous_state_read_inside_transaction(self):
+        self.review.rating = 5
+        with CaptureQueriesContext(connection) as queries:
+            self.review.save()
+
+        sqls = [q['sql'] for q in queries]
+        savepoint = next(i for i, sql in enumerate(sqls) if sql.startswith('SAVEPOINT'))
+        previous_read = next(i for i, sql in enumerate(sqls) if sql.startswith('SELECT') and 'myapp_review' in sql)
+        self.assertLess(savepoint, previous_read)
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', sqls[previous_read])
+
+
+# =======================================================
+# 7. Booking Lists (N+1 regression)
+# =======================================================
+
+class BookingListQueryTests(TestCase):
+    VIEWS = ('dashboard', 'profile', 'profile_bookings')
+
+    def setUp(self):
+        self.customer = make_user('customer@test.com')
+        self.provider = make_user('provider@test.com', 'provider')
+        categories = [ServiceCategory.objects.create(name=name) for name in ('Plumbing', 'Electrical')]
+        self.services = [make_service(self.provider, category, title=f'{category.name} job') for category in categories]
+        self.add_bookings(2)
+
+    def add_bookings(self, count):
+        # Alag services + kuch reviewed bookings, taaki har row ka related data alag ho
+        for index in range(count):
+            service = self.services[index % len(self.services)]
+            booking = make_booking(self.customer, service, status='completed')
+            if index % 2:
+                Review.objects.create(booking=booking, customer=self.customer, provider=self.provider,
+                                      service=service, rating=5, comment='Great')
+
+    def query_counts(self, user):
+        self.client.force_login(user)
+        self.client.get(reverse('profile'))  # Pehli visit UserProfile row banati hai - warm-up
+        counts = {}
+        for name in self.VIEWS:
+            cache.clear()  # Dashboard stats cache dono runs mein same state se shuru ho
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            counts[name] = len(queries)
+        return counts
+
+    def test_profile_stats_from_single_aggregate(self):
+        Booking.objects.filter(pk=Booking.objects.order_by('pk').first().pk).update(status='confirmed')
+        self.client.force_login(self.provider)
+        response = self.client.get(reverse('profile'))
+        context = response.context
+        self.assertEqual((context['total_bookings'], context['active_bookings'], context['completed_bookings']), (2, 1, 1))
+        self.assertEqual(context['total_earned'], Decimal('750.00'))
+        self.assertEqual((context['review_count'], context['provider_rating']), (1, 5.0))
+
+    def test_query_count_independent_of_booking_count(self):
+        for user in (self.customer, self.provider):
+            with self.subTest(user_type=user.user_type):
+                few = self.query_counts(user)
+                self.add_bookings(6)
+                many = self.query_counts(user)
+                self.assertEqual(few, many)
+                Booking.objects.filter(pk__in=Booking.objects.order_by('-pk').values('pk')[:6]).delete()
+
+
+# =======================================================
+# 8. Query Budgets
+# =======================================================
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QueryBudgetTests(TestCase):
+    """
+    Budgeted views raise mode mein cold cache par chalte hain - sabse mehenga case: pehli visit
+    (UserProfile aur NotificationCounter rows abhi bani nahi) aur data wale users dono.
+    """
+
+    def setUp(self):
+        self.customer = make_user('customer@test.com')
+        self.provider = make_user('provider@test.com', 'provider')
+        category = ServiceCategory.objects.create(name='Plumbing')
+        self.provider.service_categories.add(category)
+        self.service = make_service(self.provider, category)
+        for index in range(3):
+            self.booking = make_booking(self.customer, self.service, status='completed')
+            Review.objects.create(booking=self.booking, customer=self.customer, provider=self.provider,
+                                  service=self.service, rating=4 + index % 2, comment='Great')
+            Notification.objects.create(user=self.customer, title=f'N{index}', message='m', notification_type='system')
+            Notification.objects.create(user=self.provider, title=f'N{index}', message='m', notification_type='system')
+
+    def get(self, name, *args):
+        cache.clear()
+        # Budget tootne par QueryBudgetExceeded yahin test client tak aata hai
+        response = self.client.get(reverse(name, args=args))
+        self.assertLess(response.status_code, 400)
+        return response
+
+    def test_public_views_within_budget(self):
+        for user in (None, self.customer):
+            with self.subTest(user=user and user.user_type):
+                if user:
+                    self.client.force_login(user)
+                self.get('home')
+                self.get('index')
+                self.get('services')
+                self.get('service_detail', self.service.pk)
+
+    def test_account_views_within_budget(self):
+        for user in (self.customer, self.provider):
+            with self.subTest(user_type=user.user_type):
+                self.client.force_login(user)
+                for name in ('dashboard', 'profile', 'profile_bookings', 'api_get_notifications'):
+                    self.get(name)
+                self.get('booking_detail', self.booking.pk)
+
+    def test_first_visit_within_budget(self):
+        # Naye user ki pehli request: UserProfile / NotificationCounter rows lazily bante hain
+        for name in ('dashboard', 'profile', 'profile_bookings', 'api_get_notifications'):
+            for user_type in ('customer', 'provider'):
+                with self.subTest(view=name, user_type=user_type):
+                    self.client.force_login(make_user(f'{name}-{user_type}@test.com', user_type))
+                    self.get(name)
+
+    def test_admin_dashboard_within_budget(self):
+        self.client.force_login(make_user('admin@test.com', 'admin', is_staff=True))
+        self.get('admin_dashboard')
+
+
+# =======================================================
+# 9. Bulk Seeding
+# =======================================================
+
+class SeedingTests(TestCase):
+    VOLUMES = {'customers': 20, 'providers': 5, 'services': 15, 'bookings': 60, 'requests': 10,
+               'notifications': 50, 'contact_messages': 3}
+
+    def test_reseed_reuses_categories_and_keeps_usernames_unique(self):
+        ServiceCategory.objects.create(name='Appliance Repair')
+        first = seeding.seed_database(self.VOLUMES, seed=3)
+        second = seeding.seed_database(self.VOLUMES, seed=3)
+
+        self.assertEqual(ServiceCategory.objects.filter(name__startswith='Appliance').count(), 1)
+        self.assertEqual(first.username('customer', 0), f'customer0@{seeding.SEED_EMAIL_DOMAIN}')
+        self.assertEqual(second.username('customer', 0), f'customer20@{seeding.SEED_EMAIL_DOMAIN}')
+        self.assertEqual(CustomUser.objects.filter(username__endswith=seeding.SEED_EMAIL_DOMAIN).count(), 50)
+
+    def test_generated_timestamps_are_kept(self):
+        with CaptureQueriesContext(connection) as queries:
+            plan = seeding.seed_database(self.VOLUMES, seed=3)
+        # Timestamps insert payload mein hi - follow-up bulk_update nahi
+        seeded_tables = [model._meta.db_table for model in (CustomUser, Service, Booking, Review, Notification)]
+        self.assertFalse([q['sql'] for q in queries if q['sql'].startswith('UPDATE')
+                          and any(f'"{table}"' in q['sql'] for table in seeded_tables)])
+        self.assertTrue(CustomUser._meta.get_field('registration_date').auto_now_add)
+        history_start = plan.anchor - timedelta(days=seeding.HISTORY_DAYS)
+        for model, field in ((Booking, 'booking_date'), (Review, 'created_at'), (Notification, 'created_at'),
+                             (CustomUser, 'registration_date')):
+            with self.subTest(model=model.__name__):
+                values = model.objects.filter(**{f'{field}__lt': plan.anchor}).values_list(field, flat=True)
+                self.assertGreater(len(set(values)), 1)
+                self.assertTrue(all(value >= history_start for value in values))
+
+
+# =======================================================
+# 10. Public Page Cache
+# =======================================================
+
+class HomePageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        provider = make_user('provider@test.com', 'provider')
+        make_service(provider, ServiceCategory.objects.create(name='Plumbing'), title='Leak fixing')
+
+    def test_root_url_renders_home_page(self):
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Leak fixing')
+        self.assertContains(response, 'Plumbing')
+
+        # Dusra anonymous hit page cache se - DB tak nahi jata
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get('/')
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(len(queries), 0)
+
+
+# =======================================================
+# 11. Category Registry
+# =======================================================
+
+class CategoryRegistryTests(TestCase):
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(name='Plumbing')
+        categories.refresh_categories()
+
+    def test_reloads_after_ttl_without_version_bump(self):
+        self.assertEqual(categories.get_category(self.category.pk).name, 'Plumbing')
+        # Doosre process ki edit - is process ke cache tak version bump nahi pahunchta
+        ServiceCategory.objects.filter(pk=self.category.pk).update(name='Plumbing & Sanitary')
+        self.assertEqual(categories.get_category(self.category.pk).name, 'Plumbing')
+
+        later = categories.time.monotonic() + categories.TTL + 1
+        with mock.patch.object(categories.time, 'monotonic', return_value=later):
+            self.assertEqual(categories.get_category(self.category.pk).name, 'Plumbing & Sanitary')
+
+    def test_version_bump_reloads_immediately(self):
+        categories.all_categories()
+        ServiceCategory.objects.create(name='Electrical')  # signal -> refresh_categories()
+        self.assertEqual([c.name for c in categories.all_categories()], ['Plumbing', 'Electrical'])
+
+
+# =======================================================
+# 12. Service Image Variants
+# =======================================================
+
+def png_upload(name='pipe.png', size=(640, 480)):
+    from PIL import Image
+    data = io.BytesIO()
+    Image.new('RGB', size, (30, 120, 200)).save(data, 'PNG')
+    return SimpleUploadedFile(name, data.getvalue(), content_type='image/png')
+
+
+class ServiceImageVariantTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(self.settings(MEDIA_ROOT=media.name))
+        cache.clear()
+        provider = make_user('provider@test.com', 'provider')
+        self.service = make_service(provider, ServiceCategory.objects.create(name='Plumbing'))
+        self.image = ServiceImage.objects.create(service=self.service, image=png_upload())
+
+    def test_cached_detail_page_picks_up_variants_from_worker_process(self):
+        url = reverse('service_detail', args=[self.service.pk])
+        before = self.client.get(url)
+        self.assertNotIn('.webp', before.content.decode())
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+
+        # Worker alag process: uska version bump is process ke LocMem tak nahi pahunchta
+        with mock.patch.object(images, 'bump_public_cache_version'), ThreadPoolExecutor(1) as pool:
+            self.assertEqual(images.process_batch(images.claim_batch(), pool), (1, 0))
+
+        self.image.refresh_from_db()
+        after = self.client.get(url)
+        self.assertEqual(after['X-Page-Cache'], 'miss')
+        self.assertContains(after, self.image.variant_url('card', 'webp'))
+        self.assertNotEqual(after['ETag'], before['ETag'])
+
+
+# =======================================================
+# 13. Cache Helpers (get_or_compute)
+# =======================================================
+
+class GetOrComputeTestsMixin:
+    """Single-flight, early refresh aur namespace bump - har supported backend par."""
+
+    def setUp(self):
+        cache.clear()
+        caching.local_cache.clear()
+        self.calls = 0
+
+    def compute(self, value='fresh'):
+        def compute():
+            self.calls += 1
+            return value
+        return compute
+
+    def test_concurrent_callers_compute_once(self):
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def slow():
+            self.calls += 1
+            started.set()
+            release.wait(5)
+            return 'value'
+
+        def call():
+            results.append(caching.get_or_compute('hot', slow, 60, lock_timeout=5))
+
+        first = threading.Thread(target=call)
+        first.start()
+        self.assertTrue(started.wait(5))
+        # Lock pakda hua hai - baaki callers lock holder ka result wait karte hain
+        waiters = [threading.Thread(target=call) for _ in range(4)]
+        for thread in waiters:
+            thread.start()
+        release.set()
+        for thread in [first, *waiters]:
+            thread.join(10)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['value'] * 5)
+
+    def test_early_refresh_recomputes_once_and_serves_stale_meanwhile(self):
+        # Expiry 5s door, pichla compute 1s laga - random() ~ 0 par XFetch early refresh karega
+        cache.set('hot', ('old', 1.0, caching.time.time() + 5), 60)
+        with mock.patch.object(caching.random, 'random', return_value=1e-12):
+            cache.add('lock:hot', 1, 10)  # Koi aur worker refresh kar raha hai
+            self.assertEqual(caching.get_or_compute('hot', self.compute('new'), 60), 'old')
+            cache.delete('lock:hot')
+            self.assertEqual(caching.get_or_compute('hot', self.compute('new'), 60), 'new')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(caching.get_or_compute('hot', self.compute('newer'), 60), 'new')
+
+    def test_expired_value_is_recomputed(self):
+        cache.set('hot', ('old', 0.0, caching.time.time() - 1), 60)
+        self.assertEqual(caching.get_or_compute('hot', self.compute('new'), 60), 'new')
+
+    def test_namespace_bump_invalidates_local_and_shared_tiers(self):
+        self.assertEqual(caching.get_or_compute('hot', self.compute('v1'), 60, namespace='test', local_ttl=30), 'v1')
+        self.assertEqual(caching.get_or_compute('hot', self.compute('v2'), 60, namespace='test', local_ttl=30), 'v1')
+        with self.captureOnCommitCallbacks(execute=True):
+            caching.bump_namespace('test')
+        self.assertEqual(caching.get_or_compute('hot', self.compute('v2'), 60, namespace='test', local_ttl=30), 'v2')
+        self.assertEqual(self.calls, 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'get-or-compute-tests'}})
+class LocMemGetOrComputeTests(GetOrComputeTestsMixin, TestCase):
+    pass
+
+
+class FileBasedGetOrComputeTests(GetOrComputeTestsMixin, TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+        }}))
+        super().setUp()
+
+
+# =======================================================
+# 14. Query Plans
+# =======================================================
+
+@unittest.skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Query plan checks support SQLite and PostgreSQL')
+class QueryPlanTests(TestCase):
+    """check_query_plans wale hot queries CI mein bhi - index hata to yahin fail."""
+
+    def test_hot_queries_use_expected_index(self):
+        for name, (build, expected) in HOT_QUERIES.items():
+            with self.subTest(query=name):
+                queryset = build()
+                plan = explain(queryset)
+                used = plan_indexes(plan, queryset.model._meta.db_table, ordered=name in ORDERED_QUERIES)
+                self.assertIsNotNone(used, f'full table scan:\n{plan}')
+                self.assertIn(expected, used, plan)
+                if name in ORDERED_QUERIES:
+                    self.assertFalse(plan_sorts(plan), f'temp sort:\n{plan}')
+
+
+# =======================================================
+# 15. Notification Stream (SSE)
+# =======================================================
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.user = make_user('stream@test.com')
+        Notification.objects.create(user=self.user, title='N', message='m', notification_type='system')
+        self.url = reverse('api_notifications_stream')
+        self.retry = f'retry: {settings.NOTIFICATION_STREAM_RETRY_MS}'
+
+    def test_wsgi_fallback_sends_one_event_and_closes(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertFalse(response.streaming)
+        frames = response.content.decode().split('\n\n')
+        self.assertEqual(frames[0], self.retry)
+        self.assertEqual(frames[1], 'event: unread_count\ndata: {"unread_count": 1}')
+
+    @override_settings(NOTIFICATION_STREAM_POLL_INTERVAL=0.05)
+    async def test_asgi_stream_polls_count_without_broker_events(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.streaming)
+        frames = aiter(response.streaming_content)
+        try:
+            self.assertEqual(await anext(frames), f'{self.retry}\n\n'.encode())
+            self.assertEqual(await anext(frames), b'event: unread_count\ndata: {"unread_count": 1}\n\n')
+            # Doosre process mein bana notification: counter badla, is process ke broker par event nahi aaya
+            with mock.patch('myapp.pubsub.InProcessBroker.publish') as publish:
+                await Notification.objects.acreate(user=self.user, title='N2', message='m', notification_type='system')
+            self.assertEqual(await anext(frames), b'event: unread_count\ndata: {"unread_count": 2}\n\n')
+            publish.assert_not_called()
+        finally:
+            await frames.aclose()
+
+    def test_base_broker_is_abstract(self):
+        with self.assertRaises(TypeError):
+            BaseBroker()
+
+
+# =======================================================
+# 16. Conditional GET (ETags)
+# =======================================================
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = make_user('customer@test.com')
+        self.provider = make_user('provider@test.com', 'provider')
+        self.service = make_service(self.provider, ServiceCategory.objects.create(name='Plumbing'))
+        self.detail_url = reverse('service_detail', args=[self.service.pk])
+
+    def revalidate(self, url):
+        """ETag lekar usi ETag ke saath doosri request ka response."""
+        self.client.get(url)  # Pehli visit par csrf cookie set hoti hai (woh bhi ETag ka hissa hai)
+        etag = self.client.get(url)['ETag']
+        return etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_304(self):
+        self.client.force_login(self.customer)
+        for url in (self.detail_url, reverse('services'), reverse('api_get_notifications')):
+            with self.subTest(url=url):
+                etag, response = self.revalidate(url)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(response.content, b'')
+
+    def test_review_approval_invalidates_detail_etag(self):
+        review = Review.objects.create(booking=make_booking(self.customer, self.service, status='completed'),
+                                       customer=self.customer, provider=self.provider, service=self.service,
+                                       rating=5, comment='Great', is_approved=False)
+        etag, _ = self.revalidate(self.detail_url)
+        review.is_approved = True
+        review.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_service_update_invalidates_detail_and_listing_etags(self):
+        detail_etag, _ = self.revalidate(self.detail_url)
+        listing_etag, _ = self.revalidate(reverse('services'))
+        # Doosre process ki write: sirf updated_at badla, is process mein koi version bump nahi
+        Service.objects.filter(pk=self.service.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.title = 'Renamed'
+            self.service.save()
+        self.assertEqual(self.client.get(reverse('services'), HTTP_IF_NONE_MATCH=listing_etag).status_code, 200)
+
+    def test_new_notification_invalidates_unread_count_etag(self):
+        self.client.force_login(self.customer)
+        etag, _ = self.revalidate(reverse('api_get_notifications'))
+        Notification.objects.create(user=self.customer, title='N', message='m', notification_type='system')
+        response = self.client.get(reverse('api_get_notifications'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'unread_count': 1})
+
+
+# =======================================================
+# 17. Service Search
+# =======================================================
+
+class ServiceSearchTests(TestCase):
+    def setUp(self):
+        provider = make_user('provider@test.com', 'provider')
+        category = ServiceCategory.objects.create(name='Plumbing')
+        self.pipe = make_service(provider, category, title='Pipe repair')
+        self.pipeline = make_service(provider, category, title='Pipeline inspection')
+        self.roof = make_service(provider, category, title='Roof painting')
+
+    def find(self, text):
+        return search.search_services(Service.objects.all(), text)
+
+    def test_terms_match_as_prefixes(self):
+        self.assertEqual(set(self.find('pip')), {self.pipe, self.pipeline})
+        self.assertEqual(list(self.find('pip rep')), [self.pipe])
+        self.assertEqual(list(self.find('plumb ROOF')), [self.roof])  # Category name bhi document mein
+        self.assertFalse(self.find('   ').exists())
+
+    def test_more_relevant_service_ranks_first(self):
+        if connection.vendor != 'postgresql' and not search.sqlite_fts_available():
+            self.skipTest('Relevance ranking needs PostgreSQL or SQLite FTS5')
+        provider = self.pipe.provider
+        leaky = make_service(provider, self.pipe.category, title='Leak leak leak')
+        wordy = make_service(provider, self.pipe.category, title='Leak check with tap fitting and general plumbing')
+        results = list(search.search_services(Service.objects.all(), 'leak').order_by('-search_rank', '-id'))
+        self.assertEqual(results, [leaky, wordy])
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    def test_icontains_fallback_without_fts(self):
+        with mock.patch.object(search, 'sqlite_fts_available', return_value=False), \
+                mock.patch.object(search.connection, 'vendor', 'mysql'):
+            results = list(self.find('ipeline'))  # Substring - fallback prefix tak simit nahi
+        self.assertEqual(results, [self.pipeline])
+        self.assertEqual(results[0].search_rank, 0)
+
+    def test_relevance_cursor_pages_through_results_once(self):
+        provider = self.pipe.provider
+        # Repeat count se alag-alag ranks, aur har rank par ties (id tie-breaker)
+        for index in range(9):
+            make_service(provider, self.pipe.category, title=' '.join(['drain'] * (index % 3 + 1)) + ' cleaning')
+        matches = search.search_services(Service.objects.all(), 'drain')
+        expected = [s.pk for s in matches.order_by('-search_rank', '-id')]
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate_services(matches, 'relevance', cursor, page_size=2)
+            seen.extend(s.pk for s in page)
+            if not cursor:
+                break
+        self.assertEqual(len(expected), 9)
+        self.assertEqual(seen, expected)
+
+
+# =======================================================
+# 18. Locations (parse_location / Locality)
+# =======================================================
+
+class ParseLocationTests(TestCase):
+    def test_edge_cases(self):
+        cases = {
+            'Flat 4, Andheri West, Mumbai, Maharashtra': ('mumbai', 'andheri west', 'maharashtra'),
+            'Bengaluru 560001': ('bangalore', '', ''),
+            'Koramangala, Bengaluru, KA, India': ('bangalore', 'koramangala', 'ka'),
+            'Mumbai, Andheri': ('mumbai', 'andheri', ''),  # Ulta order - known city pehle
+            '  Bandra ,  Bombay  ': ('mumbai', 'bandra', ''),
+            'Lat: 19.1444, Lon: 73.0487': ('', '', ''),
+            'Maharashtra, India': ('maharashtra', '', ''),  # Akela part state nahi maana jata
+            'India': ('india', '', ''),
+            '': ('', '', ''),
+            None: ('', '', ''),
+            ',,': ('', '', ''),
+        }
+        for location, expected in cases.items():
+            with self.subTest(location=location):
+                self.assertEqual(parse_location(location), expected)
+
+    def test_long_area_is_truncated_to_column_size(self):
+        city, area, _ = parse_location(f"{'x' * 150}, Pune")
+        self.assertEqual((city, len(area)), ('pune', 100))
+
+    def test_normalize_city_is_city_key(self):
+        self.assertEqual(normalize_city('Sector 29, Gurgaon, Haryana 122001'), 'gurugram')
+        self.assertEqual(normalize_city('Lat: 19.1, Lon: 73.0'), '')
+
+
+class LocalityMatchingTests(TestCase):
+    def setUp(self):
+        category = ServiceCategory.objects.create(name='Plumbing')
+        self.andheri = make_service(make_user('p1@test.com', 'provider', location='Andheri, Mumbai'), category)
+        self.bandra = make_service(make_user('p2@test.com', 'provider', location='Bandra West, Bombay, MH'), category)
+        self.pune = make_service(make_user('p3@test.com', 'provider', location='Andheri, Pune'), category)
+
+    def listed(self, location):
+        response = self.client.get(reverse('services'), {'location': location})
+        return {service.pk for service in response.context['services']}
+
+    def test_area_city_and_area_only_searches(self):
+        self.assertEqual(self.listed('Andheri, Mumbai'), {self.andheri.pk})
+        self.assertEqual(self.listed('bombay'), {self.andheri.pk, self.bandra.pk})
+        self.assertEqual(self.listed('Andheri'), {self.andheri.pk, self.pune.pk})
+        self.assertEqual(self.listed('Nagpur'), set())
+
+    def test_localities_are_shared_and_follow_location_edits(self):
+        self.assertEqual(Locality.objects.filter(city='mumbai', area='andheri').count(), 1)
+        self.assertEqual(self.andheri.locality, self.andheri.provider.locality)
+        self.andheri.location = 'Bandra West, Mumbai'
+        self.andheri.save(update_fields=['location'])
+        self.assertEqual(self.andheri.locality, self.bandra.locality)
+
+    def test_request_city_drives_provider_matching(self):
+        provider = self.bandra.provider
+        provider.service_categories.add(self.bandra.category)
+        request = ServiceRequest.objects.create(
+            customer=make_user('customer@test.com'), category='plumbing', title='Leak', description='Kitchen tap',
+            location='Juhu, Bombay 400049', contact_name='C', contact_phone='9876543210',
+        )
+        self.assertEqual((request.city, request.locality.area), ('mumbai', 'juhu'))
+        self.assertEqual(list(ProviderMatch.providers_for(request)), [provider])
+
+
+class BackfillLocalitiesTests(TestCase):
+    def setUp(self):
+        provider = make_user('provider@test.com', 'provider', location='Powai, Mumbai')
+        provider.service_categories.add(ServiceCategory.objects.create(name='Plumbing'))
+        make_service(provider, provider.service_categories.get())
+        ServiceRequest.objects.create(
+            customer=make_user('customer@test.com', location='Lat: 19.1, Lon: 72.8'), category='plumbing',
+            title='Leak', description='d', location='Powai, Mumbai', contact_name='C', contact_phone='9876543210',
+        )
+        # Purane rows (migration se pehle ke / bulk import): locality aur city khali
+        for model in (CustomUser, Service, ServiceRequest):
+            model.objects.update(locality=None)
+        ServiceRequest.objects.update(city='')
+
+    def backfill(self, *args):
+        out = StringIO()
+        call_command('backfill_localities', *args, stdout=out)
+        return out.getvalue()
+
+    def snapshot(self):
+        return [
+            sorted(model.objects.values_list('pk', 'locality__city', 'locality__area'))
+            for model in (CustomUser, Service, ServiceRequest)
+        ] + [sorted(ServiceRequest.objects.values_list('city', flat=True)),
+             sorted(ProviderMatch.objects.values_list('provider', 'category', 'city')),
+             Locality.objects.count()]
+
+    def test_second_run_changes_nothing(self):
+        first = self.backfill()
+        self.assertIn('CustomUser: 1 rows updated', first)  # Lat/lon customer ki locality None hi rehti hai
+        self.assertIn('ServiceRequest: 1 rows updated', first)
+        state = self.snapshot()
+        self.assertEqual(state[3], ['mumbai'])
+
+        for args in ((), ('--all',)):
+            with self.subTest(args=args):
+                output = self.backfill(*args)
+                self.assertEqual(output.count(': 0 rows updated'), 3)
+                self.assertIn('0 providers had stale match keys', output)
+                self.assertEqual(self.snapshot(), state)
+
+
+# =======================================================
+# 19. Dashboard Stats
+# =======================================================
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = make_user('customer@test.com')
+        self.provider = make_user('provider@test.com', 'provider')
+        category = ServiceCategory.objects.create(name='Plumbing')
+        service = make_service(self.provider, category)
+        make_service(self.provider, category, title='Old', is_active=False)
+        for status in ('pending', 'confirmed', 'in_progress', 'completed', 'completed'):
+            booking = make_booking(self.customer, service, status=status)
+        Review.objects.create(booking=booking, customer=self.customer, provider=self.provider, service=service,
+                              rating=4, comment='Good')
+        Review.objects.create(booking=make_booking(make_user('other@test.com'), service, status='completed'),
+                              customer=self.customer, provider=self.provider, service=service, rating=5, comment='Great')
+
+    def test_customer_stats_in_one_query(self):
+        with self.assertNumQueries(1):
+            result = stats.compute_customer_stats(self.customer.pk)
+        self.assertEqual(result, {'total_bookings': 5, 'active_bookings': 2, 'completed_bookings': 2,
+                                  'total_spent': Decimal('1500.00')})
+
+    def test_provider_stats_in_one_query(self):
+        with self.assertNumQueries(1):
+            result = stats.compute_provider_stats(self.provider.pk)
+        # Reviews/services subqueries se - bookings join unhe multiply nahi karta
+        self.assertEqual(result, {'total_bookings': 6, 'active_bookings': 2, 'completed_bookings': 3,
+                                  'total_earned': Decimal('2250.00'), 'total_services': 1,
+                                  'total_reviews': 2, 'average_rating': 4.5})
+
+    def test_user_without_rows_gets_zeros(self):
+        user = make_user('new@test.com', 'provider')
+        with self.assertNumQueries(1):
+            result = stats.compute_provider_stats(user.pk)
+        self.assertEqual(set(result.values()), {0})
+
+    def test_cached_until_a_booking_write_commits(self):
+        with self.assertNumQueries(1):
+            stats.dashboard_stats(self.customer)
+        with self.assertNumQueries(0):
+            stats.dashboard_stats(self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_booking(self.customer, Service.objects.filter(is_active=True).get())
+        with self.assertNumQueries(1):
+            self.assertEqual(stats.dashboard_stats(self.customer)['total_bookings'], 6)
+
+
+# =======================================================
+# 20. Platform Counters / Daily Rollups
+# =======================================================
+
+class PlatformMetricsDriftTests(TestCase):
+    def assertNoDrift(self):
+        actual = {name: model.objects.filter(**filters).count()
+                  for name, (model, filters) in metrics.PLATFORM_COUNTERS.items()}
+        self.assertEqual(metrics.platform_counters(), actual)
+        stored = {(row.metric, row.date): row.value for row in DailyMetric.objects.exclude(value=0)}
+        expected = {}
+        for metric, (model, date_field, filters) in metrics.DAILY_METRICS.items():
+            for value in model.objects.filter(**filters).values_list(date_field, flat=True):
+                key = (metric, timezone.localdate(value))
+                expected[key] = expected.get(key, 0) + 1
+        self.assertEqual(stored, expected)
+
+    def make_activity(self):
+        customer = make_user('customer@test.com')
+        provider = make_user('provider@test.com', 'provider')
+        service = make_service(provider, ServiceCategory.objects.create(name='Plumbing'))
+        make_booking(customer, service)
+        ServiceRequest.objects.create(customer=customer, category='plumbing', title='Leak', description='d',
+                                      location='Andheri, Mumbai', contact_name='C', contact_phone='9876543210')
+        ContactMessage.objects.create(name='C', email='c@test.com', subject='general', message='Hi')
+        return customer, provider
+
+    def test_signals_track_creates_updates_and_deletes(self):
+        customer, provider = self.make_activity()
+        self.assertNoDrift()
+
+        customer.user_type = 'provider'
+        customer.save(update_fields=['user_type'])
+        self.assertNoDrift()
+
+        # Cascade: provider ke services, unki bookings bhi jati hain (har row ka post_delete)
+        provider.delete()
+        self.assertNoDrift()
+        self.assertEqual(metrics.platform_counters()['bookings'], 0)
+
+        ContactMessage.objects.all().delete()
+        customer.delete()
+        self.assertNoDrift()
+
+    def test_reconcile_repairs_drift(self):
+        self.make_activity()
+        # Signals bypass karne wali writes (queryset.update / raw SQL) se drift
+        PlatformCounter.objects.update(value=999)
+        DailyMetric.objects.filter(metric='bookings').delete()
+        DailyMetric.objects.create(metric='bookings', date=date(2020, 1, 1), value=3)
+
+        call_command('reconcile_platform_metrics', '--days', '0', stdout=StringIO())
+        self.assertNoDrift()
+
+        # Reconcile ke baad incremental updates usi base par chalte hain
+        make_user('late@test.com', 'provider')
+        self.assertNoDrift()
+
+
+# =======================================================
+# 21. Benchmark Command (smoke test)
+# =======================================================
+
+class BenchmarkSmokeTests(SimpleTestCase):
+    """
+    benchmark apna test database banata/mitata hai (connection switch karta hai), isliye alag
+    process mein chalta hai - temp SQLite file aur temp log file ke saath.
+    """
+
+    def test_tiny_run_writes_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'result.json')
+            env = {**os.environ, 'DATABASE_URL': f'sqlite:///{directory}/bench.sqlite3',
+                   'LOG_FILE': os.path.join(directory, 'bench.log')}
+            process = subprocess.run(
+                [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark', '--scale', '0.001',
+                 '--iterations', '1', '--warmup', '0', '--workers', '1', '--output', output],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=300,
+            )
+            self.assertEqual(process.returncode, 0, process.stderr)
+            with open(output) as handle:
+                report = json.load(handle)
+
+        self.assertEqual(set(report), {'meta', 'scenarios'})
+        self.assertLessEqual({'commit', 'dirty', 'timestamp', 'python', 'django', 'database', 'seed', 'volumes',
+                              'iterations', 'warmup', 'page_cache'}, set(report['meta']))
+        self.assertEqual(report['meta']['iterations'], 1)
+        self.assertEqual(report['meta']['volumes'], seeding.scaled_volumes(0.001))
+        self.assertIn('index', report['scenarios'])
+        for name, result in report['scenarios'].items():
+            with self.subTest(scenario=name):
+                self.assertEqual(set(result), {'n', 'status', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'min_ms',
+                                               'max_ms', 'queries_p50', 'queries_max'})
+                self.assertEqual(result['n'], 1)
+                self.assertEqual(sum(result['status'].values()), 1)
+                self.assertFalse([code for code in result['status'] if code.startswith('5')])
+                self.assertLessEqual(result['min_ms'], result['p50_ms'])
+                self.assertIsInstance(result['queries_max'], int)
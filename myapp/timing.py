@@ -0,0 +1,169 @@
+import atexit
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger('myapp.performance')
+
+# =======================================================
+# 1. Per-request spans
+# =======================================================
+# ServerTimingMiddleware har request ke liye RequestTiming set karta hai; DB wrapper, template
+# backend aur enqueue_mail apna time isme likhte hain. Spans "exclusive" hain - email ke andar
+# chali DB query sirf db mein count hoti hai - isliye view = total - (baaki spans).
+
+_current_timing = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = defaultdict(float)
+        self.counts = defaultdict(int)
+        self._children = []
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            self.spans[name] += elapsed - children
+            self.counts[name] += 1
+            if self._children:
+                self._children[-1] += elapsed
+
+    def breakdown(self):
+        """Milliseconds mein {db, template, email, view, total}."""
+        total = time.perf_counter() - self.start
+        result = {name: self.spans.get(name, 0.0) * 1000 for name in ('db', 'template', 'email')}
+        result['view'] = max(total * 1000 - sum(result.values()), 0.0)
+        result['total'] = total * 1000
+        return result
+
+
+def start_request_timing():
+    timing = RequestTiming()
+    return timing, _current_timing.set(timing)
+
+
+def end_request_timing(token):
+    _current_timing.reset(token)
+
+
+def timed(name):
+    """Active request ke `name` span mein time jodta hai; request ke bahar (commands) no-op."""
+    timing = _current_timing.get()
+    return timing.span(name) if timing is not None else nullcontext()
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook."""
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+# =======================================================
+# 2. Template backend
+# =======================================================
+# Django template_rendered signal sirf test runner mein bhejta hai, isliye rendering
+# backend level par time hoti hai. Includes/extends top-level render ke andar hi count hote hain.
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+# =======================================================
+# 3. Sampled latency histograms
+# =======================================================
+
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+HISTOGRAM_SPANS = ('total', 'view', 'db', 'template', 'email')
+
+
+class LatencyHistograms:
+    """
+    URL name -> span -> bucket counts. Sirf SERVER_TIMING_SAMPLE_RATE requests record hoti hain;
+    har SERVER_TIMING_DUMP_INTERVAL seconds par summary fixfinder.log mein likh kar reset.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._last_dump = time.monotonic()
+
+    def record(self, view, breakdown):
+        if random.random() >= getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0.1):
+            return
+        with self._lock:
+            spans = self._data.setdefault(view, {
+                span: [0] * len(HISTOGRAM_BUCKETS_MS) for span in HISTOGRAM_SPANS
+            })
+            for span in HISTOGRAM_SPANS:
+                value = breakdown.get(span, 0.0)
+                index = next(i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if value <= bound)
+                spans[span][index] += 1
+        self.maybe_dump()
+
+    def maybe_dump(self):
+        if time.monotonic() - self._last_dump >= getattr(settings, 'SERVER_TIMING_DUMP_INTERVAL', 300):
+            self.dump()
+
+    def dump(self):
+        with self._lock:
+            data, self._data = self._data, {}
+            self._last_dump = time.monotonic()
+        for view, spans in sorted(data.items()):
+            parts = []
+            for span in HISTOGRAM_SPANS:
+                counts = spans[span]
+                parts.append(f'{span} p50={percentile(counts, 0.5)} p95={percentile(counts, 0.95)} p99={percentile(counts, 0.99)}')
+            logger.info(f'Latency {view} n={sum(spans["total"])}: ' + ' | '.join(parts))
+        return data
+
+
+def percentile(counts, quantile):
+    """Bucket counts se percentile ka upper bound (ms), e.g. '<=50ms'."""
+    total = sum(counts)
+    if not total:
+        return '-'
+    running = 0
+    for bound, count in zip(HISTOGRAM_BUCKETS_MS, counts):
+        running += count
+        if running >= quantile * total:
+            return f'<={bound:g}ms' if bound != float('inf') else f'>{HISTOGRAM_BUCKETS_MS[-2]:g}ms'
+
+
+latency_histograms = LatencyHistograms()
+_exit_dump_registered = False
+
+
+def register_exit_dump():
+    """
+    Process band hone par bachi hui samples bhi log ho jayein. ServerTimingMiddleware load hone par
+    (sirf request serve karne wale processes) aur SERVER_TIMING_DUMP_AT_EXIT on ho tab hi.
+    """
+    global _exit_dump_registered
+    if _exit_dump_registered or not getattr(settings, 'SERVER_TIMING_DUMP_AT_EXIT', False):
+        return
+    atexit.register(latency_histograms.dump)
+    _exit_dump_registered = True
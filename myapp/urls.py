@@ -82,5 +82,9 @@ path('profile/bookings/', views.profile_bookings, name='profile_bookings'),
     
     # API Endpoints (AJAX)
     path('api/notifications/count/', views.api_get_notifications, name='api_get_notifications'),
+    path('api/notifications/stream/', views.api_notifications_stream, name='api_notifications_stream'),
     path('api/notifications/read/<int:notification_id>/', views.api_mark_notification_read, name='api_mark_notification_read'),
+    
+    # Metrics scrape (query counters)
+    path('api/metrics/', views.api_metrics, name='api_metrics'),
 ]
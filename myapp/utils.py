@@ -1,17 +1,103 @@
 import random
-from django.core.mail import send_mail
+import re
 from django.conf import settings
+from django.utils.text import slugify
+
+# ServiceCategory.name -> ServiceRequest.category slug, jahan slugify match nahi karta
+CATEGORY_KEY_ALIASES = {
+    'appliance-repair': 'appliance',
+}
 
 def generate_otp():
     return str(random.randint(100000, 999999))
 
 def send_otp_email(email, otp):
+    # models -> utils import hota hai, isliye outbox yahan lazily import karte hain
+    from .mail import enqueue_mail
+    
     subject = 'Your FixFinder OTP Code'
     message = f'Your OTP code for FixFinder is: {otp}'
-    send_mail(
+    enqueue_mail(
         subject,
         message,
         settings.DEFAULT_FROM_EMAIL,
         [email],
-        fail_silently=False,
-    )
\ No newline at end of file
+    )
+
+
+# Location parsing - "Area, City, State" free text ko normalized keys mein todta hai
+STATE_NAMES = {
+    'andhra pradesh', 'assam', 'bihar', 'chhattisgarh', 'goa', 'gujarat', 'haryana', 'himachal pradesh',
+    'jharkhand', 'karnataka', 'kerala', 'madhya pradesh', 'maharashtra', 'odisha', 'punjab', 'rajasthan',
+    'tamil nadu', 'telangana', 'uttar pradesh', 'uttarakhand', 'west bengal', 'delhi ncr', 'ncr',
+    'jammu and kashmir', 'chandigarh', 'puducherry',
+    'ap', 'gj', 'hr', 'ka', 'kl', 'mh', 'mp', 'pb', 'rj', 'tn', 'ts', 'up', 'wb',
+}
+COUNTRY_NAMES = {'india', 'in', 'bharat'}
+CITY_ALIASES = {
+    'bombay': 'mumbai', 'bengaluru': 'bangalore', 'new delhi': 'delhi', 'gurgaon': 'gurugram',
+    'calcutta': 'kolkata', 'madras': 'chennai', 'poona': 'pune', 'cochin': 'kochi', 'trivandrum': 'thiruvananthapuram',
+}
+KNOWN_CITIES = {
+    'mumbai', 'delhi', 'bangalore', 'pune', 'hyderabad', 'chennai', 'kolkata', 'ahmedabad', 'jaipur',
+    'lucknow', 'indore', 'kochi', 'gurugram', 'noida', 'thane', 'navi mumbai', 'surat', 'nagpur',
+    'chandigarh', 'bhopal', 'thiruvananthapuram', 'coimbatore', 'vadodara', 'visakhapatnam', 'patna',
+}
+PINCODE_RE = re.compile(r'\b\d{6}\b')
+# Browser geolocation "Lat: 19.1444, Lon: 73.0487" jaise parts - inme city nahi hoti
+COORDINATE_RE = re.compile(r'^(?:(?:lat|lon|lng|latitude|longitude)\s*:?\s*)?-?[\d.]+$')
+
+def _location_key(text):
+    key = ' '.join(PINCODE_RE.sub(' ', text).split()).lower()
+    if COORDINATE_RE.match(key):
+        return ''
+    return CITY_ALIASES.get(key, key)
+
+def parse_location(location):
+    """
+    Free-text location se (city, area, state) keys:
+    "Flat 4, Andheri West, Mumbai, Maharashtra" -> ('mumbai', 'andheri west', 'maharashtra'),
+    "Bengaluru 560001" -> ('bangalore', '', ''). City na mile (e.g. lat/lon) to ('', '', '').
+    """
+    parts = [key for key in (_location_key(part) for part in (location or '').split(',')) if key]
+    while len(parts) > 1 and parts[-1] in COUNTRY_NAMES:
+        parts.pop()
+    state = parts.pop() if len(parts) > 1 and parts[-1] in STATE_NAMES else ''
+    if not parts:
+        return '', '', state
+    # Area = city ke sabse paas wala part (aage ke parts house/street hote hain).
+    # "Mumbai, Andheri" jaise ulte order mein known city pehle ho sakti hai.
+    if len(parts) > 1 and parts[-1] not in KNOWN_CITIES and parts[0] in KNOWN_CITIES:
+        return parts[0], parts[1][:100], state
+    return parts[-1], (parts[-2] if len(parts) > 1 else '')[:100], state
+
+def normalize_city(location):
+    """
+    Free-text location ("Andheri, Mumbai, Maharashtra") se city key nikalta hai ("mumbai").
+    Provider matching isi key par equality lookup karta hai.
+    """
+    return parse_location(location)[0]
+
+def category_key(name):
+    """
+    ServiceCategory.name ko ServiceRequest.category slug mein convert karta hai
+    (e.g. "AC Repair" -> "ac-repair").
+    """
+    key = slugify(name or '')
+    return CATEGORY_KEY_ALIASES.get(key, key)
+
+PRICE_NUMBER_RE = re.compile(r'\d[\d,]*')
+
+def parse_price_range(price_range):
+    """
+    "₹500-2000" / "₹1,000 - ₹2,000" / "₹800" jaise strings se (min, max) integers nikalta hai.
+    Koi number na mile to (None, None).
+    """
+    numbers = [int(match.replace(',', '')) for match in PRICE_NUMBER_RE.findall(price_range or '')]
+    if not numbers:
+        return None, None
+    return min(numbers[:2]), max(numbers[:2])
+
+def build_search_text(*parts):
+    """Search index ke liye text parts ko ek normalized document mein jodta hai."""
+    return ' '.join(' '.join(str(part).split()) for part in parts if part)
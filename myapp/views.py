@@ -2,17 +2,34 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse 
-from django.core.mail import send_mail
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+import json
+import secrets
 from django.conf import settings
 from django.db.models import Q, Avg, Count 
 from django.utils import timezone
 from django.views.generic import TemplateView
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.urls import reverse 
 from django.core.paginator import Paginator
 from datetime import datetime, timedelta 
 import random
+import time
 from .models import *
+from .utils import parse_price_range
+from .mail import enqueue_mail
+from .notifications import fan_out, notify_many, unread_count, mark_read, mark_all_read
+from .pubsub import get_broker, user_channel
+from .search import search_services
+from .pagination import SERVICE_SORT_KEYS, paginate_services
+from .stats import dashboard_stats
+from .pagecache import cache_public_page, cached_public, fragment_cache_context
+from .etags import service_detail_etag, services_etag, unread_count_etag
+from .metrics import platform_counters, daily_series
+from .middleware import render_query_metrics
 from .forms import (
     ContactForm, 
     CustomPasswordResetForm, 
@@ -28,31 +45,31 @@ from .forms import (
 # 1. Public & General Views
 # =======================================================
 
+@cache_public_page
 def index(request):
     """
     Home page logic: Show categories and featured services.
     """
-    categories = ServiceCategory.objects.all()
-    
     # Get top 6 rated services for featured section - is_active=True services only
-    featured_services = Service.objects.filter(
-        is_active=True
-    ).annotate(
-        avg_rating=Avg('reviews__rating')
-    ).order_by('-avg_rating')[:6]
+    # (stored rating column, partial rating index se). Hot key - catalogue change ke baad
+    # sirf ek worker query chalata hai (pagecache.cached_public).
+    featured_services = cached_public('home-featured-services', lambda: list(
+        Service.objects.filter(is_active=True).select_related('category').order_by('-rating')[:6]
+    ))
     
     context = {
-        'categories': categories,
         'featured_services': featured_services,
+        **fragment_cache_context(),
     }
     return render(request, 'index.html', context)
 
 
+@condition(etag_func=services_etag)
+@cache_public_page(allowed_params=('sort', 'cursor'))
 def services(request):
     """
     Services page logic: Filter, search, and sort active services.
     """
-    categories = ServiceCategory.objects.all()
     services = Service.objects.filter(is_active=True)  # Only active services
     
     # Filter by category
@@ -60,53 +77,55 @@ def services(request):
     if category_name and category_name != 'all':
         services = services.filter(category__name=category_name)
     
-    # Filter by search term
+    # Filter by search term (full-text index: PostgreSQL GIN / SQLite FTS5)
     search_term = request.GET.get('search')
     if search_term:
-        services = services.filter(
-            Q(title__icontains=search_term) |
-            Q(description__icontains=search_term) |
-            Q(category__name__icontains=search_term) |
-            Q(provider__first_name__icontains=search_term) |
-            Q(provider__last_name__icontains=search_term)
-        )
+        services = search_services(services, search_term)
     
-    # Filter by location
+    # Filter by location (normalized Locality par indexed lookup - substring match nahi)
     location = request.GET.get('location')
     if location:
-        services = services.filter(location__icontains=location)
-    
-    # Sort services
-    sort_by = request.GET.get('sort', 'rating')
-    if sort_by == 'rating':
-        services = services.annotate(avg_rating=Avg('reviews__rating')).order_by('-avg_rating')
-    elif sort_by == 'price-low':
-        services = services.extra(
-            select={'min_price': "CAST(SUBSTRING(price_range FROM '₹([0-9]+)') AS INTEGER)"}
-        ).order_by('min_price')
-    elif sort_by == 'price-high':
-        services = services.extra(
-            select={'max_price': "CAST(SUBSTRING(price_range FROM '₹([0-9]+)') AS INTEGER)"}
-        ).order_by('-max_price')
-    elif sort_by == 'reviews':
-        services = services.annotate(review_count=Count('reviews')).order_by('-review_count')
+        services = services.filter(locality__in=Locality.matching(location))
+    
+    # Sort services - search par default relevance
+    sort_by = request.GET.get('sort', 'relevance' if search_term else 'rating')
+    if sort_by not in SERVICE_SORT_KEYS or (sort_by == 'relevance' and not search_term):
+        sort_by = 'rating'
+    
+    # Keyset pagination - poora catalogue ek saath render nahi hota
+    services, next_cursor = paginate_services(
+        services.select_related('provider', 'category'), sort_by, request.GET.get('cursor')
+    )
+    next_page_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_page_url = f'?{params.urlencode()}'
     
     context = {
-        'categories': categories,
         'services': services,
         'search_term': search_term,
         'location_filter': location,
         'category_filter': category_name,
+        'sort_by': sort_by,
+        'next_page_url': next_page_url,
+        **fragment_cache_context(),
+        'is_first_page': not request.GET.get('cursor'),
     }
     return render(request, 'services.html', context)
 
+@condition(etag_func=service_detail_etag)
+@cache_public_page
 def service_detail(request, service_id):
     """
     Service detail page logic: show service details, provider info, and reviews.
     """
-    service = get_object_or_404(Service, id=service_id, is_active=True)
+    service = get_object_or_404(
+        Service.objects.select_related('provider', 'category').prefetch_related('images'), id=service_id, is_active=True,
+    )
     # NOTE: Reviews filter changed to link directly to the service for accuracy.
-    reviews = Review.objects.filter(service=service, is_approved=True).order_by('-created_at')[:10]
+    # Template har review ka customer naam dikhata hai - join se, per-review query nahi
+    reviews = Review.objects.filter(service=service, is_approved=True).select_related('customer').order_by('-created_at')[:10]
     
     # Calculate average rating
     avg_rating = reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
@@ -132,7 +151,7 @@ def contact_view(request):
             # Send email notification (optional)
             try:
                 # Assuming CONTACT_EMAIL is defined in settings.py
-                send_mail(
+                enqueue_mail(
                     f'New Contact Message: {contact_message.get_subject_display()}',
                     f'''
                     Name: {contact_message.name}
@@ -143,7 +162,7 @@ def contact_view(request):
                     ''',
                     settings.DEFAULT_FROM_EMAIL,
                     [getattr(settings, 'CONTACT_EMAIL', settings.DEFAULT_FROM_EMAIL)],
-                    fail_silently=True,
+                    idempotency_key=f'contact:{contact_message.pk}',
                 )
             except Exception as e:
                 print(f"Email sending failed: {e}")
@@ -161,6 +180,7 @@ def contact_view(request):
 
 # --- Class-based views for static content ---
 
+@method_decorator(cache_public_page, name='dispatch')
 class AboutView(TemplateView):
     template_name = 'about.html'
     
@@ -210,11 +230,13 @@ class AboutView(TemplateView):
 # Wrappers for TemplateView
 class PrivacyPolicyView(TemplateView):
     template_name = 'privacy_policy.html'
+@cache_public_page
 def privacy_policy_view(request):
     return PrivacyPolicyView.as_view()(request)
 
 class TermsOfServiceView(TemplateView):
     template_name = 'terms_of_service.html'
+@cache_public_page
 def terms_of_service_view(request):
     return TermsOfServiceView.as_view()(request)
 
@@ -226,8 +248,6 @@ def user_register(request):
     """
     User registration logic: Create CustomUser and handle provider fields.
     """
-    categories = ServiceCategory.objects.all()
-    
     if request.method == 'POST':
         try:
             # Get form data
@@ -242,19 +262,19 @@ def user_register(request):
             # Validation
             if not all([name, email, password, confirm_password, phone, location]):
                 messages.error(request, 'Please fill all required fields.')
-                return render(request, 'register.html', {'categories': categories})
+                return render(request, 'register.html')
             
             if password != confirm_password:
                 messages.error(request, 'Passwords do not match.')
-                return render(request, 'register.html', {'categories': categories})
+                return render(request, 'register.html')
             
             if len(password) < 6:
                 messages.error(request, 'Password must be at least 6 characters long.')
-                return render(request, 'register.html', {'categories': categories})
+                return render(request, 'register.html')
             
             if CustomUser.objects.filter(email=email).exists():
                 messages.error(request, 'User with this email already exists.')
-                return render(request, 'register.html', {'categories': categories})
+                return render(request, 'register.html')
             
             # Create user
             first_name = name.split(' ')[0]
@@ -290,7 +310,7 @@ def user_register(request):
             
             # Send welcome email
             try:
-                send_mail(
+                enqueue_mail(
                     'Welcome to FixFinder! 🛠️',
                     f'''
 Hello {user.first_name},
@@ -311,7 +331,7 @@ FixFinder Team
                     ''',
                     settings.DEFAULT_FROM_EMAIL,
                     [user.email],
-                    fail_silently=False,
+                    idempotency_key=f'welcome:{user.pk}',
                 )
             except Exception as e:
                 print(f"Email sending failed: {e}")
@@ -329,9 +349,9 @@ FixFinder Team
             
         except Exception as e:
             messages.error(request, f'Error during registration: {str(e)}')
-            return render(request, 'register.html', {'categories': categories})
+            return render(request, 'register.html')
     
-    return render(request, 'register.html', {'categories': categories})
+    return render(request, 'register.html')
 
 def user_login(request):
     """
@@ -411,7 +431,7 @@ def password_reset_request(request):
             )
             
             try:
-                send_mail(
+                enqueue_mail(
                     'Reset Your FixFinder Password',
                     f'''
                     Hello {user.username},
@@ -430,7 +450,7 @@ def password_reset_request(request):
                     ''',
                     settings.DEFAULT_FROM_EMAIL,
                     [email],
-                    fail_silently=False,
+                    idempotency_key=f'password-reset:{reset_token.token}',
                 )
                 
                 messages.success(request, 'Password reset link has been sent to your email address. Please check your inbox.')
@@ -475,7 +495,7 @@ def simple_password_reset(request):
                 request.session.set_expiry(86400)  # 24 hours
                 
                 # Send email with code
-                send_mail(
+                enqueue_mail(
                     'Your FixFinder Password Reset Code',
                     f'''
 Hello {user.first_name},
@@ -493,7 +513,6 @@ FixFinder Team
                     ''',
                     settings.DEFAULT_FROM_EMAIL,
                     [email],
-                    fail_silently=False,
                 )
                 
                 messages.success(request, f'Password reset code sent to {email}')
@@ -609,18 +628,10 @@ def dashboard(request):
     user = request.user
     
     if user.user_type == 'customer':
-        # Customer dashboard
-        bookings = Booking.objects.filter(customer=user)
-        total_bookings = bookings.count()
-        active_bookings = bookings.filter(status__in=['confirmed', 'in_progress']).count()
-        completed_bookings = bookings.filter(status='completed').count()
-        
-        # Calculate total spent - (FIXED: total_price is already correct here)
-        total_spent = bookings.filter(status='completed').aggregate(
-            total=models.Sum('total_price') 
-        )['total'] or 0
+        # Customer dashboard - counters cached stats se (stats.py)
+        stats = dashboard_stats(user)
         
-        recent_bookings = bookings.order_by('-booking_date')[:5]
+        recent_bookings = Booking.objects.for_user(user).recent()[:5]
         
         # Recent activity
         recent_activity = []
@@ -633,36 +644,18 @@ def dashboard(request):
             })
         
         context = {
-            'total_bookings': total_bookings,
-            'active_bookings': active_bookings,
-            'completed_bookings': completed_bookings,
-            'total_spent': total_spent,
+            **stats,
             'recent_activity': recent_activity,
             'recent_bookings': recent_bookings,
             'unread_messages': 0,
         }
         
     elif user.user_type == 'provider':
-        # Provider dashboard
-        services = Service.objects.filter(provider=user, is_active=True)
-        bookings = Booking.objects.filter(provider=user)
-        
-        total_services = services.count()
-        total_bookings = bookings.count()
-        active_bookings = bookings.filter(status__in=['confirmed', 'in_progress']).count()
-        completed_bookings = bookings.filter(status='completed').count()
+        # Provider dashboard - counters cached stats se (stats.py)
+        services = Service.objects.filter(provider=user, is_active=True).select_related('category')
+        stats = dashboard_stats(user)
         
-        # Calculate total earned - (FIXED: total_price is already correct here)
-        total_earned = bookings.filter(status='completed').aggregate(
-            total=models.Sum('total_price')
-        )['total'] or 0
-        
-        # Calculate average rating
-        avg_rating = Review.objects.filter(provider=user).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating'] or 0
-        
-        recent_bookings = bookings.order_by('-booking_date')[:5]
+        recent_bookings = Booking.objects.for_user(user).recent()[:5]
         
         # Recent activity
         recent_activity = []
@@ -674,30 +667,21 @@ def dashboard(request):
                 'icon': '📋'
             })
         
-        # Service requests in area - ERROR IS FIXED HERE!
-        service_requests = ServiceRequest.objects.filter(
-            category__in=user.service_categories.values_list('name', flat=True), # FIXED from category__name__in
-            location__icontains=user.location.split(',')[0] if user.location else '',
+        # Service requests in area - ProviderMatch index ke (category, city) keys se
+        service_requests = ProviderMatch.requests_for(user).filter(
             status='open'
         ).order_by('-created_at')[:3]
         
         # Provider ke liye additional data
         my_services = services[:3]
-        total_reviews = Review.objects.filter(provider=user).count()
         
         context = {
-            'total_bookings': total_bookings,
-            'active_bookings': active_bookings,
-            'completed_bookings': completed_bookings,
-            'total_earned': total_earned,
+            **stats,
             'recent_activity': recent_activity,
             'my_services': my_services,
             'service_requests': service_requests,
-            'average_rating': round(avg_rating, 1),
-            'total_services': total_services,
             'recent_bookings': recent_bookings,
             'unread_messages': 0,
-            'total_reviews': total_reviews,
         }
         
     else:  # Admin
@@ -717,26 +701,23 @@ def admin_dashboard(request):
         messages.error(request, 'Access denied. Admin privileges required.')
         return redirect('dashboard')
     
-    # Platform statistics
-    total_users = CustomUser.objects.count()
-    total_providers = CustomUser.objects.filter(user_type='provider').count()
-    total_customers = CustomUser.objects.filter(user_type='customer').count()
-    total_services = Service.objects.count()
-    total_bookings = Booking.objects.count()
-    total_requests = ServiceRequest.objects.count()
+    # Platform statistics - materialized counters (metrics.py), har load par COUNT(*) nahi
+    counters = platform_counters()
     
     # Recent activities
     recent_users = CustomUser.objects.order_by('-date_joined')[:5]
-    recent_bookings = Booking.objects.order_by('-booking_date')[:5]
+    recent_bookings = Booking.objects.recent()[:5]
     recent_services = Service.objects.order_by('-created_at')[:5]
     
     context = {
-        'total_users': total_users,
-        'total_providers': total_providers,
-        'total_customers': total_customers,
-        'total_services': total_services,
-        'total_bookings': total_bookings,
-        'total_requests': total_requests,
+        'total_users': counters['users'],
+        'total_providers': counters['providers'],
+        'total_customers': counters['customers'],
+        'total_services': counters['services'],
+        'total_bookings': counters['bookings'],
+        'total_requests': counters['requests'],
+        'total_messages': counters['contact_messages'],
+        'daily_metrics': daily_series(days=14),
         'recent_users': recent_users,
         'recent_bookings': recent_bookings,
         'recent_services': recent_services,
@@ -777,10 +758,7 @@ def profile(request):
         
     
     # Get user bookings
-    if user.user_type == 'customer':
-        bookings = Booking.objects.filter(customer=user).order_by('-booking_date')
-    else:
-        bookings = Booking.objects.filter(provider=user).order_by('-booking_date')
+    bookings = Booking.objects.for_user(user).recent()
     
     # Get reviews
     if user.user_type == 'customer':
@@ -788,33 +766,36 @@ def profile(request):
     else:
         reviews = Review.objects.filter(provider=user).order_by('-created_at')
     
-    # Get notifications
+    # Get notifications (badge count denormalized counter se)
     notifications = Notification.objects.filter(user=user, is_read=False).order_by('-created_at')
-    
-    # Calculate stats
-    total_bookings = bookings.count()
-    active_bookings = bookings.filter(status__in=['confirmed', 'in_progress']).count()
-    completed_bookings = bookings.filter(status='completed').count()
+    notifications_unread = unread_count(user)
+    
+    # Calculate stats - saare booking counters/totals ek aggregate query mein
+    completed = Q(status='completed')
+    booking_stats = Booking.objects.for_user(user).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status__in=['confirmed', 'in_progress'])),
+        completed=Count('id', filter=completed),
+        amount=models.Sum('total_price', filter=completed),
+    )
+    total_bookings = booking_stats['total']
+    active_bookings = booking_stats['active']
+    completed_bookings = booking_stats['completed']
     
     total_spent = 0
     total_earned = 0
     if user.user_type == 'customer':
-        total_spent = bookings.filter(status='completed').aggregate(
-            total=models.Sum('total_price')
-        )['total'] or 0
+        total_spent = booking_stats['amount'] or 0
     else:
-        total_earned = bookings.filter(status='completed').aggregate(
-            total=models.Sum('total_price')
-        )['total'] or 0
+        total_earned = booking_stats['amount'] or 0
     
-    # Provider rating
+    # Provider rating (average + count ek hi query)
     provider_rating = 0
     review_count = 0
     if user.user_type == 'provider':
-        provider_rating = Review.objects.filter(provider=user).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating'] or 0
-        review_count = reviews.count()
+        review_stats = reviews.aggregate(avg_rating=Avg('rating'), count=Count('id'))
+        provider_rating = review_stats['avg_rating'] or 0
+        review_count = review_stats['count']
     
     context = {
         'user_profile': user_profile, # For compatibility with old templates
@@ -822,6 +803,7 @@ def profile(request):
         'bookings': bookings[:10],
         'reviews': reviews[:10],
         'notifications': notifications[:10],
+        'unread_count': notifications_unread,
         'total_bookings': total_bookings,
         'active_bookings': active_bookings,
         'completed_bookings': completed_bookings,
@@ -905,10 +887,7 @@ def profile_bookings(request):
     """
     user = request.user
     
-    if user.user_type == 'customer':
-        bookings = Booking.objects.filter(customer=user).order_by('-booking_date')
-    else:
-        bookings = Booking.objects.filter(provider=user).order_by('-booking_date')
+    bookings = Booking.objects.for_user(user).recent()
     
     # Filter by status
     status_filter = request.GET.get('status', 'all')
@@ -960,43 +939,6 @@ def profile_reviews(request):
     
     return render(request, 'profile_reviews.html', context)
 
-@login_required
-def profile_notifications(request):
-    """
-    View all notifications for the user with pagination and mark all as read feature.
-    """
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    
-    # Mark as read if specified
-    if request.GET.get('mark_read') == 'all':
-        notifications.update(is_read=True)
-        messages.success(request, 'All notifications marked as read.')
-        return redirect('profile_notifications')
-    
-    # Pagination
-    paginator = Paginator(notifications, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'page_obj': page_obj,
-        'unread_count': notifications.filter(is_read=False).count(),
-    }
-    
-    return render(request, 'profile_notifications.html', context)
-
-@login_required
-def mark_notification_read(request, notification_id):
-    """
-    Mark a specific notification as read and redirect back to notifications page.
-    """
-    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
-    
-    messages.success(request, 'Notification marked as read.')
-    return redirect('profile_notifications')
-
 @login_required
 def profile_settings(request):
     """
@@ -1053,8 +995,6 @@ def add_service(request):
         messages.error(request, 'Only service providers can add services.')
         return redirect('dashboard')
     
-    categories = ServiceCategory.objects.all()
-    
     if request.method == 'POST':
         try:
             # Validate required fields
@@ -1062,7 +1002,11 @@ def add_service(request):
             for field in required_fields:
                 if not request.POST.get(field):
                     messages.error(request, f'Please fill in the {field.replace("_", " ")} field.')
-                    return render(request, 'add_service.html', {'categories': categories})   
+                    return render(request, 'add_service.html')   
+            
+            if parse_price_range(request.POST.get('price')) == (None, None):
+                messages.error(request, 'Please enter a valid price range, e.g. ₹500-2000.')
+                return render(request, 'add_service.html')
 
              # Get category
             category_id = request.POST.get('category')
@@ -1070,7 +1014,7 @@ def add_service(request):
                 category = ServiceCategory.objects.get(id=category_id)
             except ServiceCategory.DoesNotExist:
                 messages.error(request, 'Invalid category selected.')
-                return render(request, 'add_service.html', {'categories': categories})
+                return render(request, 'add_service.html')
             
             # Create service - is_active=True for immediate visibility
             service = Service.objects.create(
@@ -1097,7 +1041,7 @@ def add_service(request):
             try:
                 admin_users = CustomUser.objects.filter(user_type='admin')
                 for admin in admin_users:
-                    send_mail(
+                    enqueue_mail(
                         'New Service Added',
                         f'''
 Hello Admin,
@@ -1113,7 +1057,7 @@ FixFinder Admin
                         ''',
                         settings.DEFAULT_FROM_EMAIL,
                         [admin.email],
-                        fail_silently=True,
+                        idempotency_key=f'service-added:{service.pk}:admin:{admin.pk}',
                     )
             except Exception as e:
                 print(f"Admin notification email failed: {e}")
@@ -1131,9 +1075,9 @@ FixFinder Admin
             
         except Exception as e:
             messages.error(request, f'Error adding service: {str(e)}')
-            return render(request, 'add_service.html', {'categories': categories})
+            return render(request, 'add_service.html')
     
-    return render(request, 'add_service.html', {'categories': categories})
+    return render(request, 'add_service.html')
 
 @login_required
 def book_service(request, service_id):
@@ -1149,12 +1093,8 @@ def book_service(request, service_id):
             address = request.POST.get('address')
             special_instructions = request.POST.get('special_instructions', '')
             
-            # Price extraction and validation (assuming price_range is a string like '₹1000-₹2000')
-            price_str = service.price_range.replace('₹', '').split('-')[0].strip()
-            try:
-                total_price = float(price_str)
-            except ValueError:
-                total_price = 0.0  # Default or handle error
+            # Starting price (price_range se Service.save() mein parse hota hai)
+            total_price = float(service.price_min)
             
             if not all([service_date, service_time, address]):
                 messages.error(request, 'Please fill all required fields.')
@@ -1218,14 +1158,14 @@ Best regards,
 FixFinder Team
                 """
                 
-                send_mail(
+                enqueue_mail(
                     customer_subject,
                     customer_message.strip(),
                     settings.DEFAULT_FROM_EMAIL,
                     [request.user.email],
-                    fail_silently=False,
+                    idempotency_key=f'booking-confirmed:{booking.pk}:customer',
                 )
-                print(f"✅ Customer email sent to: {request.user.email}")
+                print(f"✅ Customer email queued for: {request.user.email}")
                 
             except Exception as e:
                 print(f"❌ Customer email failed: {e}")
@@ -1277,14 +1217,14 @@ Best regards,
 FixFinder Team
                 """
                 
-                send_mail(
+                enqueue_mail(
                     provider_subject,
                     provider_message.strip(),
                     settings.DEFAULT_FROM_EMAIL,
                     [service.provider.email],
-                    fail_silently=False,
+                    idempotency_key=f'booking-confirmed:{booking.pk}:provider',
                 )
-                print(f"✅ Provider email sent to: {service.provider.email}")
+                print(f"✅ Provider email queued for: {service.provider.email}")
                 
             except Exception as e:
                 print(f"❌ Provider email failed: {e}")
@@ -1293,21 +1233,22 @@ FixFinder Team
             # =======================================================
             # CREATE NOTIFICATIONS IN DATABASE
             # =======================================================
-            Notification.objects.create(
-                user=request.user,
-                title='Booking Confirmed ✅',
-                message=f'Your booking for "{service.title}" has been confirmed. Check your email for details.',
-                notification_type='booking_confirmed',
-                related_booking=booking
-            )
-            
-            Notification.objects.create(
-                user=service.provider,
-                title='New Booking Received 🎉',
-                message=f'New booking from {request.user.get_full_name()} for "{service.title}". Check your email for details.',
-                notification_type='new_booking',
-                related_booking=booking
-            )
+            notify_many([
+                Notification(
+                    user=request.user,
+                    title='Booking Confirmed ✅',
+                    message=f'Your booking for "{service.title}" has been confirmed. Check your email for details.',
+                    notification_type='booking_confirmed',
+                    related_booking=booking
+                ),
+                Notification(
+                    user=service.provider,
+                    title='New Booking Received 🎉',
+                    message=f'New booking from {request.user.get_full_name()} for "{service.title}". Check your email for details.',
+                    notification_type='new_booking',
+                    related_booking=booking
+                ),
+            ])
             
             messages.success(request, 
                 f'✅ Service booked successfully! \n'
@@ -1334,7 +1275,7 @@ def booking_detail(request, booking_id):
     """
     View detailed booking information
     """
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_object_or_404(Booking.objects.with_related(), id=booking_id)
     
     # Check if user has permission to view this booking
     if request.user.user_type == 'customer' and booking.customer != request.user:
@@ -1416,14 +1357,14 @@ Best regards,
 FixFinder Team
                 """
                 
-                send_mail(
+                enqueue_mail(
                     customer_subject,
                     customer_message.strip(),
                     settings.DEFAULT_FROM_EMAIL,
                     [booking.customer.email],
-                    fail_silently=False,
+                    idempotency_key=f'booking-cancelled:{booking.pk}:customer',
                 )
-                print(f"✅ Customer cancellation email sent to: {booking.customer.email}")
+                print(f"✅ Customer cancellation email queued for: {booking.customer.email}")
                 
             except Exception as e:
                 print(f"❌ Customer cancellation email failed: {e}")
@@ -1463,14 +1404,14 @@ Best regards,
 FixFinder Team
                 """
                 
-                send_mail(
+                enqueue_mail(
                     provider_subject,
                     provider_message.strip(),
                     settings.DEFAULT_FROM_EMAIL,
                     [booking.provider.email],
-                    fail_silently=False,
+                    idempotency_key=f'booking-cancelled:{booking.pk}:provider',
                 )
-                print(f"✅ Provider cancellation email sent to: {booking.provider.email}")
+                print(f"✅ Provider cancellation email queued for: {booking.provider.email}")
                 
             except Exception as e:
                 print(f"❌ Provider cancellation email failed: {e}")
@@ -1478,21 +1419,22 @@ FixFinder Team
             # =======================================================
             # CREATE NOTIFICATIONS IN DATABASE
             # =======================================================
-            Notification.objects.create(
-                user=booking.customer,
-                title='Booking Cancelled ❌',
-                message=f'Your booking for "{booking.service.title if booking.service else booking.service_name}" has been cancelled.',
-                notification_type='booking_cancelled',
-                related_booking=booking
-            )
-            
-            Notification.objects.create(
-                user=booking.provider,
-                title='Booking Cancelled ❌',
-                message=f'Booking from {booking.customer.get_full_name()} for "{booking.service.title if booking.service else booking.service_name}" has been cancelled.',
-                notification_type='booking_cancelled',
-                related_booking=booking
-            )
+            notify_many([
+                Notification(
+                    user=booking.customer,
+                    title='Booking Cancelled ❌',
+                    message=f'Your booking for "{booking.service.title if booking.service else booking.service_name}" has been cancelled.',
+                    notification_type='booking_cancelled',
+                    related_booking=booking
+                ),
+                Notification(
+                    user=booking.provider,
+                    title='Booking Cancelled ❌',
+                    message=f'Booking from {booking.customer.get_full_name()} for "{booking.service.title if booking.service else booking.service_name}" has been cancelled.',
+                    notification_type='booking_cancelled',
+                    related_booking=booking
+                ),
+            ])
             
             messages.success(request, 
                 f'✅ Booking cancelled successfully! \n'
@@ -1527,43 +1469,12 @@ CANCELLATION_REASONS = {
 # 6. Service Request Views
 # =======================================================
 
-def create_provider_notifications(service_request):
-    """
-    Utility function to create notifications for relevant service providers.
-    """
-    # NOTE: UserProfile is assumed to exist and is linked to the User model.
-    
-    # Filter by service category and location (city/area)
-    relevant_providers = CustomUser.objects.filter(
-        user_type='provider',
-        # Check if the provider's CustomUser location field contains the request location (city)
-        location__icontains=service_request.location.split(',')[0].strip(),
-        # Check if the provider is registered for the service category
-        service_categories__in=[service_request.category.id]
-    ).distinct()
-    
-    # Also send emails to relevant providers
-    for provider in relevant_providers:
-        Notification.objects.create(
-            user=provider,
-            title=f"New Service Request: {service_request.title}",
-            message=f"A new {service_request.get_category_display()} request has been posted in {service_request.location}.",
-            notification_type='service_request',
-            # related_service_request is not in Notification model, using related_id for generic linking
-            related_booking=None 
-        )
-        
-        # Send Email notification to providers (Redundant email logic removed, kept the simpler notification)
-
-
 # views.py - Post Service Request View (Fixed)
 @login_required
 def post_service_request(request):
     """
     Submit a detailed service request.
     """
-    categories = ServiceCategory.objects.all()
-    
     if request.method == 'POST':
         form = ServiceRequestForm(request.POST)
         if form.is_valid():
@@ -1601,7 +1512,6 @@ def post_service_request(request):
     
     context = {
         'form': form,
-        'categories': categories
     }
     return render(request, 'post_service_request.html', context)
 
@@ -1628,7 +1538,7 @@ Hello {service_request.customer.first_name},
 
 📋 **Request Details:**
 • Service: {service_request.title}
-• Category: {service_request.category.name}
+• Category: {service_request.get_category_display()}
 • Location: {service_request.location}
 • Budget: {service_request.budget}
 • Request ID: #{service_request.id}
@@ -1657,14 +1567,14 @@ Best regards,
 FixFinder Team
         """
         
-        send_mail(
+        enqueue_mail(
             customer_subject,
             customer_message.strip(),
             settings.DEFAULT_FROM_EMAIL,
             [service_request.customer.email],
-            fail_silently=False,
+            idempotency_key=f'request-posted:{service_request.pk}:customer',
         )
-        print(f"✅ Customer confirmation email sent to: {service_request.customer.email}")
+        print(f"✅ Customer confirmation email queued for: {service_request.customer.email}")
         
     except Exception as e:
         print(f"❌ Customer confirmation email failed: {e}")
@@ -1673,12 +1583,8 @@ def send_provider_notification_emails(service_request):
     """
     Send notification emails to relevant providers
     """
-    # Get providers in same location and category
-    relevant_providers = CustomUser.objects.filter(
-        user_type='provider',
-        location__icontains=service_request.location.split(',')[0].strip() if service_request.location else '',
-        service_categories=service_request.category
-    ).distinct()
+    # Get providers in same location and category (ProviderMatch index lookup)
+    relevant_providers = ProviderMatch.providers_for(service_request)
     
     provider_count = 0
     for provider in relevant_providers:
@@ -1691,7 +1597,7 @@ Hello {provider.first_name},
 
 📋 **Service Request Details:**
 • Service: {service_request.title}
-• Category: {service_request.category.name}
+• Category: {service_request.get_category_display()}
 • Location: {service_request.location}
 • Budget: {service_request.budget}
 • Request ID: #{service_request.id}
@@ -1711,7 +1617,7 @@ Hello {provider.first_name},
 • Phone: {service_request.contact_phone}
 
 🎯 **Why This Request Matches You:**
-• Category: {service_request.category.name} matches your expertise
+• Category: {service_request.get_category_display()} matches your expertise
 • Location: {service_request.location} is in your service area
 • You have experience in this service type
 
@@ -1733,40 +1639,35 @@ Best regards,
 FixFinder Team
             """
             
-            send_mail(
+            enqueue_mail(
                 provider_subject,
                 provider_message.strip(),
                 settings.DEFAULT_FROM_EMAIL,
                 [provider.email],
-                fail_silently=True,
+                idempotency_key=f'request-posted:{service_request.pk}:provider:{provider.pk}',
             )
             provider_count += 1
-            print(f"✅ Provider notification sent to: {provider.email}")
+            print(f"✅ Provider notification queued for: {provider.email}")
             
         except Exception as e:
             print(f"❌ Provider email failed for {provider.email}: {e}")
     
-    print(f"📧 Total {provider_count} providers notified about service request #{service_request.id}")
+    print(f"📧 Total {provider_count} provider emails queued about service request #{service_request.id}")
 
 def create_provider_notifications(service_request):
     """
     Create in-app notifications for relevant service providers
     """
-    # Get providers in same location and category
-    relevant_providers = CustomUser.objects.filter(
-        user_type='provider',
-        location__icontains=service_request.location.split(',')[0].strip() if service_request.location else '',
-        service_categories=service_request.category
-    ).distinct()
+    # Get providers in same location and category (ProviderMatch index lookup)
+    relevant_providers = ProviderMatch.providers_for(service_request)
     
-    # Create notifications for each provider
-    for provider in relevant_providers:
-        Notification.objects.create(
-            user=provider,
-            title=f"New Service Request: {service_request.title}",
-            message=f"A new {service_request.category.name} request has been posted in {service_request.location}.",
-            notification_type='service_request'
-        )
+    # Create notifications for all providers in one bulk fan-out (bade audience par background job)
+    fan_out(
+        relevant_providers,
+        title=f"New Service Request: {service_request.title}",
+        message=f"A new {service_request.get_category_display()} request has been posted in {service_request.location}.",
+        notification_type='service_request'
+    )
     
     # Create notification for customer
     Notification.objects.create(
@@ -1840,11 +1741,9 @@ def available_requests(request):
         messages.error(request, 'This page is only available for service providers.')
         return redirect('index')
     
-    # Filter requests by provider's registered categories and location (using CustomUser fields)
-    available_requests = ServiceRequest.objects.filter(
-        status='open',
-        location__icontains=user.location.split(',')[0] or '',
-        category__in=user.service_categories.all()
+    # Filter requests by provider's registered categories and location (ProviderMatch index keys)
+    available_requests = ProviderMatch.requests_for(user).filter(
+        status='open'
     ).exclude(
         Q(customer=user) | Q(responses__provider=user)
     ).distinct().order_by('-created_at')
@@ -1894,7 +1793,7 @@ def contact_provider(request, provider_id):
         
         # Send email notification to provider
         try:
-            send_mail(
+            enqueue_mail(
                 f'New Message from {request.user.get_full_name()} (FixFinder)',
                 f'''
 Hello {provider.first_name},
@@ -1913,16 +1812,14 @@ FixFinder Team
                 ''',
                 settings.DEFAULT_FROM_EMAIL,
                 [provider.email],
-                fail_silently=False,
             )
             
             # Send copy to customer
-            send_mail(
+            enqueue_mail(
                 'Message Sent Successfully',
                 f'Your message has been sent to {provider.get_full_name()} regarding service ID {service_id if service_id else "N/A"}.',
                 settings.DEFAULT_FROM_EMAIL,
                 [request.user.email],
-                fail_silently=False,
             )
             
             messages.success(request, 'Message sent successfully! The provider will contact you soon.')
@@ -1940,18 +1837,93 @@ FixFinder Team
 # 8. API Views
 # =======================================================
 
+def api_metrics(request):
+    """
+    Per-view query counters (QueryBudgetMiddleware) Prometheus text format mein.
+    Staff login ya `Authorization: Bearer <METRICS_TOKEN>` header zaroori.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.headers.get('Authorization', '')
+    authorized = (request.user.is_authenticated and request.user.is_staff) or (
+        token and secrets.compare_digest(header, f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(render_query_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @login_required
+@condition(etag_func=unread_count_etag)
 def api_get_notifications(request):
-    """Get unread notifications count for AJAX"""
-    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-    return JsonResponse({'unread_count': unread_count})
+    """Get unread notifications count for AJAX (NotificationCounter se, bina scan ke)"""
+    # unread_count_etag pehle hi counter padh chuka hota hai
+    count = getattr(request, 'unread_count', None)
+    if count is None:
+        count = unread_count(request.user)
+    return JsonResponse({'unread_count': count})
+
+def sse_event(event_type, data):
+    """Server-Sent Events format mein ek event."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+async def notification_event_stream(user):
+    """
+    User ke channel ke events stream karta hai. Har burst ke baad ek hi baar counter padhkar
+    `unread_count` bhejta hai. Broker doosre processes ke events nahi dekhta (InProcessBroker), isliye
+    idle connection par har poll interval par counter padhkar badla ho to `unread_count` bhejta hai,
+    warna keepalive comment.
+    """
+    subscription = get_broker().subscribe(user_channel(user.pk))
+    try:
+        yield f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n"
+        count = await sync_to_async(unread_count)(user)
+        yield sse_event('unread_count', {'unread_count': count})
+        last_write = time.monotonic()
+        
+        while True:
+            event = await subscription.get(timeout=settings.NOTIFICATION_STREAM_POLL_INTERVAL)
+            if event is not None:
+                for item in [event] + subscription.drain():
+                    if item['type'] == 'notification':
+                        yield sse_event('notification', item['data'])
+            
+            latest = await sync_to_async(unread_count)(user)
+            if event is not None or latest != count:
+                count = latest
+                yield sse_event('unread_count', {'unread_count': count})
+            elif time.monotonic() - last_write < settings.NOTIFICATION_STREAM_KEEPALIVE:
+                continue
+            else:
+                yield ": keepalive\n\n"
+            last_write = time.monotonic()
+    finally:
+        subscription.close()
+
+@login_required
+async def api_notifications_stream(request):
+    """
+    Server-Sent Events: naye notifications aur unread count push karta hai (polling ki jagah).
+    ASGI (fixfinder/asgi.py) par long-lived stream; WSGI/gunicorn par ek event bhejkar band,
+    aur `retry:` ki wajah se EventSource utni der baad reconnect karta hai (polling fallback).
+    """
+    user = await request.auser()
+    
+    if not isinstance(request, ASGIRequest):
+        count = await sync_to_async(unread_count)(user)
+        body = f"retry: {settings.NOTIFICATION_STREAM_RETRY_MS}\n\n" + sse_event('unread_count', {'unread_count': count})
+        return HttpResponse(body, content_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    
+    return StreamingHttpResponse(
+        notification_event_stream(user),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 @login_required
 def api_mark_notification_read(request, notification_id):
     """Mark notification as read"""
-    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    get_object_or_404(Notification, id=notification_id, user=request.user)
+    mark_read(request.user, notification_id)
     return JsonResponse({'success': True})
 
 
@@ -1966,7 +1938,7 @@ def profile_notifications(request):
     
     # Mark all as read if specified
     if request.GET.get('mark_read') == 'all':
-        updated_count = notifications.update(is_read=True)
+        updated_count = mark_all_read(request.user)
         messages.success(request, f'Marked {updated_count} notifications as read.')
         return redirect('profile_notifications')
     
@@ -1977,7 +1949,7 @@ def profile_notifications(request):
     
     context = {
         'page_obj': page_obj,
-        'unread_count': notifications.filter(is_read=False).count(),
+        'unread_count': unread_count(request.user),
     }
     
     return render(request, 'profile_notifications.html', context)
@@ -1987,9 +1959,8 @@ def mark_notification_read(request, notification_id):
     """
     Mark a specific notification as read and redirect back
     """
-    notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    get_object_or_404(Notification, id=notification_id, user=request.user)
+    mark_read(request.user, notification_id)
     
     messages.success(request, 'Notification marked as read.')
     
@@ -2006,8 +1977,6 @@ def edit_service(request, service_id):
     Edit existing service - only service owner can edit
     """
     service = get_object_or_404(Service, id=service_id, provider=request.user)
-    categories = ServiceCategory.objects.all()
-    
     if request.method == 'POST':
         try:
             # Validate required fields
@@ -2015,10 +1984,11 @@ def edit_service(request, service_id):
             for field in required_fields:
                 if not request.POST.get(field):
                     messages.error(request, f'Please fill in the {field.replace("_", " ")} field.')
-                    return render(request, 'edit_service.html', {
-                        'service': service,
-                        'categories': categories
-                    })
+                    return render(request, 'edit_service.html', {'service': service})
+            
+            if parse_price_range(request.POST.get('price')) == (None, None):
+                messages.error(request, 'Please enter a valid price range, e.g. ₹500-2000.')
+                return render(request, 'edit_service.html', {'service': service})
             
             # Update service
             service.category_id = request.POST.get('category')
@@ -2053,15 +2023,9 @@ def edit_service(request, service_id):
             
         except Exception as e:
             messages.error(request, f'Error updating service: {str(e)}')
-            return render(request, 'edit_service.html', {
-                'service': service,
-                'categories': categories
-            })
+            return render(request, 'edit_service.html', {'service': service})
     
-    return render(request, 'edit_service.html', {
-        'service': service,
-        'categories': categories
-    })
+    return render(request, 'edit_service.html', {'service': service})
 
 
 
@@ -2133,7 +2097,7 @@ def contact_provider(request, provider_id):
         
         # Send email to provider
         try:
-            send_mail(
+            enqueue_mail(
                 f'New Message from {request.user.get_full_name()} - FixFinder',
                 f'''
 Message from: {request.user.get_full_name()}
@@ -2151,11 +2115,10 @@ FixFinder Team
                 ''',
                 settings.DEFAULT_FROM_EMAIL,
                 [provider.email],
-                fail_silently=False,
             )
             
             # Send confirmation to customer
-            send_mail(
+            enqueue_mail(
                 'Message Sent Successfully - FixFinder',
                 f'''
 Your message has been sent to {provider.get_full_name()}.
@@ -2169,7 +2132,6 @@ FixFinder Team
                 ''',
                 settings.DEFAULT_FROM_EMAIL,
                 [request.user.email],
-                fail_silently=True,
             )
             
             messages.success(request, f'Message sent to {provider.get_full_name()} successfully!')
@@ -2259,7 +2221,7 @@ def accept_booking(request, booking_id):
     
     # Send email to customer
     try:
-        send_mail(
+        enqueue_mail(
             'Booking Confirmed - FixFinder',
             f'''
 Hello {booking.customer.first_name},
@@ -2279,7 +2241,7 @@ FixFinder Team
             ''',
             settings.DEFAULT_FROM_EMAIL,
             [booking.customer.email],
-            fail_silently=True,
+            idempotency_key=f'booking-accepted:{booking.pk}',
         )
     except Exception as e:
         print(f"Email sending failed: {e}")